@@ -1,6 +1,7 @@
 from logging import getLogger
 
 from app.models import User
+from app.util.db import db_sync_to_async
 from config.exceptions import (
     InvalidCredentialsException,
     InvalidEmailOrPasswordException,
@@ -28,7 +29,7 @@ class AuthAPI:
         return create_access_token_response({"sub": str(user.uuid)})
 
     async def _authenticate_user(self, email: str, password: str) -> User:
-        user = await User.objects.filter(email=email).afirst()
+        user = await db_sync_to_async(User.objects.filter(email=email).first)()
         if not user:
             raise InvalidEmailOrPasswordException()
         if not verify_password(password, user.password) or not user.is_active:
@@ -2,7 +2,7 @@ from logging import getLogger
 
 from app.models import User
 from app.schemas import CreateUserSchema
-from asgiref.sync import sync_to_async
+from app.util.db import db_sync_to_async
 from config.password import hash_password
 
 from fastapi import HTTPException, Request
@@ -17,8 +17,8 @@ class UserAPI:
 
     @classmethod
     async def create(cls, request: Request, schema: CreateUserSchema) -> User:
-        user = await User.objects.filter(email=schema.email).afirst()
+        user = await db_sync_to_async(User.objects.filter(email=schema.email).first)()
         if user:
             raise HTTPException(status_code=400, detail="Email already registered")
         schema.password = hash_password(schema.password)
-        return await sync_to_async(User.objects.create)(**schema.dict())
+        return await db_sync_to_async(User.objects.create)(**schema.dict())
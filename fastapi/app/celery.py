@@ -7,6 +7,8 @@ from celery import shared_task
 import django
 django.setup()
 
+from django.conf import settings
+
 
 celery_app = Celery("app")
 
@@ -14,12 +16,15 @@ celery_app.config_from_object("django.conf:settings", namespace="CELERY")  # for
 
 
 from app.util.collect import collect_all
-from app.tasks import task_collect_all
+from app.tasks import task_collect_all, task_collect_due
 
 
 celery_app.conf.update(
     task_routes={
         "app.tasks.task_collect_all": {"queue": "default"},
+        "app.tasks.task_collect_due": {"queue": "default"},
+        "app.tasks.task_collect_shard": {"queue": "default"},
+        "app.tasks.task_collect_summary": {"queue": "default"},
     }
 )
 
@@ -31,4 +36,13 @@ celery_app.conf.update(
 # }
 
 
-celery_app.add_periodic_task(60.0, task_collect_all.s(), name="Collect every minute")
+# every endpoint has its own adaptive polling interval,
+# the tick only dispatches the ones that are due.
+# Disabled when the long-running collector (manage.py run_collector) is used.
+if settings.COLLECTOR_CELERY_BEAT:
+    celery_app.add_periodic_task(
+        settings.COLLECTOR_TICK_SECONDS,
+        task_collect_due.s(),
+        name="Collect due endpoints",
+        expires=settings.COLLECTOR_TICK_SECONDS,
+    )
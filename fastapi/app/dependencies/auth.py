@@ -1,4 +1,5 @@
 from app.models import User
+from app.util.db import db_sync_to_async
 from config.exceptions import InvalidTokenException
 from config.jwt import jwt_decode_handler
 from jose import JWTError
@@ -15,7 +16,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise InvalidTokenException()
 
-    user = await User.objects.filter(uuid=payload.get("sub", "")).afirst()
+    user = await db_sync_to_async(
+        User.objects.filter(uuid=payload.get("sub", "")).first
+    )()
     if not user:
         raise InvalidTokenException()
     return user
@@ -0,0 +1,103 @@
+import asyncio
+from collections import defaultdict
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from app.models import Currency
+from app.util.backfill import backfill, backfill_endpoints, find_gaps, missing_heights
+from app.util.db import db_sync_to_async
+from app.util.http import client_registry
+from app.util.registry import endpoint_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Find missing block numbers between stored blocks and fetch them "
+        "from endpoints with block_url. Safe to interrupt and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--currency",
+            action="append",
+            default=[],
+            help="Currency name (repeatable), all currencies by default",
+        )
+        parser.add_argument("--from-block", type=int, default=None)
+        parser.add_argument("--to-block", type=int, default=None)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Blocks fetched and inserted per batch",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Max requests in flight",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Max blocks per currency in this run",
+        )
+
+    def handle(self, *args, **options):
+        currencies = Currency.objects.all()
+        if options["currency"]:
+            names = Q()
+            for name in options["currency"]:
+                names |= Q(name__iexact=name)
+            currencies = currencies.filter(names)
+        currencies = {currency.id: currency.name for currency in currencies}
+        if not currencies:
+            raise CommandError("No currencies found")
+
+        asyncio.run(self.run(currencies, options))
+
+    async def run(self, currencies: dict[int, str], options: dict) -> None:
+        gaps = await db_sync_to_async(find_gaps)(
+            list(currencies), options["from_block"], options["to_block"]
+        )
+        gaps_by_currency = defaultdict(list)
+        for gap in gaps:
+            gaps_by_currency[gap[0]].append(gap)
+
+        endpoints = backfill_endpoints(await endpoint_registry.aget_all())
+        try:
+            for currency_id, name in currencies.items():
+                currency_gaps = gaps_by_currency.get(currency_id, [])
+                missing = sum(last - first + 1 for _, first, last in currency_gaps)
+                currency_endpoints = [
+                    endpoint
+                    for endpoint in endpoints
+                    if endpoint.currency_id == currency_id
+                ]
+                self.stdout.write(
+                    f"{name}: {missing} missing blocks in {len(currency_gaps)} gaps"
+                )
+                if not missing:
+                    continue
+                if not currency_endpoints:
+                    self.stdout.write(f"{name}: no endpoint with block_url, skipped")
+                    continue
+
+                heights = islice(missing_heights(currency_gaps), options["limit"])
+                total_stored = 0
+                async for requested, fetched, stored in backfill(
+                    currency_endpoints,
+                    heights,
+                    options["batch_size"],
+                    options["concurrency"],
+                ):
+                    total_stored += stored
+                    self.stdout.write(
+                        f"{name}: requested {requested}, fetched {fetched}, "
+                        f"stored {stored} (total {total_stored})"
+                    )
+        finally:
+            await client_registry.aclose()
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import random
+import resource
+import statistics
+import time
+import tracemalloc
+import uuid
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+
+from app.models import Block, Currency, Endpoint, Provider
+from app.util.collect import collect_all
+from app.util.heads import head_cache
+from app.util.http import client_registry
+from app.util.registry import endpoint_registry
+
+
+# names of benchmark rows, currency names are at most 10 characters;
+# cleanup deletes rows by the ids created in the run, never by name
+CURRENCY_PREFIX = "~"
+PROVIDER_PREFIX = "__bench__"
+
+
+class QueryCounter:
+    """
+    execute_wrapper counting queries of every connection opened
+    while the benchmark runs (ORM work runs in asgiref threads).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def connection_created(self, sender, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class MockProvider:
+    """
+    Stand-in for provider APIs: every endpoint answers with a payload of
+    about payload_size bytes and a new head block every polls_per_block
+    requests.
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        jitter: float,
+        payload_size: int,
+        error_rate: float,
+        polls_per_block: int = 1,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.polls_per_block = max(1, polls_per_block)
+        self.padding = "x" * max(0, payload_size - 100)
+        self.polls: dict[str, int] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        delay = max(0.0, random.gauss(self.latency, self.jitter))
+        await asyncio.sleep(delay)
+        if random.random() < self.error_rate:
+            return httpx.Response(503)
+        polls = self.polls[request.url.path] = self.polls.get(request.url.path, 0) + 1
+        height = (polls - 1) // self.polls_per_block + 1
+        body = {
+            "data": {
+                "height": height,
+                "time": "2025-02-16T07:40:00Z",
+                "padding": self.padding,
+            }
+        }
+        return httpx.Response(
+            200,
+            content=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+
+
+def percentile(values: list[float], share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(share * (len(values) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark collect_all against a local mock provider. "
+        "Creates currencies, providers and endpoints in the configured "
+        "database and removes exactly these rows afterwards. "
+        "Use a scratch database: pass its name with --database to confirm."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            required=True,
+            help="NAME of the configured database, confirms the benchmark may write to it",
+        )
+        parser.add_argument("--endpoints", type=int, default=200)
+        parser.add_argument("--providers", type=int, default=5)
+        parser.add_argument("--cycles", type=int, default=20)
+        parser.add_argument(
+            "--latency", type=float, default=50.0, help="Mean response latency, ms"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=10.0, help="Latency standard deviation, ms"
+        )
+        parser.add_argument(
+            "--payload-size", type=int, default=2000, help="Response size, bytes"
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0, help="Share of 503 responses, 0..1"
+        )
+        parser.add_argument(
+            "--polls-per-block",
+            type=int,
+            default=1,
+            help="Requests answered with the same head block",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Report peak Python allocations (slows the run)",
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES["default"]["NAME"]
+        if options["database"] != str(database):
+            raise CommandError(
+                f"--database {options['database']!r} is not the configured "
+                f"database {database!r}, refusing to write benchmark rows"
+            )
+        random.seed(options["seed"])
+        self.tag = uuid.uuid4().hex[:4]
+        self.created: dict[str, list[int]] = {}
+        try:
+            self.create_fixtures(options["endpoints"], options["providers"])
+        except Exception:
+            self.cleanup()
+            raise
+
+        counter = QueryCounter()
+        connection_created.connect(counter.connection_created)
+        client_registry.transport = httpx.MockTransport(
+            MockProvider(
+                options["latency"] / 1000,
+                options["jitter"] / 1000,
+                options["payload_size"],
+                options["error_rate"],
+                options["polls_per_block"],
+            )
+        )
+        if options["trace_memory"]:
+            tracemalloc.start()
+        try:
+            durations, queries, added = asyncio.run(
+                self.run(options["cycles"], counter)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            client_registry.transport = None
+            connection_created.disconnect(counter.connection_created)
+            self.cleanup()
+
+        self.report(options, durations, queries, added, peak)
+
+    async def run(self, cycles: int, counter: QueryCounter):
+        durations, queries, added = [], [], []
+        endpoint_ids = set(self.created["endpoints"])
+        try:
+            for _ in range(cycles):
+                before = counter.count
+                started = time.perf_counter()
+                endpoints = [
+                    endpoint
+                    for endpoint in await endpoint_registry.aget_all()
+                    if endpoint.id in endpoint_ids
+                ]
+                results = await collect_all(endpoints)
+                durations.append(time.perf_counter() - started)
+                queries.append(counter.count - before)
+                added.append(
+                    sum(1 for result in results for value in result.values() if value)
+                )
+        finally:
+            await client_registry.aclose()
+        return durations, queries, added
+
+    def create_fixtures(self, endpoints: int, providers: int) -> None:
+        if endpoints > 99_999:
+            raise CommandError("At most 99999 endpoints")
+        providers = Provider.objects.bulk_create(
+            Provider(name=f"{PROVIDER_PREFIX}{self.tag}-{number}")
+            for number in range(providers)
+        )
+        self.created["providers"] = [provider.id for provider in providers]
+        currencies = Currency.objects.bulk_create(
+            Currency(name=f"{CURRENCY_PREFIX}{self.tag}{number:05d}")
+            for number in range(endpoints)
+        )
+        self.created["currencies"] = [currency.id for currency in currencies]
+        self.created["endpoints"] = []
+        # bulk_create does not send signals, registries are reloaded
+        # anyway: the endpoint post_save below bumps their version
+        for number, currency in enumerate(currencies):
+            provider = providers[number % len(providers)]
+            endpoint = Endpoint.objects.create(
+                url=f"http://bench-{number % len(providers)}.local/stats/{number}",
+                pattern_block="data.height",
+                pattern_timestamp="data.time",
+                currency=currency,
+                provider=provider,
+            )
+            self.created["endpoints"].append(endpoint.id)
+
+    def cleanup(self) -> None:
+        """
+        Delete the rows created by this run (and their blocks) only.
+        """
+        currency_ids = self.created.get("currencies", [])
+        Block.objects.filter(currency_id__in=currency_ids).delete()
+        Endpoint.objects.filter(id__in=self.created.get("endpoints", [])).delete()
+        Currency.objects.filter(id__in=currency_ids).delete()
+        Provider.objects.filter(id__in=self.created.get("providers", [])).delete()
+
+    def report(self, options, durations, queries, added, peak) -> None:
+        endpoints = options["endpoints"]
+        total = sum(durations)
+        self.stdout.write(
+            f"endpoints {endpoints}, providers {options['providers']}, "
+            f"cycles {options['cycles']}, latency {options['latency']}ms "
+            f"±{options['jitter']}ms, payload {options['payload_size']}B, "
+            f"error rate {options['error_rate']}, "
+            f"{options['polls_per_block']} polls per block"
+        )
+        self.stdout.write(
+            f"endpoints/sec      {endpoints * len(durations) / total:10.1f}"
+        )
+        self.stdout.write(
+            f"cycle p50          {percentile(durations, 0.5) * 1000:10.1f} ms"
+        )
+        self.stdout.write(
+            f"cycle p99          {percentile(durations, 0.99) * 1000:10.1f} ms"
+        )
+        self.stdout.write(
+            f"cycle mean         {statistics.mean(durations) * 1000:10.1f} ms"
+        )
+        self.stdout.write(
+            f"queries per cycle  {statistics.mean(queries):10.1f} "
+            f"(first {queries[0]})"
+        )
+        self.stdout.write(f"blocks per cycle   {statistics.mean(added):10.1f}")
+        self.stdout.write(f"head cache hits    {head_cache.stats()['hit_rate']:10.1%}")
+        if options["trace_memory"]:
+            self.stdout.write(f"peak traced memory {peak / 1024 / 1024:10.1f} MiB")
+        self.stdout.write(
+            f"max RSS            "
+            f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:10.1f} MiB"
+        )
@@ -0,0 +1,66 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from app.util.extract import compile_pattern
+
+
+def legacy_get_value(data: dict, pattern: str) -> str:
+    """
+    get_value as used by the collector before compiled extractors.
+    """
+    keys = pattern.split(".")
+    value = data
+    for key in keys:
+        value = value.get(key, {})
+    if value:
+        return value
+    return ""
+
+
+def build_payload(width: int, depth: int) -> dict:
+    """
+    Nested dicts `depth` levels deep with `width` sibling keys per level,
+    the target value is at data.key_{width-1}....total_blocks.
+    """
+    leaf = {f"field_{i}": i for i in range(width)}
+    leaf["total_blocks"] = 123456
+    node = leaf
+    for level in range(depth):
+        siblings = {f"key_{i}": {"value": i} for i in range(width - 1)}
+        siblings[f"key_{width - 1}"] = node
+        node = siblings
+    return {"status": {"error_code": 0}, "data": node}
+
+
+class Command(BaseCommand):
+    help = "Compare compiled pattern extractors with the legacy get_value"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--width", type=int, default=1000)
+        parser.add_argument("--depth", type=int, default=8)
+        parser.add_argument("--number", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        width, depth, number = options["width"], options["depth"], options["number"]
+        payload = build_payload(width, depth)
+        pattern = ".".join(["data"] + [f"key_{width - 1}"] * depth + ["total_blocks"])
+        extractor = compile_pattern(pattern)
+        assert legacy_get_value(payload, pattern) == extractor(payload)
+
+        cases = {
+            "legacy get_value": lambda: legacy_get_value(payload, pattern),
+            "compile_pattern + call": lambda: compile_pattern(pattern)(payload),
+            "precompiled extractor": lambda: extractor(payload),
+        }
+        self.stdout.write(
+            f"payload: width={width} depth={depth}, pattern length {len(pattern)}"
+        )
+        baseline = None
+        for name, func in cases.items():
+            seconds = min(timeit.repeat(func, number=number, repeat=5))
+            per_call = seconds / number * 1e9
+            baseline = baseline or per_call
+            self.stdout.write(
+                f"{name:<24} {per_call:8.1f} ns/call  x{baseline / per_call:.2f}"
+            )
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from app.models import Block
+from app.util.pagination import Cursor, keyset_queryset
+
+
+TABLES = ("app_block", "app_currency", "app_provider")
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queries of the block API and the poll schedule "
+        "and fail when one of them scans a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--allow-seqscan",
+            action="store_true",
+            help=(
+                "Plan as the database would (Postgres). By default sequential "
+                "scans are disabled, so small tables show whether an index is usable"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        block = Block.objects.first()
+        if block is None:
+            raise CommandError("No blocks to build the queries from")
+
+        failed = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql" and not options["allow_seqscan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, queryset in self.queries(block).items():
+                plan = queryset.explain()
+                scans = full_scans(plan)
+                if scans:
+                    failed.append(name)
+                status = f"full scan of {', '.join(scans)}" if scans else "index"
+                self.stdout.write(f"{name}: {status}")
+                if options["verbosity"] > 1 or scans:
+                    self.stdout.write(plan + "\n")
+
+        if failed:
+            raise CommandError(
+                f"{len(failed)} queries without index: {', '.join(failed)}"
+            )
+
+    def queries(self, block: Block) -> dict[str, QuerySet]:
+        """
+        The queries of app.routers.block and app.util.schedule
+        for the values of one stored block.
+        """
+        # names are resolved in memory by app.util.dimensions, Block is
+        # queried by ids (a provider name matches a list of provider ids)
+        blocks = Block.objects.all()
+        by_currency = blocks.filter(currency_id=block.currency_id)
+        by_provider_ids = blocks.filter(provider_id__in=[block.provider_id])
+        by_provider_id = blocks.filter(provider_id=block.provider_id)
+        since = timezone.now() - timedelta(seconds=settings.COLLECTOR_INTERVAL_WINDOW)
+        cursor = Cursor(block.created_at or timezone.now(), block.id)
+        return {
+            "blocks page": blocks[:10],
+            "blocks page by currency": by_currency[:10],
+            "blocks page by provider ids": by_provider_ids[:10],
+            "blocks page by provider id": by_provider_id[:10],
+            "blocks after cursor": keyset_queryset(blocks, cursor)[:11],
+            "blocks after cursor by currency": keyset_queryset(by_currency, cursor)[
+                :11
+            ],
+            "blocks after cursor by provider id": keyset_queryset(
+                by_provider_id, cursor
+            )[:11],
+            "blocks after cursor by provider ids": keyset_queryset(
+                by_provider_ids, cursor
+            )[:11],
+            # rows read by COUNT(*)
+            "blocks count by currency": by_currency.values("id"),
+            "block by id": blocks.filter(id=block.id),
+            "block by currency and number": blocks.filter(
+                currency_id=block.currency_id, block_number=block.block_number
+            ),
+            "poll schedule": Block.objects.filter(
+                currency_id__in=[block.currency_id],
+                stored_at__gte=since,
+                created_at__gte=since,
+            ).values("currency_id", "stored_at", "block_number"),
+        }
+
+
+def full_scans(plan: str) -> list[str]:
+    """
+    Tables of the plan read without an index
+    (Postgres "Seq Scan on", SQLite "SCAN" without "USING ... INDEX").
+    """
+    scans = []
+    for line in plan.splitlines():
+        for table in TABLES:
+            if f"Seq Scan on {table}" in line:
+                scans.append(table)
+            elif f"SCAN {table}" in line and "INDEX" not in line:
+                scans.append(table)
+    return scans
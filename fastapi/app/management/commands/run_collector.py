@@ -0,0 +1,65 @@
+import asyncio
+import signal
+from logging import getLogger
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.util.collect import collect_due
+from app.util.http import client_registry
+
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the collector as a long-running service: one event loop, "
+        "HTTP pools and endpoint registry for all cycles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tick",
+            type=float,
+            default=settings.COLLECTOR_TICK_SECONDS,
+            help="Seconds between checks for due endpoints",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Run a single cycle and exit"
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self.serve(options["tick"], options["once"]))
+
+    async def serve(self, tick: float, once: bool) -> None:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        self.stdout.write(f"Collector started, tick {tick}s")
+        try:
+            while not stop.is_set():
+                started = loop.time()
+                await self.cycle()
+                if once:
+                    break
+                try:
+                    await asyncio.wait_for(
+                        stop.wait(), timeout=max(0.0, tick - (loop.time() - started))
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await client_registry.aclose()
+        self.stdout.write("Collector stopped")
+
+    async def cycle(self) -> None:
+        try:
+            result = await collect_due()
+        except Exception:
+            logger.exception("Collection cycle failed")
+        else:
+            if result:
+                logger.info(result)
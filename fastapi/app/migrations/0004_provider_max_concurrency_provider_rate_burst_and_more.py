@@ -0,0 +1,39 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0003_endpoint_header_endpoint_pattern_block_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="provider",
+            name="max_concurrency",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Max simultaneous requests to provider, empty - unlimited",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="provider",
+            name="rate_burst",
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                help_text="Requests allowed at once before rate limit applies",
+            ),
+        ),
+        migrations.AddField(
+            model_name="provider",
+            name="rate_limit",
+            field=models.FloatField(
+                blank=True,
+                help_text="Max requests per second to provider, empty - unlimited",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0004_provider_max_concurrency_provider_rate_burst_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="endpoint",
+            name="next_poll_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="endpoint",
+            name="poll_interval",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0005_endpoint_next_poll_at_endpoint_poll_interval"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="endpoint",
+            name="block_url",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="endpoint",
+            name="pattern_block_timestamp",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0006_endpoint_block_url_endpoint_pattern_block_timestamp"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="block",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="block",
+            index=models.Index(
+                fields=["created_at", "id"], name="block_created_at_id_idx"
+            ),
+        ),
+    ]
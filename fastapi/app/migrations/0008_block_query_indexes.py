@@ -0,0 +1,119 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:01
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres import operations
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+# Postgres only DDL, other databases (tests on SQLite) get plain indexes
+
+
+class AddIndexConcurrently(operations.AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # indexes of the block table are built without blocking the collector
+    atomic = False
+
+    dependencies = [
+        ("app", "0007_block_created_at_id_idx"),
+    ]
+
+    operations = [
+        operations.TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="block",
+            index=models.Index(
+                fields=["currency", "-created_at", "-id"],
+                name="block_currency_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="block",
+            index=models.Index(
+                fields=["provider", "-created_at", "-id"],
+                name="block_provider_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="block",
+            index=models.Index(
+                fields=["currency", "stored_at"], name="block_currency_stored_idx"
+            ),
+        ),
+        # covered by the composite indexes
+        migrations.AlterField(
+            model_name="block",
+            name="created_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="block",
+            name="currency",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="block_currencies",
+                to="app.currency",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="block",
+            name="provider",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="block_providers",
+                to="app.provider",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="block",
+            name="stored_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="currency",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"),
+                name="currency_name_upper_idx",
+            ),
+        ),
+        AddPostgresIndex(
+            model_name="provider",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="provider_name_trgm_idx",
+            ),
+        ),
+    ]
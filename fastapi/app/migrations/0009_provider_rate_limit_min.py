@@ -0,0 +1,24 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:15
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0008_block_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="provider",
+            name="rate_limit",
+            field=models.FloatField(
+                blank=True,
+                help_text="Max requests per second to provider, empty - unlimited",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.01)],
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.3 on 2026-10-18 14:02
+
+from django.contrib.postgres import operations
+from django.db import migrations
+
+
+# provider names are matched in memory (app.util.dimensions), nothing
+# queries them with icontains any more
+
+
+class RemovePostgresIndex(migrations.RemoveIndex):
+    # the index of 0008 exists on Postgres only
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class DropTrigramExtension(operations.TrigramExtension):
+    # TrigramExtension reversed
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f"Drops extension {self.name}"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0009_provider_rate_limit_min"),
+    ]
+
+    operations = [
+        RemovePostgresIndex(
+            model_name="provider",
+            name="provider_name_trgm_idx",
+        ),
+        DropTrigramExtension(),
+    ]
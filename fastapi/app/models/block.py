@@ -6,17 +6,20 @@ from ..models import Currency, Provider
 
 class Block(models.Model):
     block_number = models.IntegerField()
-    created_at = models.DateTimeField(db_index=True, null=True, blank=True)
-    stored_at = models.DateTimeField(db_index=True, auto_now=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    stored_at = models.DateTimeField(auto_now=True)
+    # foreign keys lead the composite indexes below, no separate index
     currency = models.ForeignKey(
         Currency,
         on_delete=models.PROTECT,
-        related_name="block_currencies"
+        related_name="block_currencies",
+        db_index=False,
     )
     provider = models.ForeignKey(
         Provider,
         on_delete=models.PROTECT,
-        related_name="block_providers"
+        related_name="block_providers",
+        db_index=False,
     )
 
     class Meta:
@@ -26,7 +29,26 @@ class Block(models.Model):
                 name="unique_currency_block_number"
             )
         ]
-        ordering = ["-created_at"]
+        indexes = [
+            # keyset pagination of the block list, (-created_at, -id) order
+            models.Index(
+                fields=["created_at", "id"], name="block_created_at_id_idx"
+            ),
+            # block list filtered by currency / provider id, newest first
+            models.Index(
+                fields=["currency", "-created_at", "-id"],
+                name="block_currency_created_idx",
+            ),
+            models.Index(
+                fields=["provider", "-created_at", "-id"],
+                name="block_provider_created_idx",
+            ),
+            # blocks stored per currency recently (poll schedule)
+            models.Index(
+                fields=["currency", "stored_at"], name="block_currency_stored_idx"
+            ),
+        ]
+        ordering = ["-created_at", "-id"]
 
     def __str__(self):
         return (f"{self.block_number} - {self.currency} - "
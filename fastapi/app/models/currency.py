@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 
@@ -10,6 +11,10 @@ class Currency(models.Model):
         verbose_name = _("currency")
         verbose_name_plural = _("currencies")
         ordering = ["name"]
+        indexes = [
+            # name__iexact, Django compares UPPER(name)
+            models.Index(Upper("name"), name="currency_name_upper_idx"),
+        ]
 
     def __str__(self):
         return self.name
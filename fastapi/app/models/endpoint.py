@@ -9,6 +9,9 @@ class Endpoint(models.Model):
     pattern_block = models.CharField(max_length=255, null=True, blank=True)
     pattern_timestamp = models.CharField(max_length=255, null=True, blank=True)
     header = models.CharField(max_length=255, null=True, blank=True)
+    # used to backfill missing blocks, {block_number} is replaced
+    block_url = models.CharField(max_length=255, null=True, blank=True)
+    pattern_block_timestamp = models.CharField(max_length=255, null=True, blank=True)
     currency = models.ForeignKey(
         Currency,
         on_delete=models.PROTECT,
@@ -19,6 +22,11 @@ class Endpoint(models.Model):
         on_delete=models.PROTECT,
         related_name="endpoint_providers"
     )
+    # maintained by the collector scheduler (app.util.schedule)
+    poll_interval = models.FloatField(null=True, blank=True, editable=False)
+    next_poll_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, editable=False
+    )
 
     class Meta:
         constraints = [
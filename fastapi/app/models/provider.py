@@ -1,3 +1,4 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -5,6 +6,21 @@ from django.utils.translation import gettext_lazy as _
 class Provider(models.Model):
     name = models.CharField(max_length=255, unique=True)
     api_key = models.CharField(max_length=512, null=True, blank=True)
+    max_concurrency = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text=_("Max simultaneous requests to provider, empty - unlimited"),
+    )
+    rate_limit = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0.01)],
+        help_text=_("Max requests per second to provider, empty - unlimited"),
+    )
+    rate_burst = models.PositiveSmallIntegerField(
+        default=1,
+        help_text=_("Requests allowed at once before rate limit applies"),
+    )
 
     def __str__(self):
         return f"{self.name}"
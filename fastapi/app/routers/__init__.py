@@ -4,3 +4,4 @@ from .currency import *
 from .block import *
 from .provider import *
 from .endpoint import *
+from .metrics import *
@@ -1,10 +1,24 @@
+import asyncio
+import json
 from typing import Optional, List
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Request, HTTPException, status, Depends, Query
-from asgiref.sync import sync_to_async
+from fastapi import (
+    APIRouter, Request, HTTPException, status, Depends, Query, WebSocket
+)
+from fastapi.responses import StreamingResponse
+from django.conf import settings
 from django.db import IntegrityError
+from django.db.models import QuerySet
 
 from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.util.broadcast import block_broadcaster
+from app.util.counts import block_counts
+from app.util.dimensions import dimension_cache
+from app.util.db import db_sync_to_async
+from app.util.pagination import (
+    PREV, NEXT, CursorError, decode_cursor, encode_cursor, keyset_page
+)
 from app.models import User, Currency, Block
 
 from app.schemas.block import (
@@ -28,11 +42,17 @@ block_router = APIRouter()
             "per page using `per_page`. <br/>"
             "The response includes details about the blocks, total pages, and total items, "
             "along with links to the previous and next pages if applicable.<br/>"
+            "Totals may be cached for a few seconds or estimated for the unfiltered list, "
+            "`total_exact` is true when they were counted for this response.<br/>"
+            "Deep pages are cheaper with `cursor`: pass `next_cursor` or `prev_cursor` "
+            "of a response to get the following or preceding blocks (`page` is ignored), "
+            "pages stay stable while new blocks arrive.<br/>"
             "Also it can be filtered (case-insensitive) by `currency name` "
             "or by `provider name` (partial match) or by `provider id`."
     )
 )
 async def get_blocks(
+        request: Request,
         currency_name: str = Query(
             "", title="Currency Name (case-insensitive)"
         ),
@@ -44,52 +64,115 @@ async def get_blocks(
         per_page: int = Query(
             10, ge=1, le=20, description="Number of items per page"
         ),
+        cursor: Optional[str] = Query(
+            None, description="next_cursor / prev_cursor of a previous response"
+        ),
         current_user: User = Depends(get_current_user),
 ) -> BlockListResponseSchema:
 
-    @sync_to_async
-    def get_filtered_blocks() -> list:
-        queryset = Block.objects.select_related("currency", "provider")
-        if currency_name:
-            queryset = queryset.filter(currency__name__iexact=currency_name)
-        if provider_name:
-            queryset = queryset.filter(provider__name__icontains=provider_name)
-        if provider_id:
-            queryset = queryset.filter(provider_id=provider_id)
-        queryset = queryset[offset:offset + per_page]
-        return list(queryset)
-
-    @sync_to_async
-    def get_total_count() -> int:
-        queryset = Block.objects.all()
-        if currency_name:
-            queryset = queryset.filter(currency__name__iexact=currency_name)
-        if provider_name:
-            queryset = queryset.filter(provider__name__icontains=provider_name)
+    def filtered(queryset: QuerySet) -> QuerySet:
+        # names resolved to ids up front, no joins
+        if currency_id is not None:
+            queryset = queryset.filter(currency_id=currency_id)
+        if provider_ids is not None:
+            queryset = queryset.filter(provider_id__in=provider_ids)
         if provider_id:
             queryset = queryset.filter(provider_id=provider_id)
-        return queryset.count()
+        return queryset
+
+    @db_sync_to_async
+    def get_filtered_blocks() -> tuple[list, bool]:
+        # one row more tells whether there is a next page
+        queryset = filtered(Block.objects.all())
+        rows = list(queryset[offset:offset + per_page + 1])
+        return rows[:per_page], len(rows) > per_page
+
+    @db_sync_to_async
+    def get_keyset_blocks() -> tuple[list, bool]:
+        return keyset_page(filtered(Block.objects.all()), position, per_page)
+
+    def link(**params) -> str:
+        params = {
+            "currency_name": currency_name,
+            "provider_name": provider_name,
+            "provider_id": provider_id,
+            "per_page": per_page,
+            **params,
+        }
+        query = urlencode({name: value for name, value in params.items() if value})
+        return f"{request.url.path}?{query}"
+
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    currency_id = provider_ids = None
+    if currency_name:
+        currency_id = await dimension_cache.acurrency_id(currency_name)
+    if provider_name:
+        provider_ids = sorted(await dimension_cache.aprovider_ids(provider_name))
+    if (currency_name and currency_id is None) or (provider_name and not provider_ids):
+        raise HTTPException(status_code=404, detail="No blocks found.")
 
     offset = (page - 1) * per_page
-    total_items = await get_total_count()
-    blocks = await get_filtered_blocks()
+    total_items, total_exact = await block_counts.acount(
+        filtered(Block.objects.all()),
+        {
+            "currency_id": currency_id,
+            "provider_ids": provider_ids,
+            "provider_id": provider_id,
+        },
+    )
+
+    if position is None:
+        blocks, has_next = await get_filtered_blocks()
+        has_prev = page > 1
+        # cached or estimated totals must not contradict the page,
+        # the last page knows the total
+        if not total_exact and has_next:
+            total_items = max(total_items, offset + len(blocks) + 1)
+        elif not total_exact and blocks:
+            total_items = offset + len(blocks)
+    else:
+        blocks, more = await get_keyset_blocks()
+        # a cursor always comes from a row on its other side
+        has_prev = more if position.direction == PREV else True
+        has_next = more if position.direction == NEXT else True
 
     if not blocks:
         raise HTTPException(status_code=404, detail="No blocks found.")
+    total_pages = (total_items + per_page - 1) // per_page
+
+    first, last = blocks[0], blocks[-1]
+    prev_cursor = next_cursor = None
+    if has_prev and first.created_at is not None:
+        prev_cursor = encode_cursor(first.created_at, first.id, PREV)
+    if has_next and last.created_at is not None:
+        next_cursor = encode_cursor(last.created_at, last.id, NEXT)
+
+    if position is None:
+        prev_page = link(page=page - 1) if has_prev else None
+        next_page = link(page=page + 1) if has_next else None
+    else:
+        prev_page = link(cursor=prev_cursor) if prev_cursor else None
+        next_page = link(cursor=next_cursor) if next_cursor else None
 
     blocks_list = [
         BlockListItemSchema.model_validate(block) for block in blocks
     ]
-    total_pages = (total_items + per_page - 1) // per_page
 
     response = BlockListResponseSchema(
         blocks=blocks_list,
-        prev_page=f"/health/?page={page - 1}"
-                  f"&per_page={per_page}" if page > 1 else None,
-        next_page=f"/health/?page={page + 1}"
-                  f"&per_page={per_page}" if page < total_pages else None,
+        prev_page=prev_page,
+        next_page=next_page,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
         total_pages=total_pages,
         total_items=total_items,
+        total_exact=total_exact,
     )
     return response
 
@@ -114,13 +197,11 @@ async def get_block(
         current_user: User = Depends(get_current_user),
 ) -> BlockDetailSchema:
 
-    @sync_to_async
-    def get_block_by_criteria() -> BlockDetailSchema:
+    @db_sync_to_async
+    def get_block_by_criteria() -> Block:
         if block_id:
             try:
-                return Block.objects.select_related(
-                    "currency", "provider"
-                ).get(id=block_id)
+                return Block.objects.get(id=block_id)
             except Block.DoesNotExist:
                 raise HTTPException(
                     status_code=404,
@@ -129,10 +210,9 @@ async def get_block(
 
         if currency_name and block_number is not None:
             try:
-                return Block.objects.select_related(
-                    "currency", "provider"
-                ).get(
-                    currency__name__iexact=currency_name,
+                # unknown currency (currency_id None) matches no block
+                return Block.objects.get(
+                    currency_id=currency_id,
                     block_number=block_number
                 )
             except Block.DoesNotExist:
@@ -147,5 +227,91 @@ async def get_block(
             detail="Provide either block_id or currency_name with block_number"
         )
 
+    currency_id = None
+    if not block_id and currency_name:
+        currency_id = await dimension_cache.acurrency_id(currency_name)
     block = await get_block_by_criteria()
-    return BlockDetailSchema.model_validate(block)
+    return BlockDetailSchema(
+        id=block.id,
+        block_number=block.block_number,
+        created_at=block.created_at,
+        stored_at=block.stored_at,
+        currency=await dimension_cache.acurrency(block.currency_id),
+        provider=await dimension_cache.aprovider(block.provider_id),
+    )
+
+
+@block_router.get(
+    "/stream/",
+    summary="Stream of new blocks (server-sent events)",
+    description=(
+            "<h3>Push every block as soon as the collector stores it.</h3>"
+            "`text/event-stream` with one `block` event per block "
+            "(`block number`, `creation date/time`, `stored date/time`, `currency`, `provider`). <br/>"
+            "Optionally limited to some currencies by repeating `currency_name` (case-insensitive). "
+            "A comment line is sent when there were no blocks for a while."
+    )
+)
+async def stream_blocks(
+        request: Request,
+        currency_name: List[str] = Query(
+            [], title="Currency Names (repeatable, case-insensitive)"
+        ),
+        current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+
+    async def events():
+        async with block_broadcaster.subscribe(set(currency_name)) as subscription:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.BLOCK_STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: block\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@block_router.websocket("/ws/")
+async def blocks_websocket(
+        websocket: WebSocket,
+        token: str = Query(..., title="Access token"),
+        currency_name: List[str] = Query(
+            [], title="Currency Names (repeatable, case-insensitive)"
+        ),
+) -> None:
+    """
+    Same blocks as /block/stream/, one JSON message per block.
+    Browsers can not set headers on WebSockets, so the token is a query parameter.
+    """
+    try:
+        await get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    async with block_broadcaster.subscribe(set(currency_name)) as subscription:
+        # the client sends nothing, reading only notices when it goes away
+        receive = asyncio.create_task(websocket.receive())
+        try:
+            while True:
+                event = asyncio.create_task(subscription.get())
+                await asyncio.wait({event, receive}, return_when=asyncio.FIRST_COMPLETED)
+                if event.done():
+                    await websocket.send_json(event.result())
+                else:
+                    event.cancel()
+                if receive.done():
+                    if receive.result()["type"] == "websocket.disconnect":
+                        break
+                    receive = asyncio.create_task(websocket.receive())
+        finally:
+            receive.cancel()
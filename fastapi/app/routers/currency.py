@@ -1,10 +1,11 @@
 from typing import Optional, List
 
 from fastapi import APIRouter, Request, HTTPException, status, Depends
-from asgiref.sync import sync_to_async
 from django.db import IntegrityError
 
 from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.util.db import db_sync_to_async
+from app.util.responses import CURRENCIES, response_cache
 from app.models import User, Currency
 from app.schemas.currency import (
     CurrencyListItemSchema,
@@ -25,17 +26,21 @@ currency_router = APIRouter()
     ),
 )
 async def get_currencies(
+        request: Request,
         current_user: User = Depends(get_current_user)
 ) -> List[CurrencyListItemSchema]:
-    currencies = await sync_to_async(list)(Currency.objects.all())
-    if not currencies:
-        raise HTTPException(status_code=404, detail="No currencies found.")
 
-    currencies_list = [
-        CurrencyListItemSchema.model_validate(currency)
-        for currency in currencies
-    ]
-    return currencies_list
+    async def build() -> List[CurrencyListItemSchema]:
+        currencies = await db_sync_to_async(list)(Currency.objects.all())
+        if not currencies:
+            raise HTTPException(status_code=404, detail="No currencies found.")
+
+        return [
+            CurrencyListItemSchema.model_validate(currency)
+            for currency in currencies
+        ]
+
+    return await response_cache.aget(CURRENCIES, request, build)
 
 
 @currency_router.post(
@@ -53,7 +58,7 @@ async def create_currency(
         current_user: User = Depends(get_current_admin_user),
 ) -> CurrencyListItemSchema:
     try:
-        currency = await sync_to_async(Currency.objects.create)(name=data.name)
+        currency = await db_sync_to_async(Currency.objects.create)(name=data.name)
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
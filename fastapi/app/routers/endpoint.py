@@ -1,10 +1,11 @@
 from typing import Optional, List
 
 from fastapi import APIRouter, Request, HTTPException, status, Depends
-from asgiref.sync import sync_to_async
 from django.db import IntegrityError
 
 from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.util.db import db_sync_to_async
+from app.util.responses import ENDPOINTS, response_cache
 from app.models import User, Endpoint, Currency, Provider
 from app.schemas.endpoint import (
     EndpointListItemSchema,
@@ -28,10 +29,11 @@ endpoint_router = APIRouter()
     )
 )
 async def endpoints(
+        request: Request,
         current_user: User = Depends(get_current_user)
 ) -> List[EndpointListItemSchema]:
 
-    @sync_to_async
+    @db_sync_to_async
     def fetch_endpoints():
         endpoints = Endpoint.objects.select_related(
             "currency", "provider"
@@ -41,8 +43,7 @@ async def endpoints(
             for endpoint in endpoints
         ]
 
-    endpoint_list = await fetch_endpoints()
-    return endpoint_list
+    return await response_cache.aget(ENDPOINTS, request, fetch_endpoints)
 
 
 @endpoint_router.get(
@@ -54,14 +55,16 @@ async def endpoints(
             "Authorized users retrieve all details of endpoint, such as: <br>"
             "`url link`, `currency`, `provider`, `header` (string), "
             "`pattern_block` (pattern to get block number from nested dicts),"
-            "`pattern_timestamp` (pattern to get timestamp from nested dicts)"
+            "`pattern_timestamp` (pattern to get timestamp from nested dicts), "
+            "`block_url` (url of one block for backfill, `{block_number}` is replaced), "
+            "`pattern_block_timestamp` (pattern to get timestamp from block_url response)"
     )
 )
 async def get_endpoint_detail(
         endpoint_id: int,
         current_user: User = Depends(get_current_admin_user)
 ) -> EndpointDetailSchema:
-    @sync_to_async
+    @db_sync_to_async
     def get_endpoint_id():
         try:
             return Endpoint.objects.select_related(
@@ -83,7 +86,9 @@ async def get_endpoint_detail(
             "Only admin users update all details of endpoint, such as"
             "`url link`, `currency`, `provider`, `header` (string), "
             "`pattern_block` (pattern to get block number from nested dicts),"
-            "`pattern_timestamp` (pattern to get timestamp from nested dicts)"
+            "`pattern_timestamp` (pattern to get timestamp from nested dicts), "
+            "`block_url` (url of one block for backfill, `{block_number}` is replaced), "
+            "`pattern_block_timestamp` (pattern to get timestamp from block_url response)"
     )
 )
 async def patch_endpoint(
@@ -91,7 +96,7 @@ async def patch_endpoint(
         data: EndpointUpdateSchema,
         current_user: User = Depends(get_current_admin_user)
 ) -> EndpointDetailSchema:
-    @sync_to_async
+    @db_sync_to_async
     def update_endpoint() -> EndpointDetailSchema:
         try:
             endpoint = Endpoint.objects.select_related(
@@ -106,6 +111,10 @@ async def patch_endpoint(
                 endpoint.pattern_timestamp = data.pattern_timestamp
             if data.header is not None:
                 endpoint.header = data.header
+            if data.block_url is not None:
+                endpoint.block_url = data.block_url
+            if data.pattern_block_timestamp is not None:
+                endpoint.pattern_block_timestamp = data.pattern_block_timestamp
             if data.currency_id is not None:
                 currency = Currency.objects.get(id=data.currency_id)
                 endpoint.currency = currency
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from asgiref.sync import sync_to_async
+
+from app.util.metrics import exposition
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Collector metrics",
+    description=(
+        "<h3>Collector metrics in Prometheus text format.</h3>"
+        "Merged from the snapshots the collector processes write to `METRICS_DIR`."
+    ),
+)
+async def get_metrics() -> PlainTextResponse:
+    # reading snapshot files does not need the thread of the ORM
+    content = await sync_to_async(exposition, thread_sensitive=False)()
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4")
@@ -1,9 +1,10 @@
 from typing import Optional, List
 
 from fastapi import APIRouter, Request, HTTPException, status, Depends
-from asgiref.sync import sync_to_async
 
 from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.util.db import db_sync_to_async
+from app.util.responses import PROVIDERS, response_cache
 from app.models import User, Provider
 from app.schemas.provider import ProviderListItemSchema
 
@@ -21,14 +22,18 @@ provider_router = APIRouter()
     )
 )
 async def get_providers(
+        request: Request,
         current_user: User = Depends(get_current_user)
 ) -> List[ProviderListItemSchema]:
-    providers = await sync_to_async(list)(Provider.objects.all())
-    if not providers:
-        raise HTTPException(status_code=404, detail="No providers found.")
-
-    providers_list = [
-        ProviderListItemSchema.model_validate(provider)
-        for provider in providers
-    ]
-    return providers_list
+
+    async def build() -> List[ProviderListItemSchema]:
+        providers = await db_sync_to_async(list)(Provider.objects.all())
+        if not providers:
+            raise HTTPException(status_code=404, detail="No providers found.")
+
+        return [
+            ProviderListItemSchema.model_validate(provider)
+            for provider in providers
+        ]
+
+    return await response_cache.aget(PROVIDERS, request, build)
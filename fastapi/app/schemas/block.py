@@ -27,6 +27,14 @@ class BlockDetailSchema(BlockBaseSchema):
     }
 
 
+class BlockEventSchema(BlockBaseSchema):
+    """
+    Block pushed to stream clients right after the collector stored it.
+    """
+    currency: CurrencyListItemSchema
+    provider: ProviderListItemSchema
+
+
 class BlockListItemSchema(BlockBaseSchema):
     id: int
 
@@ -39,5 +47,8 @@ class BlockListResponseSchema(BaseModel):
     blocks: List[BlockListItemSchema]
     prev_page: Optional[str]
     next_page: Optional[str]
+    prev_cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
     total_pages: int
     total_items: int
+    total_exact: bool = True
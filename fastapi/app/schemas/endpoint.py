@@ -13,6 +13,8 @@ class EndpointDetailSchema(BaseModel):
     pattern_block: Optional[str]
     pattern_timestamp: Optional[str]
     header: Optional[str]
+    block_url: Optional[str]
+    pattern_block_timestamp: Optional[str]
     currency: CurrencyListItemSchema
     provider: ProviderListItemSchema
 
@@ -36,5 +38,7 @@ class EndpointUpdateSchema(BaseModel):
     pattern_block: Optional[str] = None
     pattern_timestamp: Optional[str] = None
     header: Optional[str] = None
+    block_url: Optional[str] = None
+    pattern_block_timestamp: Optional[str] = None
     currency_id: Optional[int] = None
     provider_id: Optional[int] = None
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.models import Block, Currency, Endpoint, Provider
+from app.util.counts import VERSION as BLOCK_COUNTS_VERSION
+from app.util.dimensions import DimensionCache
+from app.util.heads import HeadCache, head_cache
+from app.util.registry import EndpointRegistry
+from app.util.responses import ResponseCache
+from app.util.versions import bump_version
+
+
+@receiver(post_save, sender=Endpoint)
+@receiver(post_delete, sender=Endpoint)
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def endpoints_changed(sender, **kwargs) -> None:
+    """
+    Any change of endpoint configuration (admin, API, loaddata)
+    makes collector registries reload after the commit.
+    """
+    transaction.on_commit(EndpointRegistry.changed)
+
+
+@receiver(post_save, sender=Endpoint)
+@receiver(post_delete, sender=Endpoint)
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def responses_changed(sender, **kwargs) -> None:
+    """
+    Cached list responses built from the changed model
+    are stale in all API processes after the commit.
+    """
+    model_name = sender._meta.model_name
+    transaction.on_commit(lambda: ResponseCache.changed(model_name))
+
+
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def dimensions_changed(sender, **kwargs) -> None:
+    """
+    Currencies and providers changed anywhere make the
+    dimension caches of API processes reload after the commit.
+    """
+    transaction.on_commit(DimensionCache.changed)
+
+
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=Block)
+def blocks_changed(sender, instance, **kwargs) -> None:
+    """
+    Blocks edited or deleted outside the collector (admin, API)
+    make the head caches of all collectors reload after the commit
+    and cached counts expire.
+    """
+    head_cache.forget(instance.currency_id)
+    transaction.on_commit(HeadCache.changed)
+    transaction.on_commit(lambda: bump_version(BLOCK_COUNTS_VERSION))
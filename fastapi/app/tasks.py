@@ -1,17 +1,86 @@
 import asyncio
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
 
-from app.util.collect import collect_all
+from app.util.collect import claim_due, collect_all, collect_due, collect_ids
+from app.util.registry import EndpointConfig, endpoint_registry
+from app.util.shard import partition
 
 from logging import getLogger
 
 
 logger = getLogger(__name__)
 
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_in_worker_loop(coro):
+    """
+    Run coroutine on the event loop of this worker process.
+    The loop outlives the task, so pooled HTTP connections
+    are reused by the next collection cycle.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+def sharded() -> bool:
+    return settings.COLLECTOR_SHARD_BY != "none"
+
+
+def dispatch_shards(endpoints: list[EndpointConfig]) -> dict:
+    """
+    Fan the endpoints out to task_collect_shard sub-tasks on the default
+    queue, task_collect_summary aggregates their results.
+    """
+    chunks = partition(
+        endpoints,
+        settings.COLLECTOR_SHARD_BY,
+        settings.COLLECTOR_SHARD_SIZE,
+        settings.COLLECTOR_SHARD_COUNT,
+    )
+    if not chunks:
+        return {"shards": 0}
+    result = chord(task_collect_shard.s(endpoint_ids) for endpoint_ids in chunks)(
+        task_collect_summary.s()
+    )
+    return {"shards": len(chunks), "chord_id": result.id}
+
 
 @shared_task
-def task_collect_all() -> list[dict[int, str | None]]:
-    result = asyncio.run(collect_all())
+def task_collect_all() -> list[dict[int, str | None]] | dict:
+    if sharded():
+        return dispatch_shards(run_in_worker_loop(endpoint_registry.aget_all()))
+    result = run_in_worker_loop(collect_all())
     logger.info(result)
     return result
+
+
+@shared_task
+def task_collect_due() -> list[dict[int, str | None]] | dict:
+    if sharded():
+        return dispatch_shards(run_in_worker_loop(claim_due()))
+    result = run_in_worker_loop(collect_due())
+    if result:
+        logger.info(result)
+    return result
+
+
+@shared_task
+def task_collect_shard(endpoint_ids: list[int]) -> list[dict[int, str | None]]:
+    return run_in_worker_loop(collect_ids(endpoint_ids))
+
+
+@shared_task
+def task_collect_summary(shard_results: list[list[dict]]) -> dict:
+    results = [result for shard in shard_results for result in shard]
+    summary = {
+        "shards": len(shard_results),
+        "endpoints": len(results),
+        "added": sum(1 for result in results for value in result.values() if value),
+    }
+    logger.info(summary)
+    return summary
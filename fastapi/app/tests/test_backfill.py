@@ -0,0 +1,152 @@
+from io import StringIO
+
+import httpx
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from app.models import Block, Currency, Endpoint, Provider
+from app.util.backfill import block_url, find_gaps, missing_heights
+from app.util.breaker import breakers
+from app.util.http import client_registry
+
+
+class BlockUrlTests(SimpleTestCase):
+    def test_replaces_block_number(self):
+        self.assertEqual(
+            block_url("https://api.test/block/{block_number}", 42),
+            "https://api.test/block/42",
+        )
+
+    def test_keeps_other_braces(self):
+        self.assertEqual(
+            block_url('https://api.test/{apikey}/block?q={"n": {block_number}}', 7),
+            'https://api.test/{apikey}/block?q={"n": 7}',
+        )
+        self.assertEqual(
+            block_url("https://api.test/{}/{0}", 1), "https://api.test/{}/{0}"
+        )
+
+
+class FindGapsTests(TestCase):
+    def setUp(self):
+        provider = Provider.objects.create(name="test")
+        self.first = Currency.objects.create(name="FIRST")
+        self.second = Currency.objects.create(name="SECOND")
+        for currency, numbers in (
+            (self.first, (1, 2, 5, 6, 10)),
+            (self.second, (3, 7)),
+        ):
+            for number in numbers:
+                Block.objects.create(
+                    block_number=number, currency=currency, provider=provider
+                )
+        self.ids = [self.first.id, self.second.id]
+
+    def test_gaps_between_stored_blocks(self):
+        self.assertEqual(
+            find_gaps(self.ids),
+            [(self.first.id, 7, 9), (self.first.id, 3, 4), (self.second.id, 4, 6)],
+        )
+
+    def test_low_adds_the_range_below(self):
+        self.assertEqual(
+            find_gaps([self.first.id], low=0),
+            [(self.first.id, 7, 9), (self.first.id, 3, 4), (self.first.id, 0, 0)],
+        )
+        # the first block at or above low is compared with low
+        self.assertEqual(
+            find_gaps([self.first.id], low=4),
+            [(self.first.id, 7, 9), (self.first.id, 4, 4)],
+        )
+
+    def test_high(self):
+        self.assertEqual(find_gaps([self.first.id], high=6), [(self.first.id, 3, 4)])
+
+    def test_missing_heights_newest_first(self):
+        gaps = find_gaps([self.first.id])
+        self.assertEqual(list(missing_heights(gaps)), [9, 8, 7, 4, 3])
+
+
+@override_settings(COLLECTOR_RETRIES=0)
+class BackfillCommandTests(TransactionTestCase):
+    """
+    backfill_blocks against a mock provider; DB calls run in threads,
+    so rows are committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.provider = Provider.objects.create(name="test")
+        self.currency = Currency.objects.create(name="TST")
+        Endpoint.objects.create(
+            url="http://provider.test/stats",
+            pattern_block="height",
+            pattern_timestamp="time",
+            block_url="http://provider.test/block/{block_number}",
+            pattern_block_timestamp="time",
+            currency=self.currency,
+            provider=self.provider,
+        )
+        for number in (1, 5, 10):
+            Block.objects.create(
+                block_number=number, currency=self.currency, provider=self.provider
+            )
+        self.failing = {7}
+        self.requested = []
+        client_registry.transport = httpx.MockTransport(self.handler)
+
+    def tearDown(self):
+        client_registry.transport = None
+        breakers._breakers.pop(self.provider.id, None)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        number = int(request.url.path.rsplit("/", 1)[1])
+        self.requested.append(number)
+        if number in self.failing:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"time": 1_700_000_000 + number * 600})
+
+    def backfill(self, *args: str) -> str:
+        stdout = StringIO()
+        call_command("backfill_blocks", "--currency", "tst", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def stored(self) -> list[int]:
+        return sorted(
+            Block.objects.filter(currency=self.currency).values_list(
+                "block_number", flat=True
+            )
+        )
+
+    def test_batches_and_resume(self):
+        output = self.backfill("--batch-size", "3")
+        self.assertIn("TST: 7 missing blocks in 2 gaps", output)
+        # 7 fails
+        self.assertIn("requested 3, fetched 2, stored 2 (total 2)", output)
+        self.assertIn("requested 3, fetched 3, stored 3 (total 5)", output)
+        self.assertIn("requested 1, fetched 1, stored 1 (total 6)", output)
+        self.assertEqual(self.requested, [9, 8, 7, 6, 4, 3, 2])
+        self.assertEqual(self.stored(), [1, 2, 3, 4, 5, 6, 8, 9, 10])
+        block = Block.objects.get(currency=self.currency, block_number=9)
+        self.assertEqual(block.created_at.timestamp(), 1_700_000_000 + 9 * 600)
+
+        # interrupted or failed blocks are fetched by the next run
+        self.failing = set()
+        self.requested = []
+        output = self.backfill()
+        self.assertIn("TST: 1 missing blocks in 1 gaps", output)
+        self.assertEqual(self.requested, [7])
+        self.assertEqual(self.stored(), list(range(1, 11)))
+
+        self.assertIn("TST: 0 missing blocks", self.backfill())
+
+    def test_range_and_limit(self):
+        self.backfill("--from-block", "0", "--to-block", "5", "--limit", "2")
+        self.assertEqual(self.requested, [4, 3])
+        self.assertEqual(self.stored(), [1, 3, 4, 5, 10])
+
+    def test_unknown_currency(self):
+        with self.assertRaises(CommandError):
+            call_command("backfill_blocks", "--currency", "nope", stdout=StringIO())
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from fastapi.testclient import TestClient
+
+from app.dependencies.auth import get_current_user
+from app.models import Block, Currency, Provider, User
+from config.asgi import fastapi_app
+
+
+@override_settings(BLOCK_COUNT_ESTIMATE=True, BLOCK_COUNT_ESTIMATE_MIN=0)
+class BlockPagesTests(TransactionTestCase):
+    """
+    Pages of the block list; DB calls run in threads, so rows are committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        currency = Currency.objects.create(name="TST")
+        provider = Provider.objects.create(name="test")
+        at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        Block.objects.bulk_create(
+            Block(
+                block_number=number,
+                currency=currency,
+                provider=provider,
+                created_at=at + timedelta(seconds=number),
+            )
+            for number in range(25)
+        )
+        fastapi_app.dependency_overrides[get_current_user] = lambda: User()
+        self.addCleanup(fastapi_app.dependency_overrides.clear)
+        self.client = TestClient(fastapi_app)
+
+    def page(self, number: int, estimate: int) -> dict:
+        with mock.patch("app.util.counts.estimate_blocks", return_value=estimate):
+            response = self.client.get(f"/block/blocks/?per_page=10&page={number}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_estimate_too_low(self):
+        page = self.page(2, estimate=12)
+        self.assertIsNotNone(page["next_page"])
+        self.assertEqual(page["total_pages"], 3)
+        self.assertFalse(page["total_exact"])
+
+    def test_estimate_too_high(self):
+        page = self.page(3, estimate=1000)
+        self.assertEqual(len(page["blocks"]), 5)
+        self.assertIsNone(page["next_page"])
+        self.assertEqual(page["total_items"], 25)
+        self.assertEqual(page["total_pages"], 3)
+
+    def test_estimate_exact(self):
+        page = self.page(2, estimate=25)
+        self.assertIsNotNone(page["next_page"])
+        self.assertEqual(page["total_pages"], 3)
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from app.util.breaker import CircuitBreaker, breakers
+from app.util.collect import _fetch, _read_json
+from app.util.http import client_registry
+from app.util.throttle import ProviderThrottle
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def breaker(self, threshold: int = 3) -> CircuitBreaker:
+        return CircuitBreaker(threshold=threshold, recovery=1.0, max_recovery=60.0)
+
+    def half_open(self, breaker: CircuitBreaker) -> None:
+        for _ in range(breaker.threshold):
+            breaker.failure()
+        breaker.open_until = time.monotonic() - 1
+
+    def test_opens_at_threshold(self):
+        breaker = self.breaker()
+        breaker.failure()
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_failures(self):
+        breaker = self.breaker()
+        breaker.failure()
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failures_while_open_are_ignored(self):
+        breaker = self.breaker()
+        for _ in range(10):
+            breaker.failure()
+        self.assertEqual(breaker.opens, 1)
+        self.assertLessEqual(breaker.snapshot()["retry_in"], 1.0)
+
+    def test_half_open_allows_one_probe(self):
+        breaker = self.breaker()
+        self.half_open(breaker)
+        self.assertEqual([breaker.allow() for _ in range(3)], [True, False, False])
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_probe_success_closes(self):
+        breaker = self.breaker()
+        self.half_open(breaker)
+        breaker.allow()
+        breaker.success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.opens, 0)
+        self.assertTrue(breaker.allow())
+
+    def test_probe_failure_reopens_with_longer_recovery(self):
+        breaker = self.breaker()
+        self.half_open(breaker)
+        breaker.allow()
+        with mock.patch("app.util.breaker.random.uniform", return_value=1.0):
+            breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.opens, 2)
+        self.assertAlmostEqual(breaker.open_until - time.monotonic(), 2.0, delta=0.1)
+
+    def test_cancelled_probe_allows_another(self):
+        breaker = self.breaker()
+        self.half_open(breaker)
+        breaker.allow()
+        breaker.cancelled(probe=True)
+        self.assertTrue(breaker.allow())
+
+    def test_cancelled_request_keeps_probe(self):
+        breaker = self.breaker()
+        # allowed while closed, still in flight when the probe is sent
+        self.assertTrue(breaker.allow())
+        self.half_open(breaker)
+        self.assertTrue(breaker.allow())
+        breaker.cancelled(probe=False)
+        self.assertFalse(breaker.allow())
+
+    def test_recovery_is_capped(self):
+        breaker = CircuitBreaker(threshold=1, recovery=1.0, max_recovery=4.0)
+        with mock.patch("app.util.breaker.random.uniform", return_value=1.0):
+            for _ in range(6):
+                breaker.open_until = time.monotonic() - 1
+                breaker.allow()
+                breaker.failure()
+        self.assertAlmostEqual(breaker.open_until - time.monotonic(), 4.0, delta=0.1)
+
+
+@override_settings(COLLECTOR_RETRIES=0)
+class FetchBreakerTests(SimpleTestCase):
+    """
+    Every result of a half-open probe settles the breaker.
+    """
+
+    PROVIDER_ID = -1
+
+    def setUp(self):
+        breakers._breakers.pop(self.PROVIDER_ID, None)
+        self.breaker = breakers.get(self.PROVIDER_ID)
+        for _ in range(self.breaker.threshold):
+            self.breaker.failure()
+        self.breaker.open_until = time.monotonic() - 1
+
+    def tearDown(self):
+        breakers._breakers.pop(self.PROVIDER_ID, None)
+        client_registry.transport = None
+
+    def fetch(self, handler) -> object:
+        client_registry.transport = httpx.MockTransport(handler)
+
+        async def run():
+            try:
+                return await _fetch(
+                    "http://provider.test/stats",
+                    _read_json,
+                    provider_id=self.PROVIDER_ID,
+                )
+            finally:
+                await client_registry.aclose()
+
+        return asyncio.run(run())
+
+    def test_invalid_json_probe_closes(self):
+        result = self.fetch(lambda request: httpx.Response(200, content=b"<html>"))
+        self.assertIsNone(result)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_server_error_probe_reopens(self):
+        result = self.fetch(lambda request: httpx.Response(503))
+        self.assertIsNone(result)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_unexpected_error_probe_allows_another(self):
+        def handler(request):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.fetch(handler)
+        self.assertTrue(self.breaker.allow())
+
+    def test_valid_probe_closes(self):
+        result = self.fetch(lambda request: httpx.Response(200, json={"height": 1}))
+        self.assertEqual(result, {"height": 1})
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+@override_settings(COLLECTOR_RETRIES=2, COLLECTOR_RETRY_BACKOFF=0.001)
+class FetchRetryTests(SimpleTestCase):
+    PROVIDER_ID = -2
+
+    def setUp(self):
+        breakers._breakers.pop(self.PROVIDER_ID, None)
+
+    def tearDown(self):
+        breakers._breakers.pop(self.PROVIDER_ID, None)
+        client_registry.transport = None
+
+    def test_every_attempt_waits_for_the_throttle(self):
+        sent = []
+
+        def handler(request):
+            sent.append(time.monotonic())
+            return httpx.Response(503)
+
+        client_registry.transport = httpx.MockTransport(handler)
+
+        async def run():
+            throttle = ProviderThrottle(None, 20.0, 1)
+            try:
+                return await _fetch(
+                    "http://provider.test/stats",
+                    _read_json,
+                    provider_id=self.PROVIDER_ID,
+                    throttle=throttle,
+                )
+            finally:
+                await client_registry.aclose()
+
+        self.assertIsNone(asyncio.run(run()))
+        self.assertEqual(len(sent), 3)
+        # 20 requests per second
+        gaps = [later - earlier for earlier, later in zip(sent, sent[1:])]
+        self.assertGreaterEqual(min(gaps), 0.04)
+
+    def test_cancelled_probe_retry_allows_another(self):
+        breaker = breakers.get(self.PROVIDER_ID)
+
+        def handler(request):
+            # the next attempt is the half-open probe
+            breaker.state = CircuitBreaker.OPEN
+            breaker.open_until = time.monotonic() - 1
+            return httpx.Response(503)
+
+        client_registry.transport = httpx.MockTransport(handler)
+
+        async def run():
+            task = asyncio.create_task(
+                _fetch(
+                    "http://provider.test/stats",
+                    _read_json,
+                    provider_id=self.PROVIDER_ID,
+                )
+            )
+            # cancelled during the backoff before the probe
+            with mock.patch("app.util.collect.backoff", return_value=10):
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+            await client_registry.aclose()
+
+        asyncio.run(run())
+        self.assertTrue(breaker.allow())
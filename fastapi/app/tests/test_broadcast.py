@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.models import User
+from app.routers.block import stream_blocks
+from app.util.broadcast import Subscription, block_broadcaster
+from config.asgi import fastapi_app
+
+
+def event(number: int, currency: str) -> dict:
+    return {
+        "block_number": number,
+        "currency": {"id": 1, "name": currency},
+        "provider": {"id": 1, "name": "test"},
+    }
+
+
+async def current_user(token: str) -> User:
+    if token != "valid":
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return User()
+
+
+class SubscriptionTests(SimpleTestCase):
+    def test_currency_filter_is_case_insensitive(self):
+        async def run():
+            subscription = Subscription({"btc"}, size=10)
+            return [subscription.wants(event(1, name)) for name in ("BTC", "ETH")]
+
+        self.assertEqual(asyncio.run(run()), [True, False])
+
+    def test_slow_client_loses_oldest_events(self):
+        async def run():
+            subscription = Subscription(None, size=2)
+            for number in range(3):
+                subscription.put(event(number, "BTC"))
+            return [(await subscription.get())["block_number"] for _ in range(2)]
+
+        self.assertEqual(asyncio.run(run()), [1, 2])
+
+
+@override_settings(BLOCK_STREAM_URL="")
+@mock.patch("app.routers.block.get_current_user", current_user)
+class BlocksWebSocketTests(SimpleTestCase):
+    def setUp(self):
+        self.client = TestClient(fastapi_app)
+
+    def wait_for_subscribers(self, count: int) -> None:
+        deadline = time.monotonic() + 2
+        while block_broadcaster.subscribers != count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_blocks_of_requested_currencies(self):
+        with self.client.websocket_connect(
+            "/block/ws/?token=valid&currency_name=btc"
+        ) as websocket:
+            self.wait_for_subscribers(1)
+            block_broadcaster.publish([event(1, "ETH"), event(2, "BTC")])
+            self.assertEqual(websocket.receive_json()["block_number"], 2)
+        self.wait_for_subscribers(0)
+
+    def test_invalid_token_is_rejected(self):
+        with self.assertRaises(WebSocketDisconnect) as context:
+            with self.client.websocket_connect("/block/ws/?token=invalid"):
+                pass
+        self.assertEqual(context.exception.code, 1008)
+        self.assertEqual(block_broadcaster.subscribers, 0)
+
+
+@override_settings(BLOCK_STREAM_URL="", BLOCK_STREAM_HEARTBEAT=0.05)
+class StreamBlocksTests(SimpleTestCase):
+    def test_events_and_keep_alive(self):
+        class Request:
+            checks = 0
+
+            async def is_disconnected(self):
+                self.checks += 1
+                return self.checks > 3
+
+        async def run():
+            response = await stream_blocks(
+                Request(), currency_name=["BTC"], current_user=User()
+            )
+            chunks = response.body_iterator
+            first = await chunks.__anext__()
+            block_broadcaster.publish([event(1, "ETH"), event(2, "BTC")])
+            rest = [chunk async for chunk in chunks]
+            return response, [first, *rest]
+
+        response, chunks = asyncio.run(run())
+        self.assertEqual(response.media_type, "text/event-stream")
+        # nothing, the block, nothing until the client went away
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([chunks[0], chunks[2]], [": keep-alive\n\n"] * 2)
+        name, data = chunks[1].strip().split("\n")
+        self.assertEqual(name, "event: block")
+        self.assertEqual(json.loads(data.removeprefix("data: ")), event(2, "BTC"))
+        self.assertEqual(block_broadcaster.subscribers, 0)
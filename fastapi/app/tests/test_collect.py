@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from app.util.collect import _fetch, _read_json, fetch_fields
+from app.util.conditional import NOT_MODIFIED, conditional_cache
+from app.util.extract import compile_pattern
+from app.util.http import client_registry
+
+
+URL = "http://provider.test/stats"
+HEADERS = {"ETag": '"a"', "Last-Modified": "Wed, 01 May 2024 12:30:00 GMT"}
+
+
+class ConditionalFetchTests(SimpleTestCase):
+    """
+    Validators are kept only for responses whose body was used.
+    """
+
+    ENDPOINT_ID = -1
+
+    def setUp(self):
+        conditional_cache._states.pop(self.ENDPOINT_ID, None)
+        self.requests = []
+
+    def tearDown(self):
+        conditional_cache._states.pop(self.ENDPOINT_ID, None)
+        client_registry.transport = None
+
+    def run_fetches(self, responses: list[httpx.Response], fetch) -> list:
+        responses = iter(responses)
+
+        def handler(request):
+            self.requests.append(request)
+            return next(responses)
+
+        client_registry.transport = httpx.MockTransport(handler)
+
+        async def run():
+            try:
+                return [await fetch() for _ in range(2)]
+            finally:
+                await client_registry.aclose()
+
+        return asyncio.run(run())
+
+    def fetch_json(self):
+        return _fetch(URL, _read_json, endpoint_id=self.ENDPOINT_ID)
+
+    def test_not_modified_after_valid_body(self):
+        results = self.run_fetches(
+            [
+                httpx.Response(200, json={"height": 1}, headers=HEADERS),
+                httpx.Response(304),
+            ],
+            self.fetch_json,
+        )
+        self.assertEqual(results, [{"height": 1}, NOT_MODIFIED])
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"a"')
+
+    def test_invalid_json_is_downloaded_again(self):
+        results = self.run_fetches(
+            [
+                httpx.Response(200, content=b"<html>", headers=HEADERS),
+                httpx.Response(200, json={"height": 1}, headers=HEADERS),
+            ],
+            self.fetch_json,
+        )
+        self.assertEqual(results, [None, {"height": 1}])
+        self.assertNotIn("If-None-Match", self.requests[1].headers)
+        self.assertNotIn("If-Modified-Since", self.requests[1].headers)
+
+    @override_settings(COLLECTOR_MAX_BODY_BYTES=8)
+    def test_too_large_body_is_downloaded_again(self):
+        body = {"pad": "x" * 100, "height": 1}
+        results = self.run_fetches(
+            [
+                httpx.Response(200, json=body, headers=HEADERS),
+                httpx.Response(200, json=body, headers=HEADERS),
+            ],
+            lambda: fetch_fields(
+                URL, [compile_pattern("height")], endpoint_id=self.ENDPOINT_ID
+            ),
+        )
+        self.assertEqual(results, [None, None])
+        self.assertNotIn("If-None-Match", self.requests[1].headers)
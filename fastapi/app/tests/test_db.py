@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.util import db
+
+
+class ReleaseConnectionsTests(SimpleTestCase):
+    def connection(self, max_age=0, pooled=False, errors=False, usable=True):
+        connection = mock.Mock(
+            settings_dict={"CONN_MAX_AGE": max_age},
+            errors_occurred=errors,
+            pooled=pooled,
+        )
+        connection.is_usable.return_value = usable
+        return connection
+
+    def release(self, connection) -> None:
+        with mock.patch.object(db.connections, "all", return_value=[connection]):
+            db._release_connections()
+
+    def test_kept_for_next_call(self):
+        connection = self.connection()
+        self.release(connection)
+        connection.close.assert_not_called()
+
+    def test_broken_connection_closed(self):
+        connection = self.connection(errors=True, usable=False)
+        self.release(connection)
+        connection.close.assert_called_once()
+
+    def test_usable_after_error_kept(self):
+        connection = self.connection(errors=True, usable=True)
+        self.release(connection)
+        connection.close.assert_not_called()
+
+    def test_max_age_honoured(self):
+        connection = self.connection(max_age=60)
+        self.release(connection)
+        connection.close_if_unusable_or_obsolete.assert_called_once()
+        connection.close.assert_not_called()
+
+    def test_pooled_connection_returned(self):
+        connection = self.connection(pooled=True)
+        self.release(connection)
+        connection.close.assert_called_once()
+
+    def test_unopened_connection_ignored(self):
+        connection = self.connection()
+        connection.connection = None
+        self.release(connection)
+        connection.close.assert_not_called()
+        connection.close_if_unusable_or_obsolete.assert_not_called()
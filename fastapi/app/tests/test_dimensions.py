@@ -0,0 +1,34 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from app.util.dimensions import DimensionCache
+
+
+@override_settings(DIMENSION_CACHE_TTL=300)
+class DimensionCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.tables = ([(1, "BTC")], [(1, "first")])
+        patcher = mock.patch.object(
+            DimensionCache, "_load", side_effect=lambda: self.tables
+        )
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dimensions = DimensionCache()
+
+    def test_block_rows_reload_on_miss(self):
+        asyncio.run(self.dimensions.aload())
+        # created by a process without the shared cache, just now
+        self.tables = ([(1, "BTC"), (2, "ETH")], [(1, "first"), (2, "second")])
+        currency = asyncio.run(self.dimensions.acurrency(2))
+        provider = asyncio.run(self.dimensions.aprovider(2))
+        self.assertEqual(currency.name, "ETH")
+        self.assertEqual(provider.name, "second")
+
+    def test_name_miss_reloads_at_most_every_interval(self):
+        asyncio.run(self.dimensions.aload())
+        self.assertIsNone(asyncio.run(self.dimensions.acurrency_id("ETH")))
+        self.assertEqual(self.load.call_count, 1)
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from app.management.commands.explain_block_queries import full_scans
+from app.models import Block, Currency, Provider
+
+
+class FullScansTests(SimpleTestCase):
+    def test_postgres_seq_scan(self):
+        plan = (
+            "Limit  (cost=0.00..0.31 rows=10 width=32)\n"
+            "  ->  Seq Scan on app_block  (cost=0.00..29.40 rows=940 width=32)"
+        )
+        self.assertEqual(full_scans(plan), ["app_block"])
+
+    def test_postgres_index_scan(self):
+        plan = (
+            "Limit  (cost=0.15..0.80 rows=10 width=32)\n"
+            "  ->  Index Scan Backward using block_created_at_id_idx on app_block"
+        )
+        self.assertEqual(full_scans(plan), [])
+
+    def test_sqlite_scan(self):
+        self.assertEqual(full_scans("3 0 0 SCAN app_block"), ["app_block"])
+
+    def test_sqlite_index_scan(self):
+        plan = "3 0 0 SCAN app_block USING INDEX block_created_at_id_idx"
+        self.assertEqual(full_scans(plan), [])
+
+    def test_sqlite_search(self):
+        plan = "3 0 0 SEARCH app_block USING INDEX block_currency_created_idx (currency_id=?)"
+        self.assertEqual(full_scans(plan), [])
+
+    def test_other_tables_ignored(self):
+        self.assertEqual(full_scans("Seq Scan on app_endpoint"), [])
+
+
+class ExplainBlockQueriesTests(TestCase):
+    """
+    Plans of the real database. On Postgres sequential scans are disabled
+    like in the command, so the tiny test tables still show index usage.
+    """
+
+    def setUp(self):
+        currency = Currency.objects.create(name="TST")
+        provider = Provider.objects.create(name="test")
+        Block.objects.create(
+            block_number=1,
+            currency=currency,
+            provider=provider,
+            created_at=timezone.now(),
+        )
+
+    def explain(self, queryset) -> str:
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+
+    def test_block_queries_use_indexes(self):
+        stdout = StringIO()
+        call_command("explain_block_queries", stdout=stdout)
+        self.assertNotIn("full scan", stdout.getvalue())
+        # provider names filter by the ids app.util.dimensions matched
+        self.assertIn("blocks page by provider ids: index", stdout.getvalue())
+
+    def test_query_without_index_is_reported(self):
+        plan = self.explain(Provider.objects.filter(rate_limit__gt=1).order_by())
+        self.assertEqual(full_scans(plan), ["app_provider"])
+
+    def test_no_blocks(self):
+        Block.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("explain_block_queries", stdout=StringIO())
@@ -0,0 +1,90 @@
+from django.test import SimpleTestCase
+
+from app.management.commands.bench_extract import build_payload, legacy_get_value
+from app.util.extract import WILDCARD, PatternError, compile_pattern, extract
+
+
+DATA = {
+    "data": {
+        "BTC": {"total_blocks": 800000, "first_block_timestamp": "2009-01-03"},
+        "list": [{"height": 1}, {"height": 2, "tx": [10, 20]}, {"time": 3}],
+        "key.with.dots": 4,
+        "7": "seven",
+    },
+}
+
+
+class PatternTests(SimpleTestCase):
+    def test_steps(self):
+        self.assertEqual(
+            compile_pattern("$.data[0]['a.b'][*].x").steps,
+            (("data", None), ("0", 0), ("a.b", None), WILDCARD, ("x", None)),
+        )
+        self.assertEqual(compile_pattern("data.-1").steps, (("data", None), ("-1", -1)))
+
+    def test_invalid(self):
+        for pattern in (
+            "",
+            "$",
+            "data[0]height",
+            "data['a']b",
+            "data..height",
+            "data.",
+            "data[x]",
+            "data[0",
+        ):
+            with self.subTest(pattern=pattern), self.assertRaises(ValueError):
+                compile_pattern(pattern)
+
+    def test_pattern_error_is_value_error(self):
+        self.assertTrue(issubclass(PatternError, ValueError))
+
+
+class ExtractorTests(SimpleTestCase):
+    def test_values(self):
+        cases = {
+            "data.BTC.total_blocks": 800000,
+            "data.list.1.height": 2,
+            "data.list[1].tx[-1]": 20,
+            "data.list[-1].time": 3,
+            "$.data['key.with.dots']": 4,
+            "data.7": "seven",
+            "data.list[*].time": 3,
+            "data.*.total_blocks": 800000,
+        }
+        for pattern, value in cases.items():
+            with self.subTest(pattern=pattern):
+                self.assertEqual(extract(DATA, pattern), value)
+
+    def test_missing(self):
+        for pattern in (
+            "data.ETH.total_blocks",
+            "data.list[3].height",
+            "data.list[-4].height",
+            "data.list.height",
+            "data.BTC.total_blocks.x",
+            "data.list[*].missing",
+            "data.BTC[0]",
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertIsNone(extract(DATA, pattern))
+
+    def test_same_as_legacy_get_value(self):
+        payload = build_payload(width=5, depth=4)
+        patterns = [
+            "data.BTC.total_blocks",
+            "data.BTC.first_block_timestamp",
+            "data.ETH.total_blocks",
+            ".".join(["data"] + ["key_4"] * 4 + ["total_blocks"]),
+            ".".join(["data"] + ["key_1", "value"]),
+        ]
+        for data in (DATA, payload):
+            for pattern in patterns:
+                with self.subTest(pattern=pattern):
+                    legacy = legacy_get_value(data, pattern)
+                    value = compile_pattern(pattern)(data)
+                    # legacy returns "" for missing values
+                    self.assertEqual(value if value is not None else "", legacy)
+
+    def test_compiled_once(self):
+        self.assertIs(compile_pattern("data.BTC"), compile_pattern("data.BTC"))
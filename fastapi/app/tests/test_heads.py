@@ -0,0 +1,54 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from app.models import Block, Currency, Provider
+from app.util.heads import HeadCache
+from app.util.store import BlockRow
+
+
+@override_settings(COLLECTOR_HEAD_CACHE="local")
+class HeadCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.currency = Currency.objects.create(name="TST")
+        self.provider = Provider.objects.create(name="test")
+        self.heads = HeadCache(size=8)
+        asyncio.run(self.heads.arefresh())
+
+    def row(self, number: int) -> BlockRow:
+        return BlockRow(
+            block_number=number,
+            currency_id=self.currency.id,
+            provider_id=self.provider.id,
+            created_at=None,
+        )
+
+    def test_warm_and_update(self):
+        Block.objects.create(
+            block_number=10, currency=self.currency, provider=self.provider
+        )
+        self.heads.warm({self.currency.id})
+        self.assertTrue(self.heads.seen(self.row(10)))
+        self.assertFalse(self.heads.seen(self.row(11)))
+        self.heads.update([self.row(11)])
+        self.assertTrue(self.heads.seen(self.row(11)))
+
+    def test_delete_elsewhere_drops_numbers(self):
+        # the collector process knows the block
+        self.heads.update([self.row(10)])
+        block = Block.objects.create(
+            block_number=10, currency=self.currency, provider=self.provider
+        )
+        # deleted by the API / admin process, signal after the commit
+        with self.captureOnCommitCallbacks(execute=True):
+            block.delete()
+        asyncio.run(self.heads.arefresh())
+        self.assertFalse(self.heads.seen(self.row(10)))
+
+    @override_settings(COLLECTOR_HEAD_CACHE_TTL=0)
+    def test_numbers_expire(self):
+        self.heads.update([self.row(10)])
+        asyncio.run(self.heads.arefresh())
+        self.assertFalse(self.heads.seen(self.row(10)))
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.util.hedge import HedgeStats, collect_hedged, race
+from app.util.registry import EndpointConfig
+from app.util.store import BlockRow
+
+
+def endpoint(id: int, currency_id: int = 1) -> EndpointConfig:
+    return EndpointConfig(
+        id=id,
+        url=f"https://provider-{id}.test/stats",
+        pattern_block="data.blocks",
+        pattern_timestamp="data.time",
+        header=None,
+        currency_id=currency_id,
+        currency_name=f"C{currency_id}",
+        provider_id=id * 10,
+        provider_name=f"provider {id}",
+        api_key=None,
+    )
+
+
+class StubCollect:
+    """
+    collect() answering per endpoint id with (delay, block number),
+    block number None - no block, an exception - raised.
+    """
+
+    def __init__(self, answers: dict) -> None:
+        self.answers = answers
+        self.cancelled: list[int] = []
+
+    async def __call__(self, endpoint: EndpointConfig) -> BlockRow | None:
+        delay, answer = self.answers[endpoint.id]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(endpoint.id)
+            raise
+        if isinstance(answer, Exception):
+            raise answer
+        if answer is None:
+            return None
+        return BlockRow(
+            block_number=answer,
+            currency_id=endpoint.currency_id,
+            provider_id=endpoint.provider_id,
+            created_at=None,
+        )
+
+
+class HedgeTests(SimpleTestCase):
+    def setUp(self):
+        self.stats = HedgeStats()
+        patcher = mock.patch("app.util.hedge.hedge_stats", self.stats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def race(self, answers: dict, deadline: float = 1.0) -> tuple[dict, StubCollect]:
+        collect = StubCollect(answers)
+        endpoints = [endpoint(id) for id in answers]
+        return asyncio.run(race(endpoints, collect, deadline)), collect
+
+    def test_first_block_wins(self):
+        rows, collect = self.race({1: (0.2, 100), 2: (0.0, 99), 3: (0.3, 101)})
+        self.assertEqual(rows[2].block_number, 99)
+        self.assertIsNone(rows[1])
+        self.assertIsNone(rows[3])
+        self.assertCountEqual(collect.cancelled, [1, 3])
+        self.assertEqual(self.stats.stats(), {1: {"wins": {20: 1}, "no_winner": 0}})
+
+    def test_highest_of_simultaneous_blocks_wins(self):
+        rows, _ = self.race({1: (0.0, 100), 2: (0.0, 101)})
+        self.assertIsNone(rows[1])
+        self.assertEqual(rows[2].block_number, 101)
+
+    def test_failures_fall_through(self):
+        rows, collect = self.race({1: (0.0, None), 2: (0.05, 100), 3: (0.3, 101)})
+        self.assertIsNone(rows[1])
+        self.assertEqual(rows[2].block_number, 100)
+        self.assertEqual(collect.cancelled, [3])
+
+    def test_deadline(self):
+        started = time.monotonic()
+        rows, collect = self.race({1: (5.0, 100), 2: (0.0, None)}, deadline=0.05)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(rows, {1: None, 2: None})
+        self.assertEqual(collect.cancelled, [1])
+        self.assertEqual(self.stats.stats(), {1: {"wins": {}, "no_winner": 1}})
+
+    def test_all_fail(self):
+        rows, collect = self.race({1: (0.0, None), 2: (0.01, None)})
+        self.assertEqual(rows, {1: None, 2: None})
+        self.assertEqual(collect.cancelled, [])
+        self.assertEqual(self.stats.stats(), {1: {"wins": {}, "no_winner": 1}})
+
+    def test_exception_cancels_the_others(self):
+        collect = StubCollect({1: (0.0, RuntimeError("boom")), 2: (0.3, 100)})
+        with self.assertRaises(RuntimeError):
+            asyncio.run(race([endpoint(1), endpoint(2)], collect, 1.0))
+        self.assertEqual(collect.cancelled, [2])
+
+    def test_collect_hedged(self):
+        collect = StubCollect(
+            {1: (0.1, 100), 2: (0.0, 100), 3: (0.0, 7), 4: (0.0, None)}
+        )
+        endpoints = [endpoint(1), endpoint(3, currency_id=2), endpoint(2)]
+        endpoints.append(endpoint(4, currency_id=3))
+
+        rows = asyncio.run(collect_hedged(endpoints, collect, 1.0))
+
+        # in the order of endpoints, one winner per currency
+        self.assertEqual(
+            [row and (row.currency_id, row.provider_id) for row in rows],
+            [None, (2, 30), (1, 20), None],
+        )
+        self.assertEqual(collect.cancelled, [1])
+        self.assertEqual(
+            self.stats.stats(),
+            {
+                1: {"wins": {20: 1}, "no_winner": 0},
+                2: {"wins": {30: 1}, "no_winner": 0},
+                3: {"wins": {}, "no_winner": 1},
+            },
+        )
+
+    def test_stats_accumulate(self):
+        self.race({1: (0.0, 100), 2: (0.1, 100)})
+        self.race({1: (0.1, 100), 2: (0.0, 100)})
+        self.race({1: (0.0, 100), 2: (0.1, 100)})
+        self.assertEqual(
+            self.stats.stats(), {1: {"wins": {10: 2, 20: 1}, "no_winner": 0}}
+        )
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.test import SimpleTestCase
+
+from app.util.http import ClientRegistry
+
+
+class ClosedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def finish(self):
+        super().finish()
+        self.server.closed.set()
+
+    def log_message(self, *args):
+        pass
+
+
+class ClientRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ClosedHandler)
+        self.server.closed = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.registry = ClientRegistry()
+
+    async def fetch(self) -> httpx.AsyncClient:
+        client = self.registry.get(self.url)
+        await client.get(self.url)
+        return client
+
+    def test_clients_reused_on_same_loop(self):
+        async def run():
+            return await self.fetch(), await self.fetch()
+
+        first, second = asyncio.run(run())
+        self.assertIs(first, second)
+        self.assertFalse(self.server.closed.is_set())
+
+    def test_new_loop_closes_clients_of_closed_loop(self):
+        old = asyncio.run(self.fetch())
+        new = asyncio.run(self.fetch())
+        self.assertIsNot(old, new)
+        # the keep-alive connection of the first loop was shut down
+        self.assertTrue(self.server.closed.wait(2))
+
+    def test_new_loop_closes_clients_on_running_loop(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(loop.call_soon_threadsafe, loop.stop)
+
+        old = asyncio.run_coroutine_threadsafe(self.fetch(), loop).result(2)
+        asyncio.run(self.fetch())
+        self.assertTrue(self.server.closed.wait(2))
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(2)
+        self.assertTrue(old.is_closed)
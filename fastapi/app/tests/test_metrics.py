@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from fastapi.testclient import TestClient
+
+from app.util.metrics import MetricsRegistry, merge, read_snapshots, render
+from config.asgi import fastapi_app
+
+
+class ReadSnapshotsTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name: str, snapshot: dict, age: float) -> Path:
+        path = self.directory / f"{name}.json"
+        path.write_text(json.dumps(snapshot))
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_oldest_first_and_stale_removed(self):
+        self.write("new", {"n": 2}, age=1)
+        self.write("old", {"n": 1}, age=5)
+        stale = self.write("stale", {"n": 0}, age=100)
+        self.assertEqual(read_snapshots(str(self.directory), 60), [{"n": 1}, {"n": 2}])
+        self.assertFalse(stale.exists())
+
+    def test_file_removed_concurrently(self):
+        self.write("kept", {"n": 1}, age=1)
+        gone = self.write("gone", {"n": 2}, age=1)
+        stat = Path.stat
+
+        def removed_stat(path, *args, **kwargs):
+            if path == gone:
+                raise FileNotFoundError(path)
+            return stat(path, *args, **kwargs)
+
+        with mock.patch.object(Path, "stat", removed_stat):
+            self.assertEqual(read_snapshots(str(self.directory), 60), [{"n": 1}])
+
+
+def snapshot(registry: MetricsRegistry) -> dict:
+    # as written by a collector process
+    return json.loads(json.dumps(registry.snapshot()))
+
+
+class RenderTests(SimpleTestCase):
+    def test_histogram(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Request time.", (1.0, 2.0))
+        for value in (0.5, 1.0, 3.0):
+            latency.observe(value, route="a")
+        self.assertEqual(
+            render(merge([snapshot(registry)])),
+            "# HELP latency_seconds Request time.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{route="a",le="1.0"} 2\n'
+            'latency_seconds_bucket{route="a",le="2.0"} 2\n'
+            'latency_seconds_bucket{route="a",le="+Inf"} 3\n'
+            'latency_seconds_sum{route="a"} 4.5\n'
+            'latency_seconds_count{route="a"} 3\n',
+        )
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors.").inc(url='a"b\\c\nd')
+        self.assertIn(
+            'errors_total{url="a\\"b\\\\c\\nd"} 1.0\n',
+            render(merge([snapshot(registry)])),
+        )
+
+    def test_merge_processes(self):
+        first, second = MetricsRegistry(), MetricsRegistry()
+        for registry, value in ((first, 1.0), (second, 2.0)):
+            registry.counter("requests_total", "Requests.").inc(2, status=200)
+            registry.gauge("last_cycle", "Last cycle.").set(value)
+            registry.histogram("cycle_seconds", "Cycles.", (1.0,)).observe(value)
+        second.counter("requests_total", "Requests.").inc(status=503)
+
+        text = render(merge([snapshot(first), snapshot(second)]))
+        self.assertIn('requests_total{status="200"} 4.0\n', text)
+        self.assertIn('requests_total{status="503"} 1.0\n', text)
+        # gauges keep the newest snapshot
+        self.assertIn("last_cycle 2.0\n", text)
+        self.assertIn('cycle_seconds_bucket{le="1.0"} 1\n', text)
+        self.assertIn('cycle_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("cycle_seconds_sum 3.0\n", text)
+        self.assertIn("cycle_seconds_count 2\n", text)
+
+
+@override_settings(METRICS_DIR="")
+class MetricsRouteTests(SimpleTestCase):
+    def test_prometheus_text(self):
+        response = TestClient(fastapi_app).get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.headers["content-type"], "text/plain; version=0.0.4; charset=utf-8"
+        )
+        self.assertIn("# TYPE collector_http_responses_total counter", response.text)
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, TestCase
+
+from app.models import Block, Currency, Provider
+from app.util.pagination import (
+    NEXT,
+    PREV,
+    Cursor,
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+
+
+AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        for direction in (NEXT, PREV):
+            token = encode_cursor(AT, 42, direction)
+            self.assertNotIn("=", token)
+            self.assertEqual(decode_cursor(token), Cursor(AT, 42, direction))
+
+    def test_invalid(self):
+        for token in (
+            "",
+            "zzz",
+            "!!!!",
+            encode_cursor(AT, 1, "sideways"),
+            "WzEsMiwzXQ",  # [1,2,3]
+            "eyJhIjoxfQ",  # {"a":1}
+        ):
+            with self.subTest(token=token), self.assertRaises(CursorError):
+                decode_cursor(token)
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        currency = Currency.objects.create(name="TST")
+        provider = Provider.objects.create(name="test")
+        # three rows per second, ties are ordered by id
+        Block.objects.bulk_create(
+            Block(
+                block_number=number,
+                currency=currency,
+                provider=provider,
+                created_at=AT + timedelta(seconds=number // 3),
+            )
+            for number in range(10)
+        )
+        Block.objects.create(
+            block_number=100, currency=currency, provider=provider, created_at=None
+        )
+        self.blocks = Block.objects.all()
+
+    @staticmethod
+    def numbers(rows: list) -> list[int]:
+        return [row.block_number for row in rows]
+
+    def test_walk_forward_and_back(self):
+        pages, cursor, more = [], None, True
+        while more:
+            rows, more = keyset_page(self.blocks, cursor, 4)
+            pages.append(self.numbers(rows))
+            last = rows[-1]
+            cursor = Cursor(last.created_at, last.id, NEXT)
+        self.assertEqual(pages, [[9, 8, 7, 6], [5, 4, 3, 2], [1, 0]])
+
+        first = Block.objects.get(block_number=1)
+        rows, more = keyset_page(
+            self.blocks, Cursor(first.created_at, first.id, PREV), 4
+        )
+        self.assertEqual(self.numbers(rows), [5, 4, 3, 2])
+        self.assertTrue(more)
+
+    def test_cursor_inside_tie(self):
+        # 4 and 5 share created_at with 3
+        row = Block.objects.get(block_number=4)
+        rows, _ = keyset_page(self.blocks, Cursor(row.created_at, row.id, NEXT), 2)
+        self.assertEqual(self.numbers(rows), [3, 2])
+        rows, _ = keyset_page(self.blocks, Cursor(row.created_at, row.id, PREV), 2)
+        self.assertEqual(self.numbers(rows), [6, 5])
+
+    def test_ends(self):
+        last = Block.objects.get(block_number=0)
+        rows, more = keyset_page(self.blocks, Cursor(last.created_at, last.id, NEXT), 4)
+        self.assertEqual((rows, more), ([], False))
+        first = Block.objects.get(block_number=9)
+        rows, more = keyset_page(
+            self.blocks, Cursor(first.created_at, first.id, PREV), 4
+        )
+        self.assertEqual((rows, more), ([], False))
@@ -0,0 +1,223 @@
+import threading
+import time
+from unittest import mock
+
+import psycopg2
+from django.test import SimpleTestCase
+from psycopg2 import extensions
+
+from config.db.backends.postgresql_pool import pool as pool_module
+from config.db.backends.postgresql_pool.base import DatabaseWrapper
+from config.db.backends.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """
+    The parts of a psycopg2 connection the pool uses.
+    """
+
+    def __init__(self) -> None:
+        self.closed = 0
+        self.autocommit = True
+        self.isolation_level = extensions.ISOLATION_LEVEL_READ_COMMITTED
+        self.info = mock.Mock(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+        self.rollbacks = 0
+        self.broken = False
+
+    def rollback(self) -> None:
+        if self.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        self.closed = 1
+
+    def cursor(self):
+        cursor = mock.MagicMock()
+        if self.broken:
+            cursor.__enter__.return_value.execute.side_effect = (
+                psycopg2.OperationalError("server closed the connection")
+            )
+        return cursor
+
+
+class PoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect(**params):
+            connection = FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        patcher = mock.patch.object(pool_module.psycopg2, "connect", connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pool(self, **options) -> ConnectionPool:
+        options = {"min_size": 0, "max_size": 2, "timeout": 0.1, **options}
+        return ConnectionPool({"database": "test"}, **options)
+
+
+class ConnectionPoolTests(PoolTestCase):
+    def test_reuses_returned_connection(self):
+        pool = self.pool()
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertIs(pool.getconn(), connection)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_checkout_timeout(self):
+        pool = self.pool(max_size=1, timeout=0.05)
+        pool.getconn()
+        started = time.monotonic()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(pool.snapshot()["timeouts"], 1)
+
+    def test_max_size_blocks_until_returned(self):
+        pool = self.pool(max_size=1, timeout=2)
+        connection = pool.getconn()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.getconn()))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(result, [])
+        pool.putconn(connection)
+        waiter.join(2)
+        self.assertEqual(result, [connection])
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(pool.snapshot()["waits"], 1)
+
+    def test_open_transaction_rolled_back(self):
+        pool = self.pool()
+        connection = pool.getconn()
+        connection.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.putconn(connection)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertEqual(pool.snapshot()["idle"], 1)
+
+    def test_failed_rollback_discards(self):
+        pool = self.pool()
+        connection = pool.getconn()
+        connection.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        connection.broken = True
+        pool.putconn(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.snapshot()["size"], 0)
+
+    def test_closed_connection_discarded(self):
+        pool = self.pool(max_size=1)
+        connection = pool.getconn()
+        connection.close()
+        pool.putconn(connection)
+        self.assertEqual(pool.snapshot()["discarded"], 1)
+        # the slot is free again
+        self.assertIsNot(pool.getconn(), connection)
+
+    def test_idle_check_replaces_broken_connection(self):
+        pool = self.pool(check_idle=0)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        connection.broken = True
+        self.assertIsNot(pool.getconn(), connection)
+        self.assertEqual(pool.snapshot()["failed_checks"], 1)
+
+    def test_max_lifetime(self):
+        pool = self.pool(max_lifetime=0)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertIsNot(pool.getconn(), connection)
+
+    def test_foreign_connection_ignored(self):
+        pool = self.pool()
+        pool.putconn(FakeConnection())
+        self.assertEqual(pool.snapshot()["idle"], 0)
+
+
+class GetPoolTests(PoolTestCase):
+    def setUp(self):
+        super().setUp()
+        # pools of this test only
+        patcher = mock.patch.multiple(pool_module, _pools={}, _pools_pid=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_pool_after_fork(self):
+        pool = pool_module.get_pool("default", {}, {"database": "test"})
+        self.assertIs(pool_module.get_pool("default", {}, {}), pool)
+        with mock.patch.object(pool_module.os, "getpid", return_value=-1):
+            self.assertIsNone(pool_module.existing_pool("default"))
+            self.assertEqual(pool_module.pool_stats(), {})
+            child = pool_module.get_pool("default", {}, {"database": "test"})
+        self.assertIsNot(child, pool)
+
+    def test_pool_options(self):
+        pool = pool_module.get_pool(
+            "default", {"POOL": {"MIN_SIZE": 2, "MAX_SIZE": 3}}, {"database": "test"}
+        )
+        self.assertEqual((pool.min_size, pool.max_size), (2, 3))
+        self.assertEqual(len(self.opened), 2)
+
+
+class DatabaseWrapperCloseTests(PoolTestCase):
+    """
+    Connections go back to the pool unless the wrapper can not vouch for them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for patcher in (
+            mock.patch.multiple(pool_module, _pools={}, _pools_pid=None),
+            mock.patch("psycopg2.extras.register_default_jsonb"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.wrapper = DatabaseWrapper(
+            {
+                "NAME": "test",
+                "USER": "",
+                "PASSWORD": "",
+                "HOST": "",
+                "PORT": "",
+                "OPTIONS": {},
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": False,
+                "AUTOCOMMIT": True,
+                "ATOMIC_REQUESTS": False,
+                "TIME_ZONE": None,
+                "TEST": {},
+            },
+            "pool_test",
+        )
+        self.wrapper.connection = self.wrapper.get_new_connection({"database": "test"})
+        self.pool = pool_module.existing_pool("pool_test")
+
+    def test_returned(self):
+        connection = self.wrapper.connection
+        self.wrapper._close()
+        self.assertFalse(connection.closed)
+        self.assertEqual(self.pool.snapshot()["idle"], 1)
+
+    def test_closed_inside_atomic_discarded(self):
+        connection = self.wrapper.connection
+        self.wrapper.in_atomic_block = True
+        self.wrapper._close()
+        self.assertTrue(connection.closed)
+        self.assertEqual(self.pool.snapshot()["size"], 0)
+
+    def test_unusable_after_error_discarded(self):
+        connection = self.wrapper.connection
+        self.wrapper.errors_occurred = True
+        with mock.patch.object(self.wrapper, "is_usable", return_value=False):
+            self.wrapper._close()
+        self.assertTrue(connection.closed)
+        self.assertEqual(self.pool.snapshot()["discarded"], 1)
+
+    def test_opened_before_fork_closed(self):
+        connection = self.wrapper.connection
+        with mock.patch.object(pool_module.os, "getpid", return_value=-1):
+            self.wrapper._close()
+        self.assertTrue(connection.closed)
@@ -0,0 +1,69 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from app.models import Currency, Endpoint, Provider
+from app.util.registry import EndpointRegistry
+
+
+@override_settings(COLLECTOR_REGISTRY_TTL=300)
+class EndpointRegistryTests(TransactionTestCase):
+    """
+    A registry of another process: it only sees the shared version
+    bumped by app.signals. Loads run in DB threads, so rows are committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.currency = Currency.objects.create(name="TST")
+        self.provider = Provider.objects.create(name="test", api_key="secret")
+        self.endpoint = Endpoint.objects.create(
+            url="http://provider.test/stats",
+            pattern_block="height",
+            pattern_timestamp="time",
+            header="X-Key",
+            currency=self.currency,
+            provider=self.provider,
+        )
+        self.registry = EndpointRegistry()
+
+    def urls(self) -> list[str]:
+        return [endpoint.url for endpoint in asyncio.run(self.registry.aget_all())]
+
+    def test_config(self):
+        config = asyncio.run(self.registry.aget(self.endpoint.id))
+        self.assertEqual(config.currency_name, "TST")
+        self.assertEqual(config.provider_name, "test")
+        self.assertEqual(config.headers, {"X-Key": "secret"})
+        self.assertIsNone(asyncio.run(self.registry.aget(self.endpoint.id + 1)))
+
+    def test_cached_until_changed(self):
+        self.assertEqual(self.urls(), ["http://provider.test/stats"])
+        # no signals, the registry keeps its copy
+        Endpoint.objects.update(url="http://provider.test/v2")
+        self.assertEqual(self.urls(), ["http://provider.test/stats"])
+
+    def test_reloaded_after_save(self):
+        self.urls()
+        self.endpoint.url = "http://provider.test/v2"
+        self.endpoint.save()
+        self.assertEqual(self.urls(), ["http://provider.test/v2"])
+
+    def test_reloaded_after_related_save(self):
+        asyncio.run(self.registry.aget_all())
+        self.provider.api_key = "rotated"
+        self.provider.save()
+        config = asyncio.run(self.registry.aget(self.endpoint.id))
+        self.assertEqual(config.headers, {"X-Key": "rotated"})
+
+    def test_reloaded_after_delete(self):
+        self.urls()
+        self.endpoint.delete()
+        self.assertEqual(self.urls(), [])
+
+    @override_settings(COLLECTOR_REGISTRY_TTL=0)
+    def test_reloaded_after_ttl(self):
+        self.urls()
+        Endpoint.objects.update(url="http://provider.test/v2")
+        self.assertEqual(self.urls(), ["http://provider.test/v2"])
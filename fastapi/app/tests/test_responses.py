@@ -0,0 +1,121 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.models import Block, Currency, Provider
+from app.util.responses import CURRENCIES, ENDPOINTS, PROVIDERS, ResponseCache
+
+
+def request(path: str, query: str = "") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [],
+        }
+    )
+
+
+@override_settings(RESPONSE_CACHE="local", RESPONSE_CACHE_TTL=60)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.responses = ResponseCache(size=8)
+        self.builds = []
+
+    def get(self, name: str, query: str = "", responses: ResponseCache | None = None):
+        async def build():
+            self.builds.append((name, query))
+            return {"name": name, "builds": len(self.builds)}
+
+        responses = responses or self.responses
+        return asyncio.run(responses.aget(name, request(f"/{name}/", query), build))
+
+    def test_hit(self):
+        first = self.get(CURRENCIES, "page=1")
+        second = self.get(CURRENCIES, "page=1")
+        self.assertEqual(first.body, second.body)
+        self.assertEqual(second.media_type, "application/json")
+        self.assertEqual(len(self.builds), 1)
+
+    def test_key_includes_query(self):
+        self.get(CURRENCIES, "page=1&per_page=5")
+        self.get(CURRENCIES, "per_page=5&page=1")
+        self.get(CURRENCIES, "page=2&per_page=5")
+        self.assertEqual(len(self.builds), 2)
+
+    def test_model_changes_invalidate_dependent_lists(self):
+        for name in (CURRENCIES, PROVIDERS, ENDPOINTS):
+            self.get(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            Provider.objects.create(name="test")
+        for name in (CURRENCIES, PROVIDERS, ENDPOINTS):
+            self.get(name)
+        self.assertEqual([name for name, _ in self.builds[3:]], [PROVIDERS, ENDPOINTS])
+
+    def test_currency_delete_invalidates(self):
+        currency = Currency.objects.create(name="TST")
+        self.get(CURRENCIES)
+        with self.captureOnCommitCallbacks(execute=True):
+            currency.delete()
+        self.get(CURRENCIES)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_blocks_do_not_invalidate(self):
+        currency = Currency.objects.create(name="TST")
+        provider = Provider.objects.create(name="test")
+        self.get(CURRENCIES)
+        with self.captureOnCommitCallbacks(execute=True):
+            Block.objects.create(block_number=1, currency=currency, provider=provider)
+        self.get(CURRENCIES)
+        self.assertEqual(len(self.builds), 1)
+
+    @override_settings(RESPONSE_CACHE_TTL=0)
+    def test_ttl(self):
+        self.get(CURRENCIES)
+        self.get(CURRENCIES)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_lru_eviction(self):
+        self.responses.size = 2
+        self.get(CURRENCIES, "page=1")
+        self.get(CURRENCIES, "page=2")
+        # page 1 is the most recently used now, page 2 is evicted
+        self.get(CURRENCIES, "page=1")
+        self.get(CURRENCIES, "page=3")
+        self.get(CURRENCIES, "page=1")
+        self.get(CURRENCIES, "page=2")
+        self.assertEqual(
+            [query for _, query in self.builds],
+            ["page=1", "page=2", "page=3", "page=2"],
+        )
+
+    def test_errors_not_cached(self):
+        async def fail():
+            raise HTTPException(status_code=404, detail="Not found")
+
+        for _ in range(2):
+            with self.assertRaises(HTTPException):
+                asyncio.run(
+                    self.responses.aget(CURRENCIES, request("/currencies/"), fail)
+                )
+        self.get(CURRENCIES)
+        self.assertEqual(len(self.builds), 1)
+
+    @override_settings(RESPONSE_CACHE="none")
+    def test_disabled(self):
+        self.get(CURRENCIES)
+        self.get(CURRENCIES)
+        self.assertEqual(len(self.builds), 2)
+
+    @override_settings(RESPONSE_CACHE="shared")
+    def test_shared_between_processes(self):
+        self.get(CURRENCIES)
+        # another process, same cache backend
+        self.get(CURRENCIES, responses=ResponseCache(size=8))
+        self.assertEqual(len(self.builds), 1)
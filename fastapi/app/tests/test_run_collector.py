@@ -0,0 +1,96 @@
+import os
+import signal
+from io import StringIO
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from app.models import Block, Currency, Endpoint, Provider
+from app.util.breaker import breakers
+from app.util.conditional import conditional_cache
+from app.util.http import client_registry
+
+
+class RunCollectorTests(TransactionTestCase):
+    """
+    run_collector against a mock provider; DB calls run in threads,
+    so rows are committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.provider = Provider.objects.create(name="test")
+        self.currency = Currency.objects.create(name="TST")
+        self.endpoint = Endpoint.objects.create(
+            url="http://provider.test/stats",
+            pattern_block="data.height",
+            pattern_timestamp="data.time",
+            currency=self.currency,
+            provider=self.provider,
+        )
+        self.requests = []
+        client_registry.transport = httpx.MockTransport(self.handler)
+        # the event loop resets the handlers it installed when it closes
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+
+    def tearDown(self):
+        client_registry.transport = None
+        breakers._breakers.pop(self.provider.id, None)
+        conditional_cache.forget(self.endpoint.id)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(
+            200, json={"data": {"height": 100, "time": 1_700_000_000}}
+        )
+
+    def run_collector(self, *args: str) -> str:
+        stdout = StringIO()
+        call_command("run_collector", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_once(self):
+        output = self.run_collector("--once", "--tick", "5")
+
+        self.assertEqual(output, "Collector started, tick 5.0s\nCollector stopped\n")
+        self.assertEqual(len(self.requests), 1)
+        block = Block.objects.get()
+        self.assertEqual(
+            (block.currency_id, block.provider_id, block.block_number),
+            (self.currency.id, self.provider.id, 100),
+        )
+        self.assertEqual(block.created_at.timestamp(), 1_700_000_000)
+        # polled again only when due
+        self.endpoint.refresh_from_db()
+        self.assertIsNotNone(self.endpoint.next_poll_at)
+
+    def test_runs_until_terminated(self):
+        calls = []
+
+        async def collect_due():
+            calls.append(1)
+            if len(calls) == 3:
+                os.kill(os.getpid(), signal.SIGTERM)
+            return []
+
+        with mock.patch(
+            "app.management.commands.run_collector.collect_due", collect_due
+        ):
+            output = self.run_collector("--tick", "0.01")
+
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(output.endswith("Collector stopped\n"))
+
+    def test_failed_cycle_is_logged(self):
+        with mock.patch(
+            "app.management.commands.run_collector.collect_due",
+            side_effect=RuntimeError("boom"),
+        ), self.assertLogs("app.management.commands.run_collector", "ERROR") as logs:
+            output = self.run_collector("--once")
+
+        self.assertIn("Collection cycle failed", logs.output[0])
+        self.assertTrue(output.endswith("Collector stopped\n"))
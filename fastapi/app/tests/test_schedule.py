@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from app.models import Block, Currency, Provider
+from app.util.schedule import observed_block_intervals
+
+
+@override_settings(COLLECTOR_INTERVAL_WINDOW=3600)
+class ObservedBlockIntervalsTests(TestCase):
+    def setUp(self):
+        self.currency = Currency.objects.create(name="TST")
+        self.provider = Provider.objects.create(name="test")
+        self.now = timezone.now()
+
+    def store(self, number: int, created_at, stored_at) -> None:
+        Block.objects.create(
+            block_number=number,
+            currency=self.currency,
+            provider=self.provider,
+            created_at=created_at,
+        )
+        # stored_at is auto_now
+        Block.objects.filter(block_number=number).update(stored_at=stored_at)
+
+    def test_interval_of_collected_blocks(self):
+        for number in range(5):
+            at = self.now - timedelta(seconds=600 - number * 60)
+            self.store(number, at, at)
+        intervals = observed_block_intervals({self.currency.id}, self.now)
+        self.assertAlmostEqual(intervals[self.currency.id], 60.0)
+
+    def test_backfilled_blocks_are_ignored(self):
+        for number in range(5):
+            at = self.now - timedelta(seconds=600 - number * 60)
+            self.store(1000 + number, at, at)
+        # history stored within a second by a backfill
+        for number in range(900):
+            self.store(
+                number,
+                self.now - timedelta(days=30, seconds=-number * 60),
+                self.now - timedelta(seconds=10),
+            )
+        intervals = observed_block_intervals({self.currency.id}, self.now)
+        self.assertAlmostEqual(intervals[self.currency.id], 60.0)
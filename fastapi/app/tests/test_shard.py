@@ -0,0 +1,70 @@
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from app.util.registry import EndpointConfig
+from app.util.shard import jump_hash, partition
+
+
+KEYS = range(10_000)
+
+
+def endpoint(id: int, provider_id: int) -> EndpointConfig:
+    return EndpointConfig(
+        id=id,
+        url=f"http://provider-{provider_id}.local/{id}",
+        pattern_block=None,
+        pattern_timestamp=None,
+        header=None,
+        currency_id=1,
+        currency_name="TST",
+        provider_id=provider_id,
+        provider_name=f"provider {provider_id}",
+        api_key=None,
+    )
+
+
+class JumpHashTests(SimpleTestCase):
+    def test_single_bucket(self):
+        self.assertEqual({jump_hash(key, 1) for key in KEYS}, {0})
+
+    def test_range_and_balance(self):
+        counts = Counter(jump_hash(key, 8) for key in KEYS)
+        self.assertEqual(set(counts), set(range(8)))
+        # 1250 expected per bucket
+        self.assertLess(max(counts.values()) - min(counts.values()), 250)
+
+    def test_new_bucket_takes_keys_only(self):
+        for buckets in (1, 2, 5, 10):
+            moved = 0
+            for key in KEYS:
+                before, after = jump_hash(key, buckets), jump_hash(key, buckets + 1)
+                if before != after:
+                    self.assertEqual(after, buckets)
+                    moved += 1
+            # ~1/(buckets + 1) of the keys
+            self.assertAlmostEqual(moved / len(KEYS), 1 / (buckets + 1), delta=0.03)
+
+
+class PartitionTests(SimpleTestCase):
+    def setUp(self):
+        self.endpoints = [endpoint(id, provider_id=id % 3) for id in range(1, 11)]
+
+    def test_by_provider(self):
+        self.assertEqual(
+            partition(self.endpoints, "provider", size=3, shards=2),
+            [[3, 6, 9], [1, 4, 7], [10], [2, 5, 8]],
+        )
+
+    def test_by_hash(self):
+        chunks = partition(self.endpoints, "hash", size=100, shards=2)
+        self.assertLessEqual(len(chunks), 2)
+        self.assertEqual(
+            sorted(id for chunk in chunks for id in chunk), list(range(1, 11))
+        )
+        for chunk in chunks:
+            self.assertEqual(len({jump_hash(id, 2) for id in chunk}), 1)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            partition(self.endpoints, "random", size=3, shards=2)
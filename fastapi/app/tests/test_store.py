@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from app.models import Block, Currency, Provider
+from app.util.store import BlockRow, store_blocks
+
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class StoreBlocksTests(TestCase):
+    def setUp(self):
+        self.currency = Currency.objects.create(name="TST")
+        self.other_currency = Currency.objects.create(name="OTH")
+        self.provider = Provider.objects.create(name="first")
+        self.other_provider = Provider.objects.create(name="second")
+        Block.objects.create(
+            block_number=1, currency=self.currency, provider=self.provider
+        )
+
+    def row(self, number: int, currency=None, provider=None) -> BlockRow:
+        return BlockRow(
+            block_number=number,
+            currency_id=(currency or self.currency).id,
+            provider_id=(provider or self.provider).id,
+            created_at=CREATED_AT,
+        )
+
+    def test_duplicates_are_not_new(self):
+        rows = [
+            self.row(1),
+            self.row(2),
+            self.row(2, provider=self.other_provider),
+            self.row(1, currency=self.other_currency),
+        ]
+        stored = store_blocks(rows)
+
+        self.assertEqual(
+            {key: provider for key, (provider, _) in stored.items()},
+            {
+                (self.currency.id, 2): self.provider.id,
+                (self.other_currency.id, 1): self.provider.id,
+            },
+        )
+        self.assertEqual(Block.objects.count(), 3)
+        # the first row of a repeated pair wins
+        block = Block.objects.get(currency=self.currency, block_number=2)
+        self.assertEqual(block.provider_id, self.provider.id)
+        self.assertEqual(block.created_at, CREATED_AT)
+        self.assertEqual(stored[(self.currency.id, 2)][1], block.stored_at)
+
+    def test_stored_again(self):
+        self.assertEqual(len(store_blocks([self.row(2)])), 1)
+        self.assertEqual(store_blocks([self.row(2)]), {})
+        self.assertEqual(store_blocks([]), {})
+
+    def test_batches(self):
+        stored = store_blocks([self.row(number) for number in range(1, 8)], 3)
+        self.assertEqual(sorted(number for _, number in stored), [2, 3, 4, 5, 6, 7])
+        self.assertEqual(Block.objects.count(), 7)
+
+    def test_without_returning(self):
+        with mock.patch.object(
+            connection.features, "can_return_columns_from_insert", False
+        ):
+            stored = store_blocks([self.row(1), self.row(2)])
+        self.assertEqual(list(stored), [(self.currency.id, 2)])
+        self.assertEqual(Block.objects.count(), 2)
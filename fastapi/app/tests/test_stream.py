@@ -0,0 +1,136 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.util import stream
+from app.util.extract import compile_pattern
+from app.util.stream import (
+    JSON_ERRORS,
+    BodyTooLarge,
+    BufferedExtractor,
+    StreamExtractor,
+    make_extractor,
+    read_fields,
+)
+
+
+DOCUMENT = {
+    "status": "ok",
+    "data": [
+        {"height": 1, "time": "a"},
+        {"height": 2, "nested": [[0, 1], [2, 3]], "time": "b"},
+    ],
+    "stats": {"BTC": {"blocks": 10}, "key.with.dots": 5},
+}
+
+
+def extractors(*patterns: str) -> list:
+    return [compile_pattern(pattern) for pattern in patterns]
+
+
+class FakeResponse:
+    """
+    Streamed response that records how many chunks were read.
+    """
+
+    def __init__(self, body: bytes, chunk_size: int = 8, headers=None) -> None:
+        self.chunks = [
+            body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+        ]
+        self.headers = headers or {}
+        self.read = 0
+
+    async def aiter_bytes(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class StreamExtractorTests(SimpleTestCase):
+    def values(self, *patterns: str, document=DOCUMENT) -> list:
+        parser = StreamExtractor(extractors(*patterns))
+        parser.feed(json.dumps(document).encode())
+        return parser.values
+
+    def test_paths(self):
+        patterns = (
+            "status",
+            "data.0.height",
+            "data[1].time",
+            "data[1].nested[1][0]",
+            "stats.BTC.blocks",
+            "stats['key.with.dots']",
+            "data[*].time",
+        )
+        self.assertEqual(self.values(*patterns), ["ok", 1, "b", 2, 10, 5, "a"])
+
+    def test_same_as_extractor(self):
+        patterns = ("data[1].height", "stats.BTC", "data[5].height", "status.x")
+        expected = [compile_pattern(pattern)(DOCUMENT) for pattern in patterns]
+        # containers are not collected while streaming
+        expected[1] = None
+        self.assertEqual(self.values(*patterns), expected)
+
+    def test_index_counts_containers(self):
+        document = [{"a": 1}, [2], 3, {"a": 4}]
+        self.assertEqual(self.values("[2]", "[3].a", document=document), [3, 4])
+
+    def test_done_before_end(self):
+        parser = StreamExtractor(extractors("status", "data[0].height"))
+        body = json.dumps(DOCUMENT).encode()
+        end = body.index(b'"time"')
+        self.assertTrue(parser.feed(body[:end]))
+        self.assertEqual(parser.values, ["ok", 1])
+
+    def test_missing_values_need_the_whole_document(self):
+        parser = StreamExtractor(extractors("missing"))
+        self.assertFalse(parser.feed(json.dumps(DOCUMENT).encode()))
+        self.assertEqual(parser.close(), [None])
+
+    def test_truncated_document(self):
+        parser = StreamExtractor(extractors("missing"))
+        parser.feed(b'{"status": "ok", "data": [')
+        with self.assertRaises(JSON_ERRORS):
+            parser.close()
+
+
+class ReadFieldsTests(SimpleTestCase):
+    def read(self, response, *patterns: str, max_bytes: int = 10_000) -> list:
+        return asyncio.run(read_fields(response, extractors(*patterns), max_bytes))
+
+    def test_stops_early(self):
+        response = FakeResponse(json.dumps(DOCUMENT).encode())
+        self.assertEqual(self.read(response, "status"), ["ok"])
+        self.assertLess(response.read, len(response.chunks))
+
+    def test_negative_index_buffered(self):
+        self.assertIsInstance(
+            make_extractor(extractors("data[-1].height")), BufferedExtractor
+        )
+        response = FakeResponse(json.dumps(DOCUMENT).encode())
+        self.assertEqual(self.read(response, "data[-1].height"), [2])
+        self.assertEqual(response.read, len(response.chunks))
+
+    def test_without_ijson(self):
+        with mock.patch.object(stream, "ijson", None), mock.patch.object(
+            stream, "_warned", False
+        ), self.assertLogs("app.util.stream", "WARNING"):
+            self.assertIsInstance(
+                make_extractor(extractors("status")), BufferedExtractor
+            )
+            response = FakeResponse(json.dumps(DOCUMENT).encode())
+            self.assertEqual(self.read(response, "status", "data[1].time"), ["ok", "b"])
+        self.assertEqual(response.read, len(response.chunks))
+
+    def test_content_length_too_large(self):
+        response = FakeResponse(b"{}", headers={"Content-Length": "20000"})
+        with self.assertRaises(BodyTooLarge):
+            self.read(response, "status")
+        self.assertEqual(response.read, 0)
+
+    def test_body_too_large(self):
+        response = FakeResponse(json.dumps(DOCUMENT).encode())
+        with self.assertRaises(BodyTooLarge):
+            self.read(response, "missing", max_bytes=20)
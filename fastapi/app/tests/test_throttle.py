@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from app.models import Provider
+from app.util.throttle import ProviderThrottle, TokenBucket
+
+
+class ThrottleTests(SimpleTestCase):
+    def test_bucket_rejects_non_positive_rate(self):
+        for rate in (0, -1.0):
+            with self.assertRaises(ValueError):
+                TokenBucket(rate, 1)
+
+    def test_non_positive_rate_limit_is_unlimited(self):
+        async def run():
+            throttle = ProviderThrottle(None, -1.0, 1)
+            for _ in range(5):
+                async with throttle:
+                    pass
+
+        started = time.monotonic()
+        asyncio.run(asyncio.wait_for(run(), 1))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_bucket_limits_rate(self):
+        async def run():
+            bucket = TokenBucket(50.0, 1)
+            for _ in range(6):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_provider_rate_limit_validated(self):
+        provider = Provider(name="test", rate_limit=-1.0)
+        with self.assertRaises(ValidationError) as context:
+            provider.clean_fields()
+        self.assertIn("rate_limit", context.exception.message_dict)
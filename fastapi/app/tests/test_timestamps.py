@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from app.util.timestamps import (
+    TimestampError,
+    TimestampParser,
+    detect,
+    parse_epoch_micros,
+    parse_epoch_millis,
+    parse_epoch_seconds,
+    parse_iso,
+)
+
+
+AT = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+SECONDS = int(AT.timestamp())
+
+
+class DetectTests(SimpleTestCase):
+    def test_formats(self):
+        cases = [
+            (SECONDS, parse_epoch_seconds),
+            (float(SECONDS) + 0.5, parse_epoch_seconds),
+            (str(SECONDS), parse_epoch_seconds),
+            (SECONDS * 1000, parse_epoch_millis),
+            (f" {SECONDS * 1000} ", parse_epoch_millis),
+            (SECONDS * 1_000_000, parse_epoch_micros),
+            ("2024-05-01T12:30:00Z", parse_iso),
+            ("2024-05-01 12:30:00", parse_iso),
+        ]
+        for value, parser in cases:
+            with self.subTest(value=value):
+                self.assertIs(detect(value), parser)
+                self.assertEqual(parser(value).replace(microsecond=0), AT)
+
+    def test_missing_or_invalid(self):
+        for value in (None, "", True, [SECONDS], {"time": SECONDS}):
+            with self.subTest(value=value), self.assertRaises(TimestampError):
+                detect(value)
+
+    def test_iso_zones(self):
+        self.assertEqual(parse_iso("2024-05-01T14:30:00+02:00"), AT)
+        self.assertEqual(parse_iso("2024-05-01T12:30:00z"), AT)
+        self.assertEqual(parse_iso("2024-05-01T12:30:00").tzinfo, timezone.utc)
+
+    def test_out_of_range(self):
+        future = datetime.now(timezone.utc) + timedelta(days=2)
+        for value in ("2008-12-31T23:59:59Z", future.isoformat(), "not a date"):
+            with self.subTest(value=value), self.assertRaises(TimestampError):
+                parse_iso(value)
+        # milliseconds read as seconds
+        with self.assertRaises(TimestampError):
+            parse_epoch_seconds(SECONDS * 1000)
+
+
+class TimestampParserTests(SimpleTestCase):
+    def test_format_cached_per_key(self):
+        parser = TimestampParser()
+        self.assertEqual(parser.parse(SECONDS, key=1), AT)
+        self.assertEqual(parser.parse("2024-05-01T12:30:00Z", key=2), AT)
+        self.assertEqual(parser.formats(), {1: "parse_epoch_seconds", 2: "parse_iso"})
+
+    def test_format_change_detected_again(self):
+        parser = TimestampParser()
+        parser.parse(SECONDS, key=1)
+        self.assertEqual(parser.parse(SECONDS * 1000, key=1), AT)
+        self.assertEqual(parser.formats(), {1: "parse_epoch_millis"})
+
+    def test_without_key(self):
+        parser = TimestampParser()
+        self.assertEqual(parser.parse(SECONDS * 1000), AT)
+        self.assertEqual(parser.formats(), {})
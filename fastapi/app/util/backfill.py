@@ -0,0 +1,148 @@
+import asyncio
+from itertools import cycle, islice
+from typing import AsyncIterator, Iterable, Iterator
+
+from django.db import connection
+
+from app.models import Block
+from app.util.collect import fetch_statistics, metric_labels
+from app.util.db import db_sync_to_async
+from app.util.extract import PatternError, compile_pattern
+from app.util.registry import EndpointConfig
+from app.util.store import BlockRow, store_blocks
+from app.util.throttle import throttle_registry
+from app.util.timestamps import timestamp_parser
+
+
+def find_gaps(
+    currency_ids: list[int], low: int | None = None, high: int | None = None
+) -> list[tuple[int, int, int]]:
+    """
+    Missing block number ranges as (currency_id, first, last), newest first.
+    One query: every stored block is compared with the previous one of its
+    currency (LAG window). With low, the range below the lowest stored
+    block down to low is missing too.
+    """
+    opts = Block._meta
+    qn = connection.ops.quote_name
+    number = qn(opts.get_field("block_number").column)
+    currency = qn(opts.get_field("currency").column)
+
+    where = [f"{currency} IN ({', '.join(['%s'] * len(currency_ids))})"]
+    params = [low - 1 if low is not None else None, *currency_ids]
+    if low is not None:
+        where.append(f"{number} >= %s")
+        params.append(low)
+    if high is not None:
+        where.append(f"{number} <= %s")
+        params.append(high)
+
+    sql = (
+        f"SELECT {currency}, previous + 1, {number} - 1 FROM ("
+        f"SELECT {currency}, {number}, "
+        f"LAG({number}, 1, %s) OVER ("
+        f"PARTITION BY {currency} ORDER BY {number}) AS previous "
+        f"FROM {qn(opts.db_table)} WHERE {' AND '.join(where)}"
+        f") AS numbered "
+        f"WHERE {number} - previous > 1 "
+        f"ORDER BY {currency}, {number} DESC"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def missing_heights(gaps: Iterable[tuple[int, int, int]]) -> Iterator[int]:
+    """
+    Block numbers of the gaps, newest first.
+    """
+    for _, first, last in gaps:
+        yield from range(last, first - 1, -1)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def block_url(template: str, block_number: int) -> str:
+    """
+    Replace {block_number} only, other braces (JSON, {apikey}) stay as they are.
+    """
+    return template.replace("{block_number}", str(block_number))
+
+
+async def fetch_block(endpoint: EndpointConfig, block_number: int) -> BlockRow | None:
+    """
+    Fetch one block from the block_url of endpoint.
+    """
+    url = block_url(endpoint.block_url, block_number)
+    res = await fetch_statistics(
+        url,
+        headers=endpoint.headers,
+        provider_id=endpoint.provider_id,
+        labels=metric_labels(endpoint),
+        throttle=throttle_registry.get(endpoint),
+    )
+    if not res:
+        return None
+    try:
+        created_at = timestamp_parser.parse(
+            compile_pattern(endpoint.pattern_block_timestamp)(res),
+            (endpoint.id, "block"),
+        )
+    except (TypeError, ValueError):
+        return None
+    return BlockRow(
+        block_number=block_number,
+        currency_id=endpoint.currency_id,
+        provider_id=endpoint.provider_id,
+        created_at=created_at,
+    )
+
+
+def backfill_endpoints(endpoints: list[EndpointConfig]) -> list[EndpointConfig]:
+    """
+    Endpoints that can fetch single blocks.
+    """
+    usable = []
+    for endpoint in endpoints:
+        if not endpoint.block_url or "{block_number}" not in endpoint.block_url:
+            continue
+        try:
+            compile_pattern(endpoint.pattern_block_timestamp)
+        except PatternError:
+            continue
+        usable.append(endpoint)
+    return usable
+
+
+async def backfill(
+    endpoints: list[EndpointConfig],
+    heights: Iterable[int],
+    batch_size: int,
+    concurrency: int,
+) -> AsyncIterator[tuple[int, int, int]]:
+    """
+    Fetch blocks of one currency in batches, spread over the endpoints
+    (round robin, each request also waits for its provider throttle)
+    with at most `concurrency` requests in flight, and store each batch
+    with one bulk insert.
+    Yield (requested, fetched, stored) per batch. Stored batches are
+    committed, so an interrupted backfill continues from the remaining gaps.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    endpoint_cycle = cycle(endpoints)
+
+    async def fetch(endpoint: EndpointConfig, block_number: int) -> BlockRow | None:
+        async with semaphore:
+            return await fetch_block(endpoint, block_number)
+
+    for batch in batched(heights, batch_size):
+        rows = await asyncio.gather(
+            *(fetch(next(endpoint_cycle), number) for number in batch)
+        )
+        rows = [row for row in rows if row]
+        stored = await db_sync_to_async(store_blocks)(rows, batch_size)
+        yield len(batch), len(rows), len(stored)
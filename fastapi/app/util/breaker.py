@@ -0,0 +1,123 @@
+import random
+import time
+from logging import getLogger
+
+from django.conf import settings
+
+
+logger = getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed: requests pass, consecutive failures are counted.
+    Open: requests are skipped until the recovery time passes.
+    Half-open: a single probe request decides between closed and open.
+    Every time the circuit opens again the recovery time doubles
+    (with jitter), up to max_recovery.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, recovery: float, max_recovery: float) -> None:
+        self.threshold = threshold
+        self.recovery = recovery
+        self.max_recovery = max_recovery
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.open_until = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() >= self.open_until:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+        return self.state == self.CLOSED
+
+    def success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after %s opens", self.opens)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._probing = False
+
+    def failure(self) -> None:
+        if self.state == self.OPEN:
+            # request sent before the circuit opened, already accounted for
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self._open()
+
+    def cancelled(self, probe: bool) -> None:
+        """
+        The allowed request was cancelled before it had a result,
+        probe: it was the half-open probe, another one may be sent.
+        """
+        if probe:
+            self._probing = False
+
+    def _open(self) -> None:
+        self.opens += 1
+        recovery = min(self.recovery * 2 ** (self.opens - 1), self.max_recovery)
+        recovery *= random.uniform(0.5, 1.0)
+        self.state = self.OPEN
+        self.open_until = time.monotonic() + recovery
+        self._probing = False
+        logger.warning(
+            "Circuit opened for %.1fs after %s failures", recovery, self.failures
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "retry_in": round(max(0.0, self.open_until - time.monotonic()), 1)
+            if self.state == self.OPEN
+            else 0.0,
+        }
+
+
+class BreakerRegistry:
+    """
+    CircuitBreaker per provider.
+    """
+
+    def __init__(self) -> None:
+        self._breakers: dict[int, CircuitBreaker] = {}
+
+    def get(self, provider_id: int) -> CircuitBreaker:
+        breaker = self._breakers.get(provider_id)
+        if breaker is None:
+            breaker = self._breakers[provider_id] = CircuitBreaker(
+                settings.COLLECTOR_BREAKER_THRESHOLD,
+                settings.COLLECTOR_BREAKER_RECOVERY,
+                settings.COLLECTOR_BREAKER_MAX_RECOVERY,
+            )
+        return breaker
+
+    def states(self) -> dict[int, dict]:
+        return {
+            provider_id: breaker.snapshot()
+            for provider_id, breaker in self._breakers.items()
+        }
+
+
+breakers = BreakerRegistry()
+
+
+def backoff(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for retry number attempt (0-based).
+    """
+    return random.uniform(0, settings.COLLECTOR_RETRY_BACKOFF * 2**attempt)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import AsyncIterator
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+
+logger = getLogger(__name__)
+
+CHANNEL = "blocks"
+
+
+class Subscription:
+    """
+    Queue of block events of one stream client, optionally limited
+    to some currencies. A client that does not keep up loses the
+    oldest events instead of holding memory of the process.
+    """
+
+    def __init__(self, currencies: set[str] | None, size: int) -> None:
+        self.currencies = {name.lower() for name in currencies} if currencies else None
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=size)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def wants(self, event: dict) -> bool:
+        return (
+            self.currencies is None
+            or event["currency"]["name"].lower() in self.currencies
+        )
+
+    def put(self, event: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class BlockBroadcaster:
+    """
+    Fan-out of newly stored blocks to stream clients (SSE / WebSocket).
+
+    With BLOCK_STREAM_URL (redis) the collector publishes every cycle
+    to one pub/sub channel and each API process holds a single
+    subscription, shared by all its clients. Without it blocks are
+    only delivered within the publishing process.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: set[Subscription] = set()
+        self._listener: asyncio.Task | None = None
+        self._publisher = None
+
+    @property
+    def url(self) -> str:
+        return settings.BLOCK_STREAM_URL
+
+    def publish(self, events: list[dict]) -> None:
+        """
+        Send events of one collection cycle, callable from any thread.
+        """
+        if not events:
+            return
+        if not self.url:
+            self._deliver(events)
+            return
+        if self._publisher is None:
+            self._publisher = redis.Redis.from_url(self.url)
+        try:
+            self._publisher.publish(CHANNEL, json.dumps(events, default=str))
+        except redis.RedisError as e:
+            logger.warning(f"Blocks not published: {e}")
+
+    def _deliver(self, events: list[dict]) -> None:
+        for subscription in list(self._subscriptions):
+            matching = [event for event in events if subscription.wants(event)]
+            for event in matching:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._deliver(json.loads(message["data"]))
+            except (redis.RedisError, OSError, ValueError) as e:
+                logger.warning(f"Block stream subscription lost: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+    @asynccontextmanager
+    async def subscribe(
+        self, currencies: set[str] | None = None
+    ) -> AsyncIterator[Subscription]:
+        subscription = Subscription(currencies, settings.BLOCK_STREAM_QUEUE_SIZE)
+        self._subscriptions.add(subscription)
+        if self.url and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+            if not self._subscriptions and self._listener is not None:
+                # no clients left, release the redis connection
+                self._listener.cancel()
+                self._listener = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+
+block_broadcaster = BlockBroadcaster()
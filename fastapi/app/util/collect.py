@@ -1,127 +1,469 @@
 import asyncio
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Awaitable, Callable
+
 import httpx
 
 from fastapi import APIRouter, Request
 
 from asgiref.sync import sync_to_async
-from django.core.exceptions import ValidationError
+from django.conf import settings
 from django.db import IntegrityError
+from django.utils import timezone
 
 from app.models import Currency, Provider, Endpoint, Block
+from app.schemas.block import BlockEventSchema
+from app.util.breaker import CircuitBreaker, backoff, breakers
+from app.util.broadcast import block_broadcaster
+from app.util.conditional import NOT_MODIFIED, conditional_cache
+from app.util.db import db_sync_to_async
+from app.util.extract import Extractor, PatternError, compile_pattern
+from app.util.hedge import collect_hedged, hedge_stats
+from app.util.heads import head_cache
+from app.util.http import client_registry
+from app.util.metrics import CYCLE_BUCKETS, LATENCY_BUCKETS, metrics
+from app.util.registry import EndpointConfig, endpoint_registry
+from app.util.schedule import claim_due_endpoints
+from app.util.store import BlockRow, store_blocks
+from app.util.stream import JSON_ERRORS, BodyTooLarge, read_fields
+from app.util.throttle import ProviderThrottle, throttle_registry
+from app.util.timestamps import timestamp_parser
+
+
+logger = getLogger(__name__)
+
+HTTP_LATENCY = metrics.histogram(
+    "collector_http_request_duration_seconds",
+    "Provider request time, including reading the body.",
+    LATENCY_BUCKETS,
+)
+HTTP_RESPONSES = metrics.counter(
+    "collector_http_responses_total",
+    "Provider responses by status code (error - no response, cancelled - lost a hedged race).",
+)
+HTTP_BYTES = metrics.counter(
+    "collector_http_response_bytes_total", "Bytes received from providers."
+)
+BREAKER_SKIPS = metrics.counter(
+    "collector_breaker_skipped_total", "Requests skipped by an open circuit."
+)
+EXTRACTION_FAILURES = metrics.counter(
+    "collector_extraction_failures_total",
+    "Responses without a usable block by reason.",
+)
+BLOCKS = metrics.counter(
+    "collector_blocks_total",
+    "Extracted blocks by result: inserted, duplicate (already in the DB) "
+    "or cached (known head, not sent to the DB).",
+)
+CYCLE_DURATION = metrics.histogram(
+    "collector_cycle_duration_seconds", "Duration of collection cycles.", CYCLE_BUCKETS
+)
+LAST_CYCLE = metrics.gauge(
+    "collector_last_cycle_timestamp_seconds", "Unix time of the last finished cycle."
+)
+BREAKER_STATE = metrics.gauge(
+    "collector_breaker_state", "Circuit breaker state per provider, 1 for the current state."
+)
+BREAKER_OPENS = metrics.gauge(
+    "collector_breaker_opens", "Times the circuit of a provider opened."
+)
+CONDITIONAL_HIT_RATIO = metrics.gauge(
+    "collector_conditional_hit_ratio", "Share of requests answered 304 Not Modified."
+)
+HEDGE_WINS = metrics.gauge(
+    "collector_hedge_wins", "Hedged races won per currency and provider."
+)
+HEAD_CACHE_HIT_RATIO = metrics.gauge(
+    "collector_head_cache_hit_ratio", "Share of extracted blocks found in the head cache."
+)
+
+
+@metrics.hook
+def _collector_state() -> None:
+    for provider_id, snapshot in breakers.states().items():
+        for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            BREAKER_STATE.set(
+                int(snapshot["state"] == state), provider_id=provider_id, state=state
+            )
+        BREAKER_OPENS.set(snapshot["opens"], provider_id=provider_id)
+    for endpoint_id, stats in conditional_cache.stats().items():
+        CONDITIONAL_HIT_RATIO.set(stats["hit_rate"], endpoint=endpoint_id)
+    for currency_id, stats in hedge_stats.stats().items():
+        for provider_id, wins in stats["wins"].items():
+            HEDGE_WINS.set(wins, currency_id=currency_id, provider_id=provider_id)
+    HEAD_CACHE_HIT_RATIO.set(head_cache.stats()["hit_rate"])
+
 
+def metric_labels(endpoint: EndpointConfig) -> dict[str, str | int]:
+    return {
+        "endpoint": endpoint.id,
+        "provider": endpoint.provider_name,
+        "currency": endpoint.currency_name,
+    }
 
-async def fetch_statistics(url: str, headers=None) -> str | None:
+
+def _provider_failure(error: Exception) -> bool:
     """
-    Fetch data from url and return it as a string.
+    Errors that count against the provider circuit breaker.
     """
-    if headers is None:
-        headers = {}
-    try:
-        timeout = httpx.Timeout(5.0, read=10.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-    except httpx.RequestError as e:
-        print(f"An error occurred while requesting {e.request.url!r}: {e}")
-    except httpx.HTTPStatusError as e:
-        print(f"Error response {e.response.status_code} "
-              f"while requesting {e.request.url!r}")
-
-    return None
+    if isinstance(error, httpx.HTTPStatusError):
+        return (error.response.is_server_error
+                or error.response.status_code == httpx.codes.TOO_MANY_REQUESTS)
+    return isinstance(error, httpx.RequestError)
 
 
-def get_value(data: dict, pattern: str) -> str:
+def _retryable(error: Exception) -> bool:
     """
-    Get value from nested dicts according the pattern and return it as a string.
+    Transport errors and server errors are worth another attempt,
+    429 and other client errors are not.
     """
-    keys = pattern.split(".")
-    value = data
-    for key in keys:
-        value = value.get(key, {})
-    if value:
-        return value
-    return ""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.is_server_error
+    return isinstance(error, httpx.RequestError)
 
 
-async def collect(endpoint_id: int) -> tuple | None:
+async def _fetch(
+        url: str,
+        read: Callable[[httpx.Response], Awaitable[Any]],
+        headers=None,
+        endpoint_id: int | None = None,
+        provider_id: int | None = None,
+        labels: dict | None = None,
+        throttle: ProviderThrottle | None = None,
+) -> Any:
     """
-    Collect data from one endpoint.
+    GET url from the shared per-host client pool and return read(response).
+    With endpoint_id the request is conditional and NOT_MODIFIED
+    is returned when the provider answers 304.
+    With provider_id the request goes through the provider circuit breaker
+    and failed attempts are retried with jittered exponential backoff.
+    Every attempt waits for throttle, backoff does not hold it.
+    Latency, status and size of every attempt are recorded with labels.
     """
+    labels = labels or {}
+    breaker = breakers.get(provider_id) if provider_id is not None else None
+    if breaker is not None and not breaker.allow():
+        logger.debug(f"Circuit open for provider {provider_id}, skip {url!r}")
+        BREAKER_SKIPS.inc(**labels)
+        return None
+    probe = breaker is not None and breaker.state == CircuitBreaker.HALF_OPEN
 
-    @sync_to_async
-    def get_endpoint_with_related(endpoint_id: int) -> Endpoint | None:
+    headers = {**(headers or {})}
+    if endpoint_id is not None:
+        headers.update(conditional_cache.request_headers(endpoint_id))
+    retries = settings.COLLECTOR_RETRIES if breaker is not None else 0
+    client = client_registry.get(url)
+
+    for attempt in range(retries + 1):
+        started = time.perf_counter()
+        status = "error"
+        response = None
         try:
-            endpoint = Endpoint.objects.select_related(
-                "currency", "provider"
-            ).get(id=endpoint_id)
-            return (
-                endpoint,
-                endpoint.currency.id,
-                endpoint.provider.id,
-                endpoint.provider.api_key
-            )
-        except Endpoint.DoesNotExist:
+            if attempt:
+                await asyncio.sleep(backoff(attempt - 1))
+            async with throttle or nullcontext():
+                started = time.perf_counter()
+                async with client.stream("GET", url, headers=headers) as response:
+                    status = response.status_code
+                    if endpoint_id is not None and conditional_cache.record(
+                        endpoint_id, response
+                    ):
+                        result = NOT_MODIFIED
+                    else:
+                        response.raise_for_status()
+                        result = await read(response)
+                        if endpoint_id is not None:
+                            conditional_cache.remember(endpoint_id, response)
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.warning(f"Error response {e.response.status_code} "
+                               f"while requesting {e.request.url!r}")
+            else:
+                logger.warning(f"An error occurred while requesting {e.request.url!r}: {e!r}")
+            if breaker is None:
+                return None
+            if not _provider_failure(e):
+                # provider is up, the request itself is wrong
+                breaker.success()
+                return None
+            breaker.failure()
+            if attempt == retries or not _retryable(e) or not breaker.allow():
+                return None
+            probe = breaker.state == CircuitBreaker.HALF_OPEN
+        except BodyTooLarge as e:
+            logger.warning(f"{e} while requesting {url!r}")
+            EXTRACTION_FAILURES.inc(reason="too_large", **labels)
+            if breaker is not None:
+                # provider answered, the payload is unusable
+                breaker.success()
             return None
+        except JSON_ERRORS as e:
+            logger.warning(f"Invalid JSON while requesting {url!r}: {e}")
+            EXTRACTION_FAILURES.inc(reason="json", **labels)
+            if breaker is not None:
+                breaker.success()
+            return None
+        except asyncio.CancelledError:
+            # e.g. lost a hedged race, a half-open probe has to be allowed again
+            status = "cancelled"
+            if breaker is not None:
+                breaker.cancelled(probe)
+            raise
+        except Exception:
+            # unexpected error, the request has no result for the breaker
+            if breaker is not None:
+                breaker.cancelled(probe)
+            raise
+        else:
+            if breaker is not None:
+                breaker.success()
+            return result
+        finally:
+            HTTP_LATENCY.observe(time.perf_counter() - started, **labels)
+            HTTP_RESPONSES.inc(status=status, **labels)
+            if response is not None:
+                HTTP_BYTES.inc(response.num_bytes_downloaded, **labels)
+    return None
 
-    @sync_to_async
-    def check_block_exists(block_number: int, currency_id: int) -> bool:
-        return Block.objects.filter(block_number=block_number, currency_id=currency_id).exists()
 
-    result = await get_endpoint_with_related(endpoint_id)
-    if result is None:
-        return {endpoint_id: None}
-    endpoint, currency_id, provider_id, provider_api_key = result
+async def _read_json(response: httpx.Response) -> Any:
+    await response.aread()
+    return response.json()
+
+
+async def fetch_statistics(
+        url: str,
+        headers=None,
+        endpoint_id: int | None = None,
+        provider_id: int | None = None,
+        labels: dict | None = None,
+        throttle: ProviderThrottle | None = None,
+) -> str | None:
+    """
+    Fetch data from url and return it as a string.
+    Conditional requests, circuit breaker, retries, throttle and metrics as in _fetch.
+    """
+    return await _fetch(
+        url, _read_json,
+        headers=headers, endpoint_id=endpoint_id, provider_id=provider_id,
+        labels=labels, throttle=throttle,
+    )
 
-    if endpoint.header and provider_api_key:
-        headers = {endpoint.header: provider_api_key}
-    else:
-        headers = None
 
-    res = await fetch_statistics(endpoint.url, headers=headers)
+async def fetch_fields(
+        url: str,
+        extractors: list[Extractor],
+        headers=None,
+        endpoint_id: int | None = None,
+        provider_id: int | None = None,
+        labels: dict | None = None,
+        throttle: ProviderThrottle | None = None,
+) -> list | None:
+    """
+    Stream the response of url and return only the values of extractors.
+    Reading stops as soon as all values are found.
+    Conditional requests, circuit breaker, retries, throttle and metrics as in _fetch.
+    """
+    async def read(response: httpx.Response) -> list:
+        return await read_fields(
+            response, extractors, settings.COLLECTOR_MAX_BODY_BYTES
+        )
+
+    return await _fetch(
+        url, read,
+        headers=headers, endpoint_id=endpoint_id, provider_id=provider_id,
+        labels=labels, throttle=throttle,
+    )
 
-    if not res:
-        return {endpoint_id: None}
 
+async def collect(endpoint: EndpointConfig) -> BlockRow | None:
+    """
+    Collect data from one endpoint.
+    Every request attempt waits for the concurrency and rate limits of the provider.
+    Return the extracted block, it is stored later for the whole cycle.
+    """
     try:
-        block_number = int(get_value(res, endpoint.pattern_block))
-        created_at = get_value(res, endpoint.pattern_timestamp)
-        if "Z" not in created_at:
-            created_at += "Z"  # time to utc
-
-        if await check_block_exists(block_number, currency_id):
-            print(f"Block ({block_number}, {currency_id}) already exists")
-            return {endpoint_id: None}
-
-        block = await sync_to_async(Block.objects.create)(
-            block_number=int(block_number),
-            currency_id=currency_id,
-            provider_id=provider_id,
-            created_at=created_at,
+        extractors = [
+            compile_pattern(endpoint.pattern_block),
+            compile_pattern(endpoint.pattern_timestamp),
+        ]
+    except PatternError as e:
+        logger.error(f"Endpoint {endpoint.id}: {e}")
+        EXTRACTION_FAILURES.inc(reason="pattern", **metric_labels(endpoint))
+        return None
+
+    labels = metric_labels(endpoint)
+    throttle = throttle_registry.get(endpoint)
+    if settings.COLLECTOR_STREAMING:
+        values = await fetch_fields(
+            endpoint.url, extractors,
+            headers=endpoint.headers,
+            endpoint_id=endpoint.id,
+            provider_id=endpoint.provider_id,
+            labels=labels,
+            throttle=throttle,
+        )
+    else:
+        res = await fetch_statistics(
+            endpoint.url,
+            headers=endpoint.headers,
+            endpoint_id=endpoint.id,
+            provider_id=endpoint.provider_id,
+            labels=labels,
+            throttle=throttle,
         )
-    except IntegrityError:
-        print("IntegrityError")
-    except ValidationError:
-        print("ValidationError")
-    except ValueError:
-        print("ValueError")
+        if res is NOT_MODIFIED or not res:
+            values = res
+        else:
+            values = [extractor(res) for extractor in extractors]
+
+    if values is NOT_MODIFIED:
+        # same head as the last full response, nothing to extract or store
+        return None
+    if not values:
+        return None
+
+    reason = "block_number"
+    try:
+        block_number = int(values[0])
+        reason = "timestamp"
+        created_at = timestamp_parser.parse(values[1], endpoint.id)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Endpoint {endpoint.id}: invalid {reason}: {e}")
+        EXTRACTION_FAILURES.inc(reason=reason, **labels)
+        conditional_cache.forget(endpoint.id)
     else:
-        return {endpoint_id: f"Endpoint: {endpoint_id} "
-                             f"Added at {block.stored_at}"}
-    return {endpoint_id: None}
+        return BlockRow(
+            block_number=block_number,
+            currency_id=endpoint.currency_id,
+            provider_id=endpoint.provider_id,
+            created_at=created_at,
+        )
+    return None
+
+
+def block_event(endpoint: EndpointConfig, row: BlockRow, stored_at: datetime) -> dict:
+    return BlockEventSchema(
+        block_number=row.block_number,
+        created_at=row.created_at,
+        stored_at=stored_at,
+        currency={"id": endpoint.currency_id, "name": endpoint.currency_name},
+        provider={"id": endpoint.provider_id, "name": endpoint.provider_name},
+    ).model_dump(mode="json")
+
 
+def _store(rows: list[BlockRow]) -> dict[tuple[int, int], tuple[int, datetime]]:
+    """
+    Insert blocks and remember them in the head cache.
+    """
+    stored = store_blocks(rows)
+    if head_cache.enabled:
+        head_cache.update(rows)
+    return stored
 
-async def collect_all() -> list[dict[int, str | None]]:
+
+async def collect_all(
+        endpoints: list[EndpointConfig] | None = None
+) -> list[dict[int, str | None]]:
     """
-    Collect data from all endpoint urls.
+    Collect data from all endpoint urls (or only from the given endpoints).
     Run all tasks as separate in parallel.
+    Endpoints come from the in-process registry,
+    so a cycle costs no per-endpoint config queries.
+    In hedged mode the providers of a currency race and
+    only the first answer is kept.
+    Blocks already known to the head cache are skipped,
+    the rest are written with one bulk insert.
+    New blocks are published to stream clients (see app.util.broadcast),
+    cycle metrics are written to METRICS_DIR at the end.
     """
+    started = time.perf_counter()
+    if endpoints is None:
+        endpoints = await endpoint_registry.aget_all()
+    if settings.COLLECTOR_HEDGED:
+        rows = await collect_hedged(
+            endpoints, collect, settings.COLLECTOR_HEDGE_DEADLINE
+        )
+    else:
+        tasks = [collect(endpoint) for endpoint in endpoints]
+        rows = await asyncio.gather(*tasks)
+
+    found = [row for row in rows if row]
+    cached = set()
+    if head_cache.enabled and found:
+        await head_cache.arefresh()
+        currency_ids = {row.currency_id for row in found}
+        missing = head_cache.missing(currency_ids)
+        if missing:
+            await db_sync_to_async(head_cache.warm)(missing)
+        if head_cache.shared:
+            await head_cache.aload_shared(currency_ids)
+        # unchanged heads are dropped here, without a DB round trip
+        cached = {row.key for row in found if head_cache.seen(row)}
+        found = [row for row in found if row.key not in cached]
 
-    tasks = []
-    endpoints = await sync_to_async(Endpoint.objects.all)()
-    async for endpoint in endpoints:
-        tasks.append(collect(endpoint.id))
+    try:
+        stored = await db_sync_to_async(_store)(found) if found else {}
+    except IntegrityError as e:
+        logger.error(f"Blocks not stored: {e}")
+        for endpoint in endpoints:
+            conditional_cache.forget(endpoint.id)
+        stored = {}
 
-    results = await asyncio.gather(*tasks)
+    results = []
+    events = []
+    for endpoint, row in zip(endpoints, rows):
+        new = stored.get(row.key) if row else None
+        if new and new[0] == endpoint.provider_id:
+            results.append({endpoint.id: f"Endpoint: {endpoint.id} "
+                                         f"Added at {new[1]}"})
+            BLOCKS.inc(result="inserted", **metric_labels(endpoint))
+            events.append(block_event(endpoint, row, new[1]))
+        else:
+            if row:
+                logger.debug(f"Block ({row.block_number}, {row.currency_id}) already exists")
+                result = "cached" if row.key in cached else "duplicate"
+                BLOCKS.inc(result=result, **metric_labels(endpoint))
+            results.append({endpoint.id: None})
 
+    if events:
+        await sync_to_async(block_broadcaster.publish, thread_sensitive=False)(events)
+    CYCLE_DURATION.observe(time.perf_counter() - started)
+    LAST_CYCLE.set(time.time())
+    metrics.write()
     return results
+
+
+async def claim_due() -> list[EndpointConfig]:
+    """
+    Endpoints whose polling time has come,
+    their next poll is scheduled from the observed block interval.
+    """
+    endpoints = await endpoint_registry.aget_all()
+    due_ids = await db_sync_to_async(claim_due_endpoints)(endpoints, timezone.now())
+    return [endpoint for endpoint in endpoints if endpoint.id in due_ids]
+
+
+async def collect_due() -> list[dict[int, str | None]]:
+    """
+    Collect data only from endpoints whose polling time has come.
+    """
+    endpoints = await claim_due()
+    if not endpoints:
+        return []
+    return await collect_all(endpoints)
+
+
+async def collect_ids(endpoint_ids: list[int]) -> list[dict[int, str | None]]:
+    """
+    Collect data from the given endpoints (one shard of a cycle).
+    """
+    endpoint_ids = set(endpoint_ids)
+    endpoints = await endpoint_registry.aget_all()
+    return await collect_all(
+        [endpoint for endpoint in endpoints if endpoint.id in endpoint_ids]
+    )
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import httpx
+
+
+NOT_MODIFIED = object()
+
+
+@dataclass
+class ConditionalState:
+    etag: str | None = None
+    last_modified: str | None = None
+    requests: int = 0
+    not_modified: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.not_modified / self.requests if self.requests else 0.0
+
+
+class ConditionalCache:
+    """
+    ETag / Last-Modified validators of the last full response per endpoint,
+    with counters of requests answered by 304 Not Modified.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[int, ConditionalState] = {}
+
+    def request_headers(self, endpoint_id: int) -> dict[str, str]:
+        state = self._states.get(endpoint_id)
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def record(self, endpoint_id: int, response: httpx.Response) -> bool:
+        """
+        Count the response.
+        Return True if the response is 304 Not Modified.
+        """
+        state = self._states.setdefault(endpoint_id, ConditionalState())
+        state.requests += 1
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            state.not_modified += 1
+            return True
+        return False
+
+    def remember(self, endpoint_id: int, response: httpx.Response) -> None:
+        """
+        Keep the validators of a full response once its body was processed,
+        a body that could not be read must be downloaded again.
+        """
+        if not response.is_success:
+            return
+        state = self._states.setdefault(endpoint_id, ConditionalState())
+        state.etag = response.headers.get("ETag")
+        state.last_modified = response.headers.get("Last-Modified")
+
+    def forget(self, endpoint_id: int) -> None:
+        """
+        Drop validators, so the next request downloads the full response
+        again (e.g. when the last one could not be processed).
+        """
+        state = self._states.get(endpoint_id)
+        if state is not None:
+            state.etag = state.last_modified = None
+
+    def stats(self) -> dict[int, dict]:
+        return {
+            endpoint_id: {
+                "requests": state.requests,
+                "not_modified": state.not_modified,
+                "hit_rate": round(state.hit_rate, 3),
+            }
+            for endpoint_id, state in self._states.items()
+        }
+
+
+conditional_cache = ConditionalCache()
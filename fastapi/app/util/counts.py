@@ -0,0 +1,81 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+
+from app.models import Block
+from app.util.db import db_sync_to_async
+from app.util.versions import aget_version
+
+
+VERSION = "block_counts"
+
+
+def estimate_blocks() -> int | None:
+    """
+    Row count of the block table from the planner statistics
+    (pg_class.reltuples, kept up to date by autovacuum / ANALYZE),
+    None on other databases and before the first ANALYZE.
+    """
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [Block._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class BlockCounts:
+    """
+    Totals of block listings without a COUNT(*) per request.
+
+    Counts are kept in the Django cache (Redis with CACHE_URL) for
+    BLOCK_COUNT_CACHE_TTL seconds per filter combination, so they lag
+    behind the collector by at most the TTL. Changes of blocks outside
+    the collector (admin) bump the version and drop them at once.
+    With BLOCK_COUNT_ESTIMATE the unfiltered total of a large table is
+    the planner estimate instead.
+    """
+
+    KEY_PREFIX = "block_count:"
+
+    def _key(self, filters: dict, version: int) -> str:
+        digest = hashlib.md5(
+            json.dumps(filters, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{self.KEY_PREFIX}{version}:{digest}"
+
+    async def acount(self, queryset: QuerySet, filters: dict) -> tuple[int, bool]:
+        """
+        Total rows of queryset and whether it was counted for this call.
+        filters (normalised query parameters) identify the queryset.
+        """
+        filters = {name: value for name, value in filters.items() if value}
+        if not filters and settings.BLOCK_COUNT_ESTIMATE:
+            estimate = await db_sync_to_async(estimate_blocks)()
+            # small tables are counted, the estimate is rough there
+            if estimate is not None and estimate >= settings.BLOCK_COUNT_ESTIMATE_MIN:
+                return estimate, False
+
+        ttl = settings.BLOCK_COUNT_CACHE_TTL
+        if ttl <= 0:
+            return await db_sync_to_async(queryset.count)(), True
+
+        key = self._key(filters, await aget_version(VERSION))
+        total = await cache.aget(key)
+        if total is not None:
+            return total, False
+        total = await db_sync_to_async(queryset.count)()
+        await cache.aset(key, total, timeout=ttl)
+        return total, True
+
+
+block_counts = BlockCounts()
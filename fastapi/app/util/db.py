@@ -0,0 +1,105 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from app.util.metrics import metrics, process_name
+from config.db.backends.postgresql_pool.pool import pool_stats
+
+
+T = TypeVar("T")
+
+POOL_GAUGES = {
+    "size": "Open connections of the pool.",
+    "idle": "Idle connections of the pool.",
+    "in_use": "Connections checked out of the pool.",
+    "max_size": "Connection limit of the pool.",
+    "checkouts": "Connections taken from the pool.",
+    "waits": "Times a checkout waited for a free connection.",
+    "checkout_seconds": "Total time spent taking connections from the pool.",
+    "timeouts": "Checkouts that found no free connection in time.",
+    "opened": "Connections opened by the pool.",
+    "discarded": "Connections closed by the pool (broken, too old, failed check).",
+    "failed_checks": "Idle connections that failed the health check.",
+}
+_pool_gauges = {
+    name: metrics.gauge(f"db_pool_{name}", documentation)
+    for name, documentation in POOL_GAUGES.items()
+}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+
+
+def db_executor() -> ThreadPoolExecutor:
+    """
+    Bounded pool of DB threads of this process, every thread holds its own
+    Django connection, so DB_EXECUTOR_WORKERS is also the connection limit
+    (with DB_POOL the threads share the smaller connection pool).
+    Created lazily and again after fork (Celery prefork workers).
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+        )
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _release_connections() -> None:
+    """
+    Connections of this DB thread after a call: pooled ones go back to
+    the pool, others are kept for the next call of the thread and closed
+    only when broken or older than a positive CONN_MAX_AGE. With the
+    default CONN_MAX_AGE = 0 a Django request would close them, here
+    every call would open a new connection.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is None:
+            continue
+        if getattr(connection, "pooled", False):
+            connection.close()
+        elif connection.settings_dict["CONN_MAX_AGE"] == 0:
+            if connection.errors_occurred and not connection.is_usable():
+                connection.close()
+        else:
+            connection.close_if_unusable_or_obsolete()
+
+
+def _with_connection(func: Callable[..., T], *args, **kwargs) -> T:
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _release_connections()
+
+
+def db_sync_to_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Like sync_to_async, but runs ORM code on the bounded DB thread pool
+    instead of the single thread shared by all thread_sensitive calls,
+    so concurrent requests use as many connections as there are threads.
+
+    The whole function runs in one thread, transaction.atomic() inside it
+    is safe. Usable as a decorator.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        return await sync_to_async(
+            _with_connection, thread_sensitive=False, executor=db_executor()
+        )(func, *args, **kwargs)
+
+    return wrapper
+
+
+@metrics.hook
+def _pool_state() -> None:
+    # postgresql_pool backend only, gauges per process as pools are per process
+    for alias, stats in pool_stats().items():
+        for name, value in stats.items():
+            _pool_gauges[name].set(value, database=alias, process=process_name())
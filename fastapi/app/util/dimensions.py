@@ -0,0 +1,124 @@
+import time
+from typing import Callable, TypeVar
+
+from django.conf import settings
+
+from app.models import Currency, Provider
+from app.schemas.currency import CurrencyListItemSchema
+from app.schemas.provider import ProviderListItemSchema
+from app.util.db import db_sync_to_async
+from app.util.versions import aget_version, bump_version
+
+
+T = TypeVar("T")
+
+
+class DimensionCache:
+    """
+    Process-local copy of the currency and provider tables, so block
+    queries filter by integer ids instead of joining them by name.
+
+    Names are compared case-folded like Django's iexact / icontains on
+    Postgres (UPPER). Reloaded when the shared version is bumped by model
+    signals (see app.signals), after DIMENSION_CACHE_TTL seconds, and on
+    a lookup miss at most every MISS_RELOAD seconds (rows created by a
+    process that does not share the cache backend); rows referenced by a
+    block are reloaded on every miss.
+    """
+
+    VERSION_NAME = "dimensions"
+    MISS_RELOAD = 5.0
+
+    def __init__(self) -> None:
+        self._currencies: dict[int, CurrencyListItemSchema] = {}
+        self._providers: dict[int, ProviderListItemSchema] = {}
+        self._currency_ids: dict[str, int] = {}
+        self._provider_names: list[tuple[str, int]] = []
+        self._version: int | None = None
+        self._loaded_at = 0.0
+
+    def invalidate(self) -> None:
+        # lookups keep the old data until the next load
+        self._version = None
+
+    @classmethod
+    def changed(cls) -> None:
+        """
+        Invalidate dimension caches of all processes.
+        """
+        dimension_cache.invalidate()
+        bump_version(cls.VERSION_NAME)
+
+    @staticmethod
+    def _load() -> tuple[list, list]:
+        return (
+            list(Currency.objects.values_list("id", "name")),
+            list(Provider.objects.values_list("id", "name")),
+        )
+
+    def _is_stale(self, version: int) -> bool:
+        return (
+            self._version is None
+            or version != self._version
+            or time.monotonic() - self._loaded_at > settings.DIMENSION_CACHE_TTL
+        )
+
+    async def aload(self, force: bool = False) -> None:
+        version = await aget_version(self.VERSION_NAME)
+        if not force and not self._is_stale(version):
+            return
+        currencies, providers = await db_sync_to_async(self._load)()
+        self._currencies = {
+            id: CurrencyListItemSchema(id=id, name=name) for id, name in currencies
+        }
+        self._providers = {
+            id: ProviderListItemSchema(id=id, name=name) for id, name in providers
+        }
+        self._currency_ids = {name.upper(): id for id, name in currencies}
+        self._provider_names = [(name.upper(), id) for id, name in providers]
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    async def _aget(self, lookup: Callable[[], T], exists: bool = False) -> T:
+        """
+        lookup() on the loaded tables. exists: the row is known to exist
+        (referenced by a block), a miss always reloads the tables.
+        """
+        await self.aload()
+        value = lookup()
+        if not value and (
+            exists or time.monotonic() - self._loaded_at > self.MISS_RELOAD
+        ):
+            await self.aload(force=True)
+            value = lookup()
+        return value
+
+    async def acurrency_id(self, name: str) -> int | None:
+        """
+        Id of the currency called name (case-insensitive).
+        """
+        return await self._aget(lambda: self._currency_ids.get(name.upper()))
+
+    async def aprovider_ids(self, part: str) -> set[int]:
+        """
+        Ids of providers with part in the name (case-insensitive).
+        """
+        part = part.upper()
+        return await self._aget(
+            lambda: {id for name, id in self._provider_names if part in name}
+        )
+
+    async def acurrency(self, currency_id: int) -> CurrencyListItemSchema | None:
+        """
+        Currency of a block, None only if the row is gone.
+        """
+        return await self._aget(lambda: self._currencies.get(currency_id), exists=True)
+
+    async def aprovider(self, provider_id: int) -> ProviderListItemSchema | None:
+        """
+        Provider of a block, None only if the row is gone.
+        """
+        return await self._aget(lambda: self._providers.get(provider_id), exists=True)
+
+
+dimension_cache = DimensionCache()
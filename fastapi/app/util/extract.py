@@ -0,0 +1,180 @@
+import re
+from functools import lru_cache
+from typing import Any
+
+
+class PatternError(ValueError):
+    pass
+
+
+WILDCARD = object()
+
+_SEGMENT = re.compile(
+    r"""
+    (?P<key>[^.\[\]]+)            # plain key, index or *
+    | \[(?P<index>-?\d+|\*)\]     # [0], [-1], [*]
+    | \[(?P<quote>['"])(?P<name>.*?)(?P=quote)\]  # ['key with.dots']
+    | (?P<dot>\.)
+    """,
+    re.VERBOSE,
+)
+
+
+def _parse(pattern: str) -> tuple:
+    """
+    Split pattern into steps. Each step is WILDCARD or (key, index),
+    where index is the int value of a numeric key (used on lists).
+    """
+    if pattern.startswith("$"):
+        pattern = pattern[1:]
+    steps = []
+    pos = 0
+    previous = None  # kind of the previous segment: "key", "bracket" or "dot"
+    while pos < len(pattern):
+        match = _SEGMENT.match(pattern, pos)
+        if match is None:
+            raise PatternError(f"Invalid pattern {pattern!r} at {pos}")
+        if match["dot"]:
+            kind = "dot"
+        elif match["key"] is not None:
+            kind = "key"
+        else:
+            kind = "bracket"
+        # a key follows a dot ("data[0]height" is invalid), no empty segments
+        if (kind == "key" and previous not in (None, "dot")) or (
+            kind == "dot" and previous == "dot"
+        ):
+            raise PatternError(f"Invalid pattern {pattern!r} at {pos}")
+        pos = match.end()
+        previous = kind
+        if kind == "dot":
+            continue
+        token = match["key"] or match["index"]
+        if token == "*":
+            steps.append(WILDCARD)
+        elif token is not None:
+            index = int(token) if token.lstrip("-").isdigit() else None
+            steps.append((token, index))
+        else:
+            steps.append((match["name"], None))
+    if previous == "dot":
+        raise PatternError(f"Invalid pattern {pattern!r} at {pos}")
+    if not steps:
+        raise PatternError(f"Empty pattern {pattern!r}")
+    return tuple(steps)
+
+
+class Extractor:
+    """
+    Compiled accessor for one pattern, e.g. "data.BTC.total_blocks",
+    "data.0.height", "$.data[-1].time" or "data[*].height"
+    (the first element that has the rest of the path wins).
+    """
+
+    __slots__ = ("pattern", "steps", "_has_wildcard")
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.steps = _parse(pattern)
+        self._has_wildcard = WILDCARD in self.steps
+
+    def __call__(self, data: Any) -> Any:
+        """
+        Return the value at the pattern path or None.
+        """
+        if self._has_wildcard:
+            return self._search(data, 0)
+
+        value = data
+        for key, index in self.steps:
+            value_type = type(value)
+            if value_type is dict:
+                if key not in value:
+                    return None
+                value = value[key]
+            elif value_type is list and index is not None:
+                try:
+                    value = value[index]
+                except IndexError:
+                    return None
+            else:
+                return None
+        return value
+
+    def _search(self, value: Any, position: int) -> Any:
+        for step_no in range(position, len(self.steps)):
+            step = self.steps[step_no]
+            if step is WILDCARD:
+                if isinstance(value, dict):
+                    children = value.values()
+                elif isinstance(value, list):
+                    children = value
+                else:
+                    return None
+                for child in children:
+                    found = self._search(child, step_no + 1)
+                    if found is not None:
+                        return found
+                return None
+
+            key, index = step
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and index is not None:
+                try:
+                    value = value[index]
+                except IndexError:
+                    return None
+            else:
+                return None
+            if value is None:
+                return None
+        return value
+
+    @property
+    def streamable(self) -> bool:
+        """
+        Negative list indices need the whole list, so they can not
+        be resolved while the document is still being read.
+        """
+        return all(
+            step is WILDCARD or step[1] is None or step[1] >= 0 for step in self.steps
+        )
+
+    def matches(self, path: tuple) -> bool:
+        """
+        True if the concrete path (map keys and list positions)
+        is addressed by the pattern.
+        """
+        if len(path) != len(self.steps):
+            return False
+        for item, step in zip(path, self.steps):
+            if step is WILDCARD:
+                continue
+            key, index = step
+            if type(item) is int:
+                if item != index:
+                    return False
+            elif item != key:
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"Extractor({self.pattern!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> Extractor:
+    """
+    Compile pattern once, compiled extractors are shared by pattern string.
+    """
+    if not pattern:
+        raise PatternError("Empty pattern")
+    return Extractor(pattern)
+
+
+def extract(data: Any, pattern: str) -> Any:
+    """
+    Get value from nested dicts / lists according the pattern.
+    """
+    return compile_pattern(pattern)(data)
@@ -0,0 +1,163 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+
+from app.models import Block
+from app.util.store import BlockRow
+from app.util.versions import aget_version, bump_version
+
+
+class HeadCache:
+    """
+    Block numbers recently stored per currency (the head and the numbers
+    just below it), so a poll that returns an already stored head is
+    dropped without a DB round trip.
+
+    Warmed from the DB once per currency and updated after every insert.
+    With COLLECTOR_HEAD_CACHE = "shared" the numbers are also kept in the
+    Django cache (Redis), so blocks stored by other workers are known too.
+    A miss is harmless: the insert skips existing blocks anyway.
+
+    Blocks deleted by another process (admin, API) bump a shared version
+    and every collector drops its numbers before the next cycle; without
+    a shared cache backend (CACHE_URL) numbers are dropped after
+    COLLECTOR_HEAD_CACHE_TTL seconds at the latest.
+    """
+
+    KEY_PREFIX = "heads:"
+    VERSION_NAME = "heads"
+
+    def __init__(self, size: int | None = None) -> None:
+        self.size = size or settings.COLLECTOR_HEAD_CACHE_SIZE
+        self._numbers: dict[int, set[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._version: int | None = None
+        self._reset_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.COLLECTOR_HEAD_CACHE != "none"
+
+    @property
+    def shared(self) -> bool:
+        return settings.COLLECTOR_HEAD_CACHE == "shared"
+
+    def _key(self, currency_id: int) -> str:
+        return f"{self.KEY_PREFIX}{currency_id}"
+
+    def _add(self, currency_id: int, numbers) -> None:
+        known = self._numbers.setdefault(currency_id, set())
+        known.update(numbers)
+        if len(known) > 2 * self.size:
+            lowest = max(known) - self.size
+            self._numbers[currency_id] = {number for number in known if number > lowest}
+
+    async def arefresh(self) -> None:
+        """
+        Drop all numbers when blocks were deleted elsewhere
+        or they are older than COLLECTOR_HEAD_CACHE_TTL.
+        """
+        version = await aget_version(self.VERSION_NAME)
+        expired = time.monotonic() - self._reset_at > settings.COLLECTOR_HEAD_CACHE_TTL
+        if version != self._version or expired:
+            self._numbers = {}
+            self._version = version
+            self._reset_at = time.monotonic()
+
+    def missing(self, currency_ids: set[int]) -> set[int]:
+        """
+        Currencies not warmed yet in this process.
+        """
+        return {
+            currency_id
+            for currency_id in currency_ids
+            if currency_id not in self._numbers
+        }
+
+    def warm(self, currency_ids: set[int]) -> None:
+        """
+        Load the last `size` stored block numbers of the currencies:
+        one aggregate query for the heads and one for the numbers below.
+        """
+        heads = dict(
+            Block.objects.filter(currency_id__in=currency_ids)
+            .values("currency_id")
+            .annotate(head=Max("block_number"))
+            .values_list("currency_id", "head")
+        )
+        for currency_id in currency_ids:
+            self._numbers.setdefault(currency_id, set())
+        if not heads:
+            return
+
+        recent = Q()
+        for currency_id, head in heads.items():
+            recent |= Q(currency_id=currency_id, block_number__gt=head - self.size)
+        rows = Block.objects.filter(recent).values_list("currency_id", "block_number")
+        for currency_id, number in rows:
+            self._add(currency_id, (number,))
+
+    async def aload_shared(self, currency_ids: set[int]) -> None:
+        """
+        Merge numbers stored by other processes, one cache round trip.
+        """
+        values = await cache.aget_many([self._key(pk) for pk in currency_ids])
+        for key, numbers in values.items():
+            self._add(int(key[len(self.KEY_PREFIX) :]), numbers)
+
+    def seen(self, row: BlockRow) -> bool:
+        """
+        True if the block is known to be stored already.
+        """
+        found = row.block_number in self._numbers.get(row.currency_id, ())
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def update(self, rows: list[BlockRow]) -> None:
+        """
+        Remember blocks that are in the DB now (inserted or already there).
+        """
+        currency_ids = set()
+        for row in rows:
+            self._add(row.currency_id, (row.block_number,))
+            currency_ids.add(row.currency_id)
+        if self.shared and currency_ids:
+            cache.set_many(
+                {
+                    self._key(currency_id): sorted(self._numbers[currency_id])
+                    for currency_id in currency_ids
+                },
+                timeout=settings.COLLECTOR_HEAD_CACHE_TTL,
+            )
+
+    def forget(self, currency_id: int) -> None:
+        """
+        Drop the numbers of a currency, e.g. after its blocks are deleted.
+        """
+        self._numbers.pop(currency_id, None)
+        if self.shared:
+            cache.delete(self._key(currency_id))
+
+    @classmethod
+    def changed(cls) -> None:
+        """
+        Make the collector processes drop their numbers before the next cycle.
+        """
+        bump_version(cls.VERSION_NAME)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+head_cache = HeadCache()
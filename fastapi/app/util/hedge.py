@@ -0,0 +1,100 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable
+
+from app.util.registry import EndpointConfig
+from app.util.store import BlockRow
+
+
+class HedgeStats:
+    """
+    How often each provider won the race for a currency.
+    """
+
+    def __init__(self) -> None:
+        self._wins: dict[int, Counter] = defaultdict(Counter)
+        self._no_winner: Counter = Counter()
+
+    def record(self, currency_id: int, provider_id: int | None) -> None:
+        if provider_id is None:
+            self._no_winner[currency_id] += 1
+        else:
+            self._wins[currency_id][provider_id] += 1
+
+    def stats(self) -> dict[int, dict]:
+        return {
+            currency_id: {
+                "wins": dict(self._wins.get(currency_id, {})),
+                "no_winner": self._no_winner.get(currency_id, 0),
+            }
+            for currency_id in self._wins.keys() | self._no_winner.keys()
+        }
+
+
+hedge_stats = HedgeStats()
+
+
+async def race(
+    endpoints: list[EndpointConfig],
+    collect: Callable[[EndpointConfig], Awaitable[BlockRow | None]],
+    deadline: float,
+) -> dict[int, BlockRow | None]:
+    """
+    Query all endpoints of one currency at once and keep the first block
+    returned within deadline seconds (the highest one if several arrive
+    together). The other requests are cancelled.
+    Return {endpoint_id: row} with the row only for the winner.
+    """
+    loop = asyncio.get_running_loop()
+    tasks = {asyncio.create_task(collect(endpoint)): endpoint for endpoint in endpoints}
+    pending = set(tasks)
+    winner: tuple[EndpointConfig, BlockRow] | None = None
+    end = loop.time() + deadline
+    try:
+        while pending and winner is None:
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                row = task.result()
+                if row and (
+                    winner is None or row.block_number > winner[1].block_number
+                ):
+                    winner = tasks[task], row
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    hedge_stats.record(
+        endpoints[0].currency_id, winner[0].provider_id if winner else None
+    )
+    rows = {endpoint.id: None for endpoint in endpoints}
+    if winner:
+        rows[winner[0].id] = winner[1]
+    return rows
+
+
+async def collect_hedged(
+    endpoints: list[EndpointConfig],
+    collect: Callable[[EndpointConfig], Awaitable[BlockRow | None]],
+    deadline: float,
+) -> list[BlockRow | None]:
+    """
+    Race the providers of every currency, currencies run in parallel.
+    Return rows in the order of endpoints.
+    """
+    by_currency = defaultdict(list)
+    for endpoint in endpoints:
+        by_currency[endpoint.currency_id].append(endpoint)
+
+    races = await asyncio.gather(
+        *(race(group, collect, deadline) for group in by_currency.values())
+    )
+    rows = {}
+    for result in races:
+        rows.update(result)
+    return [rows[endpoint.id] for endpoint in endpoints]
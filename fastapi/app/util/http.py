@@ -0,0 +1,129 @@
+import asyncio
+import importlib.util
+import socket
+from logging import getLogger
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+
+
+logger = getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """
+    HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`).
+    """
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """
+    Long-lived httpx.AsyncClient per provider host.
+
+    Clients keep their keep-alive pools between collection cycles,
+    so a poll does not pay DNS, TCP and TLS setup again.
+    Connection pools belong to the event loop they were opened on,
+    so the registry starts over when it is used from another loop.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # custom transport for new clients, e.g. httpx.MockTransport in benchmarks
+        self.transport: httpx.AsyncBaseTransport | None = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = settings.COLLECTOR_HTTP2
+        if http2 and not http2_available():
+            logger.warning(
+                "COLLECTOR_HTTP2 is set but `h2` is not installed, "
+                "falling back to HTTP/1.1"
+            )
+            http2 = False
+
+        return httpx.AsyncClient(
+            transport=self.transport,
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.COLLECTOR_HTTP_CONNECT_TIMEOUT,
+                read=settings.COLLECTOR_HTTP_READ_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.COLLECTOR_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.COLLECTOR_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.COLLECTOR_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """
+        Return the shared client for the host of url.
+        Must be called from inside a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # pools opened on another (finished) loop can not be reused
+            if self._loop is not None:
+                _close_on_loop(list(self._clients.values()), self._loop)
+            self._clients = {}
+            self._loop = loop
+
+        host = urlsplit(url).netloc
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = self._clients[host] = self._create_client()
+        return client
+
+    async def aclose(self) -> None:
+        """
+        Close all clients of the current loop.
+        """
+        clients = list(self._clients.values())
+        self._clients = {}
+        self._loop = None
+        await _aclose_all(clients)
+
+
+def _close_on_loop(
+    clients: list[httpx.AsyncClient], loop: asyncio.AbstractEventLoop
+) -> None:
+    """
+    Close clients of loop from outside of it: on the loop when it still
+    runs or will run again, otherwise shut their sockets down directly
+    (a closed loop can not run the client's aclose()).
+    """
+    if not clients:
+        return
+    if not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_aclose_all(clients), loop)
+        return
+    for client in clients:
+        _shutdown_sockets(client)
+
+
+async def _aclose_all(clients: list[httpx.AsyncClient]) -> None:
+    await asyncio.gather(
+        *(client.aclose() for client in clients), return_exceptions=True
+    )
+
+
+def _shutdown_sockets(client: httpx.AsyncClient) -> None:
+    # httpx -> httpcore connection pool -> HTTP/1.1 or HTTP/2 connection;
+    # custom transports (MockTransport) have no pool
+    pool = getattr(client._transport, "_pool", None)
+    for connection in getattr(pool, "connections", ()):
+        protocol = getattr(connection, "_connection", None)
+        stream = getattr(protocol, "_network_stream", None)
+        sock = stream.get_extra_info("socket") if stream is not None else None
+        if sock is None:
+            continue
+        try:
+            # the fd is released with the transport of the closed loop
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+client_registry = ClientRegistry()
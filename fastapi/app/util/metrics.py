@@ -0,0 +1,243 @@
+import json
+import os
+import socket
+import time
+from bisect import bisect_left
+from logging import getLogger
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+
+
+logger = getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[tuple, float] = {}
+
+    def samples(self) -> list:
+        return [[dict(key), value] for key, value in self._values.items()]
+
+    def family(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "samples": self.samples(),
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_labels_key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple) -> None:
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        self._values: dict[tuple, dict] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels_key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = {
+                "counts": [0] * (len(self.buckets) + 1),
+                "sum": 0.0,
+            }
+        # counts per bucket, made cumulative when rendered
+        state["counts"][bisect_left(self.buckets, value)] += 1
+        state["sum"] += value
+
+    def family(self) -> dict:
+        return {**super().family(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms of this process in Prometheus terms.
+
+    Collector processes write a snapshot to METRICS_DIR after every cycle,
+    the API renders the merged snapshots of all processes (see render).
+    Hooks refresh gauges from other state (breakers etc.) before a snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._hooks: list[Callable[[], None]] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._add(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._add(Gauge(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: tuple) -> Histogram:
+        return self._add(Histogram(name, documentation, buckets))
+
+    def hook(self, function: Callable[[], None]) -> Callable[[], None]:
+        self._hooks.append(function)
+        return function
+
+    def snapshot(self) -> dict[str, dict]:
+        for function in self._hooks:
+            function()
+        return {name: metric.family() for name, metric in self._metrics.items()}
+
+    def _path(self, directory: str) -> Path:
+        return Path(directory) / f"{process_name()}.json"
+
+    def write(self, directory: str | None = None) -> None:
+        """
+        Replace the snapshot file of this process atomically.
+        """
+        directory = directory or settings.METRICS_DIR
+        if not directory:
+            return
+        path = self._path(directory)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.snapshot()))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Can not write metrics to {path}: {e}")
+
+
+def read_snapshots(directory: str, max_age: float) -> list[dict]:
+    """
+    Snapshots of all processes, oldest first.
+    Files not updated for max_age seconds belong to stopped processes
+    and are removed.
+    """
+    snapshots = []
+    now = time.time()
+    for path in Path(directory).glob("*.json"):
+        try:
+            mtime = path.stat().st_mtime
+            if now - mtime > max_age:
+                path.unlink()
+                continue
+            snapshots.append((mtime, json.loads(path.read_text())))
+        except (OSError, ValueError):
+            continue  # replaced or removed concurrently
+    snapshots.sort(key=lambda item: item[0])
+    return [snapshot for _, snapshot in snapshots]
+
+
+def merge(snapshots: list[dict]) -> dict[str, dict]:
+    """
+    Counters and histograms are summed over processes,
+    gauges keep the value of the newest snapshot.
+    """
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "values": {}})
+            values = target["values"]
+            for labels, value in family["samples"]:
+                key = _labels_key(labels)
+                if family["type"] == "gauge" or key not in values:
+                    values[key] = value
+                elif family["type"] == "histogram":
+                    old = values[key]
+                    values[key] = {
+                        "counts": [
+                            a + b for a, b in zip(old["counts"], value["counts"])
+                        ],
+                        "sum": old["sum"] + value["sum"],
+                    }
+                else:
+                    values[key] = values[key] + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render(families: dict[str, dict]) -> str:
+    """
+    Prometheus text exposition format 0.0.4.
+    """
+    lines = []
+    for name, family in sorted(families.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key, value in sorted(family["values"].items()):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            bounds = family["buckets"] + [float("inf")]
+            for bound, count in zip(bounds, value["counts"]):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(
+                f"{name}_sum{_format_labels(key)} {_format_value(value['sum'])}"
+            )
+            lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def exposition() -> str:
+    """
+    Metrics of this process and of all collector processes (METRICS_DIR).
+    """
+    snapshots = []
+    if settings.METRICS_DIR:
+        snapshots = read_snapshots(settings.METRICS_DIR, settings.METRICS_MAX_AGE)
+    snapshots.append(metrics.snapshot())
+    return render(merge(snapshots))
+
+
+def process_name() -> str:
+    """
+    Label value of per-process gauges, also the name of the snapshot file.
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+
+
+NEXT = "next"
+PREV = "prev"
+
+
+class CursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Position between two rows of a listing ordered by (-created_at, -id):
+    the page after the row (next) or before it (prev).
+    """
+
+    created_at: datetime
+    id: int
+    direction: str = NEXT
+
+
+def encode_cursor(created_at: datetime, id: int, direction: str = NEXT) -> str:
+    payload = json.dumps([created_at.isoformat(), id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        cursor = Cursor(datetime.fromisoformat(created_at), int(id), direction)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise CursorError("Invalid cursor") from None
+    if cursor.direction not in (NEXT, PREV):
+        raise CursorError("Invalid cursor")
+    return cursor
+
+
+def keyset_queryset(queryset: QuerySet, cursor: Cursor | None) -> QuerySet:
+    """
+    Rows next to cursor (from the start without cursor), nearest first.
+
+    The redundant created_at bound is the index condition of the
+    (created_at, id) indexes, so the cost does not depend on the position;
+    rows without created_at are not part of keyset listings.
+    """
+    queryset = queryset.filter(created_at__isnull=False)
+    if cursor is None:
+        return queryset.order_by("-created_at", "-id")
+    if cursor.direction == NEXT:
+        return queryset.filter(
+            Q(created_at__lt=cursor.created_at)
+            | Q(created_at=cursor.created_at, id__lt=cursor.id),
+            created_at__lte=cursor.created_at,
+        ).order_by("-created_at", "-id")
+    return queryset.filter(
+        Q(created_at__gt=cursor.created_at)
+        | Q(created_at=cursor.created_at, id__gt=cursor.id),
+        created_at__gte=cursor.created_at,
+    ).order_by("created_at", "id")
+
+
+def keyset_page(
+    queryset: QuerySet, cursor: Cursor | None, size: int
+) -> tuple[list, bool]:
+    """
+    Up to size rows next to cursor in (-created_at, -id) order and
+    whether there are more rows in the direction of the cursor.
+    """
+    rows = list(keyset_queryset(queryset, cursor)[: size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    if cursor is not None and cursor.direction == PREV:
+        rows.reverse()
+    return rows, more
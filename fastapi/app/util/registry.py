@@ -0,0 +1,115 @@
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from app.models import Endpoint
+from app.util.db import db_sync_to_async
+from app.util.versions import aget_version, bump_version
+
+
+@dataclass(frozen=True)
+class EndpointConfig:
+    """
+    Endpoint with everything the collector needs from its currency and provider.
+    """
+
+    id: int
+    url: str
+    pattern_block: str | None
+    pattern_timestamp: str | None
+    header: str | None
+    currency_id: int
+    currency_name: str
+    provider_id: int
+    provider_name: str
+    api_key: str | None
+    max_concurrency: int | None = None
+    rate_limit: float | None = None
+    rate_burst: int = 1
+    block_url: str | None = None
+    pattern_block_timestamp: str | None = None
+
+    @classmethod
+    def from_endpoint(cls, endpoint: Endpoint) -> "EndpointConfig":
+        return cls(
+            id=endpoint.id,
+            url=endpoint.url,
+            pattern_block=endpoint.pattern_block,
+            pattern_timestamp=endpoint.pattern_timestamp,
+            header=endpoint.header,
+            currency_id=endpoint.currency.id,
+            currency_name=endpoint.currency.name,
+            provider_id=endpoint.provider.id,
+            provider_name=endpoint.provider.name,
+            api_key=endpoint.provider.api_key,
+            max_concurrency=endpoint.provider.max_concurrency,
+            rate_limit=endpoint.provider.rate_limit,
+            rate_burst=endpoint.provider.rate_burst,
+            block_url=endpoint.block_url,
+            pattern_block_timestamp=endpoint.pattern_block_timestamp,
+        )
+
+    @property
+    def headers(self) -> dict[str, str] | None:
+        if self.header and self.api_key:
+            return {self.header: self.api_key}
+        return None
+
+
+class EndpointRegistry:
+    """
+    Process-local cache of all endpoints with currency and provider.
+
+    Loaded with a single query and reloaded when the shared version
+    is bumped by model signals (see app.signals) or when it is older
+    than COLLECTOR_REGISTRY_TTL seconds.
+    """
+
+    VERSION_NAME = "endpoints"
+
+    def __init__(self) -> None:
+        self._endpoints: dict[int, EndpointConfig] | None = None
+        self._version: int | None = None
+        self._loaded_at = 0.0
+
+    def invalidate(self) -> None:
+        self._endpoints = None
+
+    @classmethod
+    def changed(cls) -> None:
+        """
+        Invalidate registries of all processes.
+        """
+        endpoint_registry.invalidate()
+        bump_version(cls.VERSION_NAME)
+
+    @staticmethod
+    def _load() -> dict[int, EndpointConfig]:
+        endpoints = Endpoint.objects.select_related("currency", "provider")
+        return {
+            endpoint.id: EndpointConfig.from_endpoint(endpoint)
+            for endpoint in endpoints
+        }
+
+    def _is_stale(self, version: int) -> bool:
+        return (
+            self._endpoints is None
+            or version != self._version
+            or time.monotonic() - self._loaded_at > settings.COLLECTOR_REGISTRY_TTL
+        )
+
+    async def aget_all(self) -> list[EndpointConfig]:
+        version = await aget_version(self.VERSION_NAME)
+        if self._is_stale(version):
+            self._endpoints = await db_sync_to_async(self._load)()
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return list(self._endpoints.values())
+
+    async def aget(self, endpoint_id: int) -> EndpointConfig | None:
+        await self.aget_all()
+        return self._endpoints.get(endpoint_id)
+
+
+endpoint_registry = EndpointRegistry()
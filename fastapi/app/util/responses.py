@@ -0,0 +1,119 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.util.metrics import metrics
+from app.util.versions import aget_version, bump_version
+
+
+# cached responses and the models whose changes make them stale
+CURRENCIES = "currencies"
+PROVIDERS = "providers"
+ENDPOINTS = "endpoints"
+DEPENDENCIES = {
+    "currency": (CURRENCIES, ENDPOINTS),
+    "provider": (PROVIDERS, ENDPOINTS),
+    "endpoint": (ENDPOINTS,),
+}
+
+REQUESTS = metrics.counter(
+    "api_response_cache_requests_total",
+    "Requests of cached list endpoints by result (hit, miss).",
+)
+
+
+class ResponseCache:
+    """
+    Rendered JSON bodies of read-mostly list endpoints, so repeated
+    requests skip the DB and Pydantic.
+
+    Keyed by route, query parameters and the version of the cached data,
+    which model signals bump on every change (see app.signals), so a
+    change is visible to the next request of every process sharing the
+    Django cache. RESPONSE_CACHE_TTL bounds the age otherwise.
+    "local" keeps up to RESPONSE_CACHE_SIZE bodies per process (LRU),
+    "shared" also stores them in the Django cache (Redis with CACHE_URL),
+    "none" disables caching.
+    """
+
+    KEY_PREFIX = "response:"
+
+    def __init__(self, size: int | None = None) -> None:
+        self.size = size or settings.RESPONSE_CACHE_SIZE
+        self._bodies: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.RESPONSE_CACHE != "none"
+
+    @property
+    def shared(self) -> bool:
+        return settings.RESPONSE_CACHE == "shared"
+
+    @classmethod
+    def changed(cls, model_name: str) -> None:
+        """
+        Make responses built from model_name stale in all processes.
+        """
+        for name in DEPENDENCIES.get(model_name, ()):
+            bump_version(f"{cls.KEY_PREFIX}{name}")
+
+    def _key(self, name: str, version: int, request: Request) -> str:
+        query = sorted(request.query_params.multi_items())
+        digest = hashlib.md5(f"{request.url.path}?{query}".encode()).hexdigest()
+        return f"{self.KEY_PREFIX}{name}:{version}:{digest}"
+
+    def _get_local(self, key: str) -> bytes | None:
+        entry = self._bodies.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires < time.monotonic():
+            del self._bodies[key]
+            return None
+        self._bodies.move_to_end(key)
+        return body
+
+    def _set_local(self, key: str, body: bytes) -> None:
+        self._bodies[key] = (time.monotonic() + settings.RESPONSE_CACHE_TTL, body)
+        self._bodies.move_to_end(key)
+        while len(self._bodies) > self.size:
+            self._bodies.popitem(last=False)
+
+    async def aget(
+        self, name: str, request: Request, build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        Cached response of the list called name, build() returns the
+        response content when it is missing. Errors are not cached.
+        """
+        if not self.enabled:
+            return JSONResponse(jsonable_encoder(await build()))
+
+        version = await aget_version(f"{self.KEY_PREFIX}{name}")
+        key = self._key(name, version, request)
+        body = self._get_local(key)
+        if body is None and self.shared:
+            body = await cache.aget(key)
+            if body is not None:
+                self._set_local(key, body)
+        if body is not None:
+            REQUESTS.inc(route=name, result="hit")
+            return Response(body, media_type="application/json")
+
+        REQUESTS.inc(route=name, result="miss")
+        response = JSONResponse(jsonable_encoder(await build()))
+        self._set_local(key, response.body)
+        if self.shared:
+            await cache.aset(key, response.body, timeout=settings.RESPONSE_CACHE_TTL)
+        return response
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+
+from app.models import Block, Endpoint
+from app.util.registry import EndpointConfig
+
+
+def observed_block_intervals(currency_ids: set[int], now: datetime) -> dict[int, float]:
+    """
+    Average seconds between blocks per currency, measured as block number
+    growth over the time the blocks were stored in the recent window.
+    Only blocks created in the window count: backfilled history is stored
+    at once and would make the interval collapse towards zero.
+    One aggregate query for all currencies.
+    """
+    since = now - timedelta(seconds=settings.COLLECTOR_INTERVAL_WINDOW)
+    rows = (
+        Block.objects.filter(
+            currency_id__in=currency_ids, stored_at__gte=since, created_at__gte=since
+        )
+        .values("currency_id")
+        .annotate(
+            count=Count("id"),
+            first=Min("stored_at"),
+            last=Max("stored_at"),
+            low=Min("block_number"),
+            high=Max("block_number"),
+        )
+    )
+    intervals = {}
+    for row in rows:
+        if row["count"] > 1 and row["high"] > row["low"]:
+            seconds = (row["last"] - row["first"]).total_seconds()
+            intervals[row["currency_id"]] = seconds / (row["high"] - row["low"])
+    return intervals
+
+
+def poll_intervals(endpoints: list[EndpointConfig], now: datetime) -> dict[int, float]:
+    """
+    Polling interval per endpoint: a fraction of the observed block interval
+    of its currency, clamped to COLLECTOR_POLL_MIN / COLLECTOR_POLL_MAX and
+    stretched evenly when all endpoints together exceed
+    COLLECTOR_REQUEST_BUDGET requests per minute.
+    """
+    block_intervals = observed_block_intervals(
+        {endpoint.currency_id for endpoint in endpoints}, now
+    )
+    intervals = {}
+    for endpoint in endpoints:
+        block_interval = block_intervals.get(endpoint.currency_id)
+        if block_interval is None:
+            interval = settings.COLLECTOR_POLL_DEFAULT
+        else:
+            interval = block_interval * settings.COLLECTOR_POLL_FACTOR
+        intervals[endpoint.id] = min(
+            max(interval, settings.COLLECTOR_POLL_MIN), settings.COLLECTOR_POLL_MAX
+        )
+
+    budget = settings.COLLECTOR_REQUEST_BUDGET
+    if budget and intervals:
+        per_minute = sum(60.0 / interval for interval in intervals.values())
+        if per_minute > budget:
+            scale = per_minute / budget
+            intervals = {
+                endpoint_id: interval * scale
+                for endpoint_id, interval in intervals.items()
+            }
+    return intervals
+
+
+def claim_due_endpoints(endpoints: list[EndpointConfig], now: datetime) -> set[int]:
+    """
+    Select endpoints whose next_poll_at has come and move it forward
+    by their new polling interval in the same transaction, so the
+    endpoints are not picked again by a concurrent cycle.
+    Return ids of the claimed endpoints.
+    """
+    with transaction.atomic():
+        due = list(
+            Endpoint.objects.select_for_update(skip_locked=True)
+            .filter(Q(next_poll_at__isnull=True) | Q(next_poll_at__lte=now))
+            .only("id")
+        )
+        if not due:
+            return set()
+
+        intervals = poll_intervals(endpoints, now)
+        for endpoint in due:
+            endpoint.poll_interval = intervals.get(
+                endpoint.id, settings.COLLECTOR_POLL_DEFAULT
+            )
+            endpoint.next_poll_at = now + timedelta(seconds=endpoint.poll_interval)
+        Endpoint.objects.bulk_update(due, ["poll_interval", "next_poll_at"])
+
+    return {endpoint.id for endpoint in due}
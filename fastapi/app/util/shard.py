@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from app.util.registry import EndpointConfig
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping, Veach): when the number of buckets
+    changes only ~1/buckets of the keys move to another bucket.
+    """
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def partition(
+    endpoints: list[EndpointConfig], by: str, size: int, shards: int
+) -> list[list[int]]:
+    """
+    Split endpoint ids into chunks of at most `size` for sub-tasks.
+
+    by="provider" keeps endpoints of one provider together, so its
+    concurrency and rate limits are enforced by a single worker
+    (unless the provider has more than `size` endpoints).
+    by="hash" spreads endpoints over `shards` groups by consistent hash.
+    """
+    groups = defaultdict(list)
+    for endpoint in endpoints:
+        if by == "provider":
+            groups[endpoint.provider_id].append(endpoint.id)
+        elif by == "hash":
+            groups[jump_hash(endpoint.id, shards)].append(endpoint.id)
+        else:
+            raise ValueError(f"Unknown shard mode {by!r}")
+
+    return [
+        chunk
+        for _, ids in sorted(groups.items())
+        for chunk in _chunks(sorted(ids), size)
+    ]
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import connection
+from django.utils import timezone
+
+from app.models import Block
+
+
+@dataclass(frozen=True)
+class BlockRow:
+    """
+    Block extracted from a provider response, not stored yet.
+    """
+
+    block_number: int
+    currency_id: int
+    provider_id: int
+    created_at: datetime | None
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return self.currency_id, self.block_number
+
+
+def _unique_rows(rows: list[BlockRow]) -> list[BlockRow]:
+    """
+    Drop repeated (currency, block_number) pairs, the first row wins.
+    """
+    unique = {}
+    for row in rows:
+        unique.setdefault(row.key, row)
+    return list(unique.values())
+
+
+def _insert_returning(
+    rows: list[BlockRow], stored_at: datetime
+) -> dict[tuple[int, int], tuple[int, datetime]]:
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING in a single statement.
+    """
+    opts = Block._meta
+    qn = connection.ops.quote_name
+    columns = [
+        opts.get_field(name).column
+        for name in ("block_number", "currency", "provider", "created_at", "stored_at")
+    ]
+    block_number, currency_id, provider_id, _, stored_at_column = map(qn, columns)
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    sql = (
+        f"INSERT INTO {qn(opts.db_table)} ({', '.join(map(qn, columns))}) "
+        f"VALUES {values} "
+        f"ON CONFLICT ({block_number}, {currency_id}) DO NOTHING "
+        f"RETURNING {block_number}, {currency_id}, {provider_id}, {stored_at_column}"
+    )
+    params = []
+    for row in rows:
+        params.extend(
+            (
+                row.block_number,
+                row.currency_id,
+                row.provider_id,
+                row.created_at,
+                stored_at,
+            )
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        returned = cursor.fetchall()
+    return {
+        (currency, number): (provider, stored)
+        for number, currency, provider, stored in returned
+    }
+
+
+def _bulk_create(
+    rows: list[BlockRow], stored_at: datetime
+) -> dict[tuple[int, int], tuple[int, datetime]]:
+    """
+    Fallback for backends without RETURNING on INSERT: one query to find
+    existing pairs and one bulk_create(ignore_conflicts=True).
+    """
+    existing = set(
+        Block.objects.filter(
+            currency_id__in={row.currency_id for row in rows},
+            block_number__in={row.block_number for row in rows},
+        ).values_list("currency_id", "block_number")
+    )
+    new_rows = [row for row in rows if row.key not in existing]
+    Block.objects.bulk_create(
+        [
+            Block(
+                block_number=row.block_number,
+                currency_id=row.currency_id,
+                provider_id=row.provider_id,
+                created_at=row.created_at,
+                stored_at=stored_at,
+            )
+            for row in new_rows
+        ],
+        ignore_conflicts=True,
+    )
+    return {row.key: (row.provider_id, stored_at) for row in new_rows}
+
+
+def store_blocks(
+    rows: list[BlockRow], batch_size: int = 1000
+) -> dict[tuple[int, int], tuple[int, datetime]]:
+    """
+    Insert blocks, silently skipping the ones that already exist
+    (also when another worker inserts them concurrently).
+    Return {(currency_id, block_number): (provider_id, stored_at)} of new rows.
+    """
+    rows = _unique_rows(rows)
+    stored_at = timezone.now()
+    if connection.features.can_return_columns_from_insert:
+        insert = _insert_returning
+    else:
+        insert = _bulk_create
+
+    stored = {}
+    for start in range(0, len(rows), batch_size):
+        stored.update(insert(rows[start : start + batch_size], stored_at))
+    return stored
@@ -0,0 +1,150 @@
+import json
+from logging import getLogger
+from typing import Any
+
+from app.util.extract import Extractor
+
+try:
+    import ijson
+except ImportError:  # a dependency, missing only in partial installs
+    ijson = None
+
+
+logger = getLogger(__name__)
+
+_CONTAINER_EVENTS = {"start_map", "end_map", "start_array", "end_array", "map_key"}
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+# raised for malformed or truncated documents
+JSON_ERRORS = (ValueError, ijson.JSONError) if ijson else (ValueError,)
+
+
+class StreamExtractor:
+    """
+    Incremental JSON parser that keeps only the values
+    addressed by the extractors and reports when all are found,
+    so the rest of the body does not have to be read.
+    """
+
+    def __init__(self, extractors: list[Extractor]) -> None:
+        self.extractors = extractors
+        self.values: list[Any] = [None] * len(extractors)
+        self._missing = set(range(len(extractors)))
+        self._depths = {len(extractor.steps) for extractor in extractors}
+        self._events = ijson.sendable_list()
+        self._parser = ijson.basic_parse_coro(self._events, use_float=True)
+        # [key or list position] per open container
+        self._path: list[Any] = []
+        self._in_array: list[bool] = []
+
+    @property
+    def done(self) -> bool:
+        return not self._missing
+
+    def _next_item(self) -> None:
+        if self._in_array and self._in_array[-1]:
+            self._path[-1] += 1
+
+    def _value(self, value: Any) -> None:
+        if len(self._path) not in self._depths:
+            return
+        path = tuple(self._path)
+        for position in list(self._missing):
+            if self.extractors[position].matches(path):
+                self.values[position] = value
+                self._missing.discard(position)
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Parse next chunk of the body, return True when all values are found.
+        """
+        self._parser.send(chunk)
+        for event, value in self._events:
+            if event not in _CONTAINER_EVENTS:
+                self._next_item()
+                self._value(value)
+            elif event == "map_key":
+                self._path[-1] = value
+            elif event in ("start_map", "start_array"):
+                self._next_item()
+                self._path.append(-1 if event == "start_array" else None)
+                self._in_array.append(event == "start_array")
+            else:
+                self._path.pop()
+                self._in_array.pop()
+            if self.done:
+                break
+        del self._events[:]
+        return self.done
+
+    def close(self) -> list[Any]:
+        """
+        Body is fully read, validate that the document is complete.
+        """
+        self._parser.close()
+        return self.values
+
+
+class BufferedExtractor:
+    """
+    Fallback without ijson or for patterns that need the whole document:
+    the body is still read incrementally (and size-checked) but parsed at once.
+    """
+
+    done = False
+
+    def __init__(self, extractors: list[Extractor]) -> None:
+        self.extractors = extractors
+        self._body = bytearray()
+
+    def feed(self, chunk: bytes) -> bool:
+        self._body += chunk
+        return False
+
+    def close(self) -> list[Any]:
+        data = json.loads(self._body)
+        return [extractor(data) for extractor in self.extractors]
+
+
+_warned = False
+
+
+def make_extractor(extractors: list[Extractor]) -> StreamExtractor | BufferedExtractor:
+    global _warned
+    if ijson is None:
+        if not _warned:
+            logger.warning(
+                "ijson is not installed, streamed responses are read "
+                "to the end before parsing (`pip install ijson`)"
+            )
+            _warned = True
+        return BufferedExtractor(extractors)
+    if all(extractor.streamable for extractor in extractors):
+        return StreamExtractor(extractors)
+    return BufferedExtractor(extractors)
+
+
+async def read_fields(
+    response, extractors: list[Extractor], max_bytes: int
+) -> list[Any]:
+    """
+    Read a streamed httpx response chunk by chunk and return the values
+    of extractors, stopping as soon as all of them are found.
+    """
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise BodyTooLarge(f"Content-Length {length} exceeds {max_bytes} bytes")
+
+    parser = make_extractor(extractors)
+    received = 0
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > max_bytes:
+            raise BodyTooLarge(f"Response body exceeds {max_bytes} bytes")
+        if parser.feed(chunk):
+            return parser.values
+    return parser.close()
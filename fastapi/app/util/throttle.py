@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from app.util.registry import EndpointConfig
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average
+    and up to `burst` at once.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        # waiters are served in FIFO order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class ProviderThrottle:
+    """
+    Concurrency cap and rate limit for requests to one provider.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None,
+        rate_limit: float | None,
+        rate_burst: int,
+    ) -> None:
+        self.settings = (max_concurrency, rate_limit, rate_burst)
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        # not validated rows (fixtures, raw SQL) with rate_limit <= 0 are unlimited
+        self._bucket = (
+            TokenBucket(rate_limit, rate_burst)
+            if rate_limit and rate_limit > 0
+            else None
+        )
+
+    async def __aenter__(self) -> "ProviderThrottle":
+        if self._semaphore:
+            await self._semaphore.acquire()
+        if self._bucket:
+            try:
+                await self._bucket.acquire()
+            except BaseException:
+                if self._semaphore:
+                    self._semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._semaphore:
+            self._semaphore.release()
+
+
+class ThrottleRegistry:
+    """
+    ProviderThrottle per provider, shared by all endpoints of the provider.
+    Like the HTTP clients, throttles belong to the running event loop.
+    """
+
+    def __init__(self) -> None:
+        self._throttles: dict[int, ProviderThrottle] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self, endpoint: EndpointConfig) -> ProviderThrottle:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._throttles = {}
+            self._loop = loop
+
+        limits = (endpoint.max_concurrency, endpoint.rate_limit, endpoint.rate_burst)
+        throttle = self._throttles.get(endpoint.provider_id)
+        if throttle is None or throttle.settings != limits:
+            throttle = self._throttles[endpoint.provider_id] = ProviderThrottle(*limits)
+        return throttle
+
+
+throttle_registry = ThrottleRegistry()
@@ -0,0 +1,132 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Hashable
+
+from django.utils.dateparse import parse_datetime
+
+
+class TimestampError(ValueError):
+    pass
+
+
+# blocks older than the first blockchains or far in the future are parse errors,
+# this also tells epoch seconds from milliseconds when the format changes
+MIN_TIMESTAMP = datetime(2009, 1, 1, tzinfo=timezone.utc)
+MAX_AHEAD = timedelta(days=1)
+
+_NUMBER = re.compile(r"[+-]?\d+(\.\d*)?")
+
+
+def _checked(value: datetime) -> datetime:
+    """
+    Aware UTC datetime within the plausible range, naive time is UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    else:
+        value = value.astimezone(timezone.utc)
+    if not MIN_TIMESTAMP <= value <= datetime.now(timezone.utc) + MAX_AHEAD:
+        raise TimestampError(f"Timestamp {value.isoformat()} out of range")
+    return value
+
+
+def parse_iso(value: Any) -> datetime:
+    """
+    ISO-8601 with or without zone, "Z" suffix, space or "T" separator.
+    """
+    if not isinstance(value, str):
+        raise TimestampError(f"Not an ISO timestamp: {value!r}")
+    text = value.strip()
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        # forms fromisoformat of older Pythons does not accept
+        try:
+            parsed = parse_datetime(text)
+        except ValueError:
+            parsed = None
+    if parsed is None:
+        raise TimestampError(f"Invalid timestamp {value!r}")
+    return _checked(parsed)
+
+
+def _epoch(value: Any, scale: int) -> datetime:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TimestampError(f"Not an epoch timestamp: {value!r}")
+    try:
+        seconds = float(value) / scale
+        parsed = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise TimestampError(f"Invalid timestamp {value!r}") from None
+    return _checked(parsed)
+
+
+def parse_epoch_seconds(value: Any) -> datetime:
+    return _epoch(value, 1)
+
+
+def parse_epoch_millis(value: Any) -> datetime:
+    return _epoch(value, 1000)
+
+
+def parse_epoch_micros(value: Any) -> datetime:
+    return _epoch(value, 1000_000)
+
+
+def detect(value: Any) -> Callable[[Any], datetime]:
+    """
+    Choose the parser for value: epoch seconds, milliseconds or
+    microseconds by magnitude for numbers and numeric strings,
+    ISO-8601 for other strings.
+    """
+    if isinstance(value, bool) or value is None or value == "":
+        raise TimestampError("Timestamp not found")
+    if isinstance(value, str):
+        if not _NUMBER.fullmatch(value.strip()):
+            return parse_iso
+        number = abs(float(value))
+    elif isinstance(value, (int, float)):
+        number = abs(value)
+    else:
+        raise TimestampError(f"Invalid timestamp {value!r}")
+
+    if number < 1e11:
+        return parse_epoch_seconds
+    if number < 1e14:
+        return parse_epoch_millis
+    return parse_epoch_micros
+
+
+class TimestampParser:
+    """
+    Timestamps of provider responses as aware UTC datetimes.
+
+    The format is detected on the first value of every key (endpoint)
+    and the chosen parser is reused, a value that does not fit the
+    cached parser any more is detected again.
+    """
+
+    def __init__(self) -> None:
+        self._parsers: dict[Hashable, Callable[[Any], datetime]] = {}
+
+    def parse(self, value: Any, key: Hashable | None = None) -> datetime:
+        parser = self._parsers.get(key) if key is not None else None
+        if parser is not None:
+            try:
+                return parser(value)
+            except TimestampError:
+                pass  # provider changed the format
+
+        parser = detect(value)
+        parsed = parser(value)
+        if key is not None:
+            self._parsers[key] = parser
+        return parsed
+
+    def formats(self) -> dict[Hashable, str]:
+        return {key: parser.__name__ for key, parser in self._parsers.items()}
+
+
+timestamp_parser = TimestampParser()
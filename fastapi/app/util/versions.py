@@ -0,0 +1,27 @@
+from django.core.cache import cache
+
+
+def _version_key(name: str) -> str:
+    return f"version:{name}"
+
+
+def bump_version(name: str) -> None:
+    """
+    Mark cached data called name as stale in every process
+    sharing the cache backend.
+    """
+    key = _version_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # key evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+async def aget_version(name: str) -> int:
+    return await cache.aget(_version_key(name), 0)
+
+
+def get_version(name: str) -> int:
+    return cache.get(_version_key(name), 0)
@@ -38,6 +38,7 @@ from app.routers import (
     provider_router,
     endpoint_router,
     block_router,
+    metrics_router,
 )
 
 from fastapi import FastAPI
@@ -54,6 +55,7 @@ fastapi_app.include_router(block_router, tags=["block"], prefix="/block")
 fastapi_app.include_router(currency_router, tags=["currency"], prefix="/currency")
 fastapi_app.include_router(provider_router, tags=["provider"], prefix="/provider")
 fastapi_app.include_router(endpoint_router, tags=["endpoint"], prefix="/endpoint")
+fastapi_app.include_router(metrics_router, tags=["metrics"])
 
 # to mount Django
 fastapi_app.mount("/django", django_app)
@@ -0,0 +1,56 @@
+"""
+PostgreSQL backend that takes connections from a per-process pool
+(see pool.py) instead of opening one per thread and request.
+
+    DATABASES = {"default": {
+        "ENGINE": "config.db.backends.postgresql_pool",
+        ...
+        "POOL": {"MIN_SIZE": 1, "MAX_SIZE": 10, "TIMEOUT": 10.0},
+    }}
+
+Closing a connection (end of a request, close_old_connections,
+CONN_MAX_AGE) returns it to the pool, so CONN_MAX_AGE = 0 is cheap.
+"""
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from .pool import existing_pool, get_pool, pool_stats  # noqa: F401
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # app.util.db returns connections after every call of a DB thread
+    pooled = True
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        connection = get_pool(self.alias, self.settings_dict, conn_params).getconn()
+
+        # as in the postgresql backend, a pooled connection may come with the
+        # isolation level of its previous user
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        base.psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = existing_pool(self.alias)
+        if pool is None:
+            # opened by the parent process before fork
+            return super()._close()
+        # a connection closed inside atomic() stays referenced by this wrapper,
+        # it must not be handed to another thread
+        discard = self.in_atomic_block or (
+            self.errors_occurred and not self.is_usable()
+        )
+        with self.wrap_database_errors:
+            pool.putconn(self.connection, discard=discard)
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    waits: int = 0
+    checkout_seconds: float = 0.0
+    timeouts: int = 0
+    opened: int = 0
+    discarded: int = 0
+    failed_checks: int = 0
+
+
+@dataclass
+class _Pooled:
+    connection: "extensions.connection"
+    created_at: float
+    returned_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of psycopg2 connections shared by the threads of a process.
+
+    getconn() reuses the most recently returned connection, opens a new one
+    below max_size, or waits up to timeout seconds for one to be returned.
+    Connections idle longer than check_idle seconds are checked with
+    SELECT 1 before use, connections older than max_lifetime are replaced.
+    """
+
+    def __init__(
+        self,
+        conn_params: dict,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        check_idle: float = 30.0,
+        max_lifetime: float = 3600.0,
+    ) -> None:
+        self.conn_params = conn_params
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+        self.stats = PoolStats()
+        self._idle: deque[_Pooled] = deque()
+        self._in_use: dict[int, _Pooled] = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append(self._open())
+
+    def _open(self) -> _Pooled:
+        try:
+            connection = psycopg2.connect(**self.conn_params)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self.stats.opened += 1
+        return _Pooled(connection, created_at=time.monotonic())
+
+    def _discard(self, pooled: _Pooled) -> None:
+        try:
+            pooled.connection.close()
+        except psycopg2.Error:
+            pass
+        with self._condition:
+            self._size -= 1
+            self.stats.discarded += 1
+            self._condition.notify()
+
+    def _healthy(self, pooled: _Pooled, now: float) -> bool:
+        if pooled.connection.closed:
+            return False
+        if now - pooled.created_at > self.max_lifetime:
+            return False
+        if now - pooled.returned_at > self.check_idle:
+            try:
+                with pooled.connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                if not pooled.connection.autocommit:
+                    pooled.connection.rollback()
+            except psycopg2.Error:
+                self.stats.failed_checks += 1
+                return False
+        return True
+
+    def getconn(self) -> "extensions.connection":
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            pooled = None
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats.timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"({self.max_size} in use)"
+                        )
+                    self.stats.waits += 1
+                    self._condition.wait(remaining)
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._size += 1
+
+            if pooled is None:
+                pooled = self._open()
+            elif not self._healthy(pooled, time.monotonic()):
+                self._discard(pooled)
+                continue
+
+            with self._condition:
+                self._in_use[id(pooled.connection)] = pooled
+                self.stats.checkouts += 1
+                self.stats.checkout_seconds += time.monotonic() - started
+            return pooled.connection
+
+    def putconn(
+        self, connection: "extensions.connection", discard: bool = False
+    ) -> None:
+        """
+        Return connection, an open transaction is rolled back.
+        """
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            # not from this pool (e.g. opened before fork)
+            return
+        if not discard and not connection.closed:
+            try:
+                status = connection.info.transaction_status
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or connection.closed:
+            self._discard(pooled)
+            return
+        pooled.returned_at = time.monotonic()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            idle = len(self._idle)
+            size = self._size
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "max_size": self.max_size,
+            "checkouts": self.stats.checkouts,
+            "waits": self.stats.waits,
+            "checkout_seconds": round(self.stats.checkout_seconds, 3),
+            "timeouts": self.stats.timeouts,
+            "opened": self.stats.opened,
+            "discarded": self.stats.discarded,
+            "failed_checks": self.stats.failed_checks,
+        }
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_pid: int | None = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, settings_dict: dict, conn_params: dict) -> ConnectionPool:
+    """
+    Pool of the database alias in this process, created on first use and
+    again after fork, the connections of the parent are not shared.
+    POOL options of the DATABASES entry: MIN_SIZE, MAX_SIZE, TIMEOUT,
+    CHECK_IDLE, MAX_LIFETIME.
+    """
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools = {}
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            options = settings_dict.get("POOL", {})
+            pool = _pools[alias] = ConnectionPool(
+                conn_params,
+                min_size=options.get("MIN_SIZE", 1),
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 10.0),
+                check_idle=options.get("CHECK_IDLE", 30.0),
+                max_lifetime=options.get("MAX_LIFETIME", 3600.0),
+            )
+        return pool
+
+
+def existing_pool(alias: str) -> ConnectionPool | None:
+    if _pools_pid != os.getpid():
+        return None
+    return _pools.get(alias)
+
+
+def pool_stats() -> dict[str, dict]:
+    """
+    Snapshot of every pool of this process by database alias.
+    """
+    if _pools_pid != os.getpid():
+        return {}
+    return {alias: pool.snapshot() for alias, pool in list(_pools.items())}
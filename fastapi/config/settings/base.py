@@ -129,6 +129,63 @@ JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_MINUTES: int = 60 * 24 * 5
 
 
+# Cache
+# shared between API, admin and Celery processes when CACHE_URL (redis) is set
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Database access
+# threads (and so connections per process) for ORM calls of async code, see app.util.db
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", 10))
+
+# Block stream
+# redis pub/sub between collector and API processes (SSE / WebSocket clients),
+# empty - blocks reach only clients of the collecting process
+BLOCK_STREAM_URL = os.getenv("BLOCK_STREAM_URL", "")
+BLOCK_STREAM_QUEUE_SIZE = int(os.getenv("BLOCK_STREAM_QUEUE_SIZE", 100))  # per client
+BLOCK_STREAM_HEARTBEAT = float(os.getenv("BLOCK_STREAM_HEARTBEAT", 15.0))  # seconds
+
+# Block list totals
+# seconds a COUNT of the block list is cached per filter combination, 0 - count every request
+BLOCK_COUNT_CACHE_TTL = float(os.getenv("BLOCK_COUNT_CACHE_TTL", 30))
+# planner estimate (pg_class.reltuples) as total of the unfiltered list
+# of at least BLOCK_COUNT_ESTIMATE_MIN rows
+BLOCK_COUNT_ESTIMATE = os.getenv("BLOCK_COUNT_ESTIMATE", "false").lower() == "true"
+BLOCK_COUNT_ESTIMATE_MIN = int(os.getenv("BLOCK_COUNT_ESTIMATE_MIN", 100_000))
+
+# Currencies and providers
+# seconds the API keeps its copy of both tables (also reloaded on changes)
+DIMENSION_CACHE_TTL = float(os.getenv("DIMENSION_CACHE_TTL", 300))
+
+# Response cache of the currency, provider and endpoint lists
+# "local" - per process, "shared" - also in the Django cache (CACHE_URL), "none"
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "local")
+RESPONSE_CACHE_SIZE = int(
+    os.getenv("RESPONSE_CACHE_SIZE", 256)
+)  # responses per process
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 60))  # seconds
+
+# Metrics
+# collector processes write Prometheus snapshots here, GET /metrics merges them;
+# empty - /metrics shows the metrics of the API process only
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+# snapshots not updated for this many seconds (stopped processes) are removed
+METRICS_MAX_AGE = float(os.getenv("METRICS_MAX_AGE", 3600))
+
+
 # Logging
 def utc_time(*args):  # type: ignore
     return datetime.now(timezone("UTC")).timetuple()
@@ -136,3 +193,57 @@ def utc_time(*args):  # type: ignore
 
 logging.Formatter.converter = utc_time
 logging.config.dictConfig(LOGGING)
+
+# Collector
+# HTTP/2 requires the optional `h2` package (httpx[http2])
+COLLECTOR_HTTP2 = os.getenv("COLLECTOR_HTTP2", "false").lower() == "true"
+COLLECTOR_HTTP_CONNECT_TIMEOUT = float(os.getenv("COLLECTOR_HTTP_CONNECT_TIMEOUT", 5.0))
+COLLECTOR_HTTP_READ_TIMEOUT = float(os.getenv("COLLECTOR_HTTP_READ_TIMEOUT", 10.0))
+COLLECTOR_HTTP_MAX_CONNECTIONS = int(os.getenv("COLLECTOR_HTTP_MAX_CONNECTIONS", 20))
+COLLECTOR_HTTP_MAX_KEEPALIVE = int(os.getenv("COLLECTOR_HTTP_MAX_KEEPALIVE", 10))
+# keep idle connections longer than one polling interval
+COLLECTOR_HTTP_KEEPALIVE_EXPIRY = float(
+    os.getenv("COLLECTOR_HTTP_KEEPALIVE_EXPIRY", 120.0)
+)
+# endpoint registry is reloaded on model changes, and at least this often (seconds)
+COLLECTOR_REGISTRY_TTL = float(os.getenv("COLLECTOR_REGISTRY_TTL", 300.0))
+# read responses incrementally and keep only the pattern fields,
+# reading stops once the fields are parsed (ijson)
+COLLECTOR_STREAMING = os.getenv("COLLECTOR_STREAMING", "false").lower() == "true"
+COLLECTOR_MAX_BODY_BYTES = int(os.getenv("COLLECTOR_MAX_BODY_BYTES", 5 * 1024 * 1024))
+# adaptive polling: interval = observed block interval * factor, in [min, max] seconds
+COLLECTOR_TICK_SECONDS = float(os.getenv("COLLECTOR_TICK_SECONDS", 10.0))
+# schedule task_collect_due in Celery beat, set false when `manage.py run_collector` runs
+COLLECTOR_CELERY_BEAT = os.getenv("COLLECTOR_CELERY_BEAT", "true").lower() == "true"
+COLLECTOR_POLL_DEFAULT = float(os.getenv("COLLECTOR_POLL_DEFAULT", 60.0))
+COLLECTOR_POLL_MIN = float(os.getenv("COLLECTOR_POLL_MIN", 10.0))
+COLLECTOR_POLL_MAX = float(os.getenv("COLLECTOR_POLL_MAX", 600.0))
+COLLECTOR_POLL_FACTOR = float(os.getenv("COLLECTOR_POLL_FACTOR", 0.5))
+# blocks stored during this many seconds are used to measure the block interval
+COLLECTOR_INTERVAL_WINDOW = float(os.getenv("COLLECTOR_INTERVAL_WINDOW", 6 * 60 * 60))
+# total requests per minute over all endpoints, 0 - no limit
+COLLECTOR_REQUEST_BUDGET = float(os.getenv("COLLECTOR_REQUEST_BUDGET", 0))
+# fan a cycle out to Celery sub-tasks: "none", "provider" or "hash"
+COLLECTOR_SHARD_BY = os.getenv("COLLECTOR_SHARD_BY", "none")
+COLLECTOR_SHARD_SIZE = int(
+    os.getenv("COLLECTOR_SHARD_SIZE", 50)
+)  # endpoints per sub-task
+COLLECTOR_SHARD_COUNT = int(os.getenv("COLLECTOR_SHARD_COUNT", 8))  # hash groups
+# race the providers of each currency and keep the first block within the deadline
+COLLECTOR_HEDGED = os.getenv("COLLECTOR_HEDGED", "false").lower() == "true"
+COLLECTOR_HEDGE_DEADLINE = float(os.getenv("COLLECTOR_HEDGE_DEADLINE", 5.0))
+# circuit breaker per provider: opens after THRESHOLD failures in a row for
+# RECOVERY seconds, doubled on every reopen up to MAX_RECOVERY
+COLLECTOR_BREAKER_THRESHOLD = int(os.getenv("COLLECTOR_BREAKER_THRESHOLD", 5))
+COLLECTOR_BREAKER_RECOVERY = float(os.getenv("COLLECTOR_BREAKER_RECOVERY", 30.0))
+COLLECTOR_BREAKER_MAX_RECOVERY = float(
+    os.getenv("COLLECTOR_BREAKER_MAX_RECOVERY", 600.0)
+)
+# retries of a failed request, backoff base in seconds (exponential, full jitter)
+COLLECTOR_RETRIES = int(os.getenv("COLLECTOR_RETRIES", 2))
+COLLECTOR_RETRY_BACKOFF = float(os.getenv("COLLECTOR_RETRY_BACKOFF", 0.5))
+# recently stored block numbers per currency, polls of a known head skip the DB:
+# "local" - per process, "shared" - also in the Django cache (CACHE_URL), "none"
+COLLECTOR_HEAD_CACHE = os.getenv("COLLECTOR_HEAD_CACHE", "local")
+COLLECTOR_HEAD_CACHE_SIZE = int(os.getenv("COLLECTOR_HEAD_CACHE_SIZE", 64))
+COLLECTOR_HEAD_CACHE_TTL = float(os.getenv("COLLECTOR_HEAD_CACHE_TTL", 24 * 60 * 60))
@@ -10,13 +10,32 @@ ALLOWED_HOSTS: List[str] = ["*"]
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+DB_ENGINE = os.getenv("DB_ENGINE", "django.db.backends.postgresql_psycopg2")
+# connections from a per-process pool (ASGI app, Celery workers, collector),
+# see config/db/backends/postgresql_pool
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+if DB_POOL and "postgresql" in DB_ENGINE:
+    DB_ENGINE = "config.db.backends.postgresql_pool"
+
 DATABASES = {
     "default": {
-        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql_psycopg2"),
+        "ENGINE": DB_ENGINE,
         "NAME": os.getenv("DB_NAME", os.path.join(BASE_DIR, "db.sqlite3")),
         "USER": os.getenv("DB_USER", "user"),
         "PASSWORD": os.getenv("DB_PASSWORD", "password"),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # seconds to keep a connection, returned to the pool instead with DB_POOL
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": (
+            os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
+        "POOL": {
+            "MIN_SIZE": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", 10.0)),
+            "CHECK_IDLE": float(os.getenv("DB_POOL_CHECK_IDLE", 30.0)),
+            "MAX_LIFETIME": float(os.getenv("DB_POOL_MAX_LIFETIME", 3600.0)),
+        },
     }
 }